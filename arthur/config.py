@@ -15,6 +15,10 @@ class PostmarkConfig:
     default_sender: str = "alerts@dellight.ai"
     default_recipient: str = "arthur.dell@dellight.ai"
     message_stream: str = "outbound"
+    api_base_url: str = field(default_factory=lambda: os.getenv("POSTMARK_API_URL", "https://api.postmarkapp.com"))
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    max_retries: int = 3  # of 429 / 5xx responses, with jittered backoff
 
 
 @dataclass
@@ -26,6 +30,59 @@ class ProjectConfig:
     mj_automation_dir: Path = field(default_factory=lambda: Path("/Users/arthurdell/ARTHUR/mj_automation"))
 
 
+@dataclass
+class InfraConfig:
+    """Remote nodes checked by the daily summary"""
+    hosts: list[str] = field(default_factory=lambda: ["alpha", "beta", "gamma"])
+    deadline_seconds: float = 8.0  # for all hosts together
+    cache_path: Path = field(default_factory=lambda: Path.home() / ".arthur" / "infra_probe.json")
+    cache_ttl_seconds: float = 300.0
+    disk_path: str = "/"
+    disk_warn_pct: float = 90.0
+
+
+@dataclass
+class GitConfig:
+    """Repositories whose commits the daily summary reports"""
+    # Local paths, or "host:/path" for repos on other nodes (read over SSH)
+    repos: list[str] = field(default_factory=lambda: ["/Users/arthurdell/ARTHUR"])
+    index_path: Path = field(default_factory=lambda: Path.home() / ".arthur" / "git_index.json")
+    timeout_seconds: float = 10.0  # per repo
+    retention_days: int = 30
+
+
+@dataclass
+class FleetConfig:
+    """Nodes whose published summaries the fleet report aggregates"""
+    # Node ID -> where its summary is published: an SSH host, an http(s) URL or a local path
+    nodes: dict[str, str] = field(default_factory=lambda: {
+        "AIR": str(Path.home() / ".arthur" / "summaries" / "latest.json"),
+        "ALPHA": "alpha",
+        "BETA": "beta",
+        "GAMMA": "gamma",
+    })
+    publish_path: Path = field(default_factory=lambda: Path.home() / ".arthur" / "summaries" / "latest.json")
+    remote_path: str = ".arthur/summaries/latest.json"  # relative to the remote home directory
+    deadline_seconds: float = 10.0  # for all nodes together
+    stale_after_hours: float = 26.0  # older summaries are reported as stale
+
+
+@dataclass
+class OutboxConfig:
+    """Durable queue that outbound email goes through"""
+    db_path: Path = field(default_factory=lambda: Path.home() / ".arthur" / "outbox.db")
+    poll_seconds: float = 5.0
+    max_attempts: int = 8  # then the message is marked failed
+    backoff_base_seconds: float = 30.0  # doubled per attempt, up to backoff_max_seconds
+    backoff_max_seconds: float = 3600.0
+    digest_window_seconds: float = 300.0  # digest messages are held this long to be combined
+    drain_seconds: float = 60.0  # how long a one-shot sender waits for delivery
+
+
 # Singleton instances
 POSTMARK = PostmarkConfig()
 PROJECT = ProjectConfig()
+INFRA = InfraConfig()
+GIT = GitConfig()
+FLEET = FleetConfig()
+OUTBOX = OutboxConfig()
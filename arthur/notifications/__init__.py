@@ -3,12 +3,16 @@ ARTHUR Notifications Module
 Email and alerting services
 """
 
-from .postmark import PostmarkNotifier, EmailResult
+from .postmark import PostmarkNotifier, EmailMessage, EmailResult
+from .outbox import Outbox, OutboxWorker
 from .daily_summary import generate_daily_summary, format_email_body, format_email_subject
 
 __all__ = [
     "PostmarkNotifier",
+    "EmailMessage",
     "EmailResult",
+    "Outbox",
+    "OutboxWorker",
     "generate_daily_summary",
     "format_email_body",
     "format_email_subject",
@@ -0,0 +1,226 @@
+"""
+MJ Batch Statistics
+Aggregates the manifests written by mj_automation's batch workflow:
+success rates, generation times, bytes transferred and the slowest themes.
+
+Each manifest is parsed once. Its per-batch totals are cached keyed on the
+manifest's mtime and size, so a later run only stats the manifests that
+haven't changed.
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .cache_file import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".arthur" / "batch_manifests.json"
+
+MANIFEST_FILENAME = "manifest.json"
+# Written while a batch runs; used when a batch never got compacted
+MANIFEST_LINES_FILENAME = "manifest.jsonl"
+
+
+@dataclass
+class ManifestTotals:
+    """What one batch manifest adds up to"""
+    batch_id: str
+    path: str
+    mtime: float
+    size: int
+    prompts: int = 0
+    successful: int = 0
+    images: int = 0
+    videos: int = 0
+    elapsed_seconds: float = 0.0  # summed over successful prompts that recorded it
+    timed_prompts: int = 0
+    bytes_transferred: int = 0
+    # theme -> [elapsed seconds, prompts timed]
+    themes: dict[str, list[float]] = field(default_factory=dict)
+
+
+@dataclass
+class BatchStats:
+    """Batch activity over a period"""
+    batches: int = 0
+    prompts: int = 0
+    successful: int = 0
+    failed: int = 0
+    images: int = 0
+    videos: int = 0
+    mean_generation_seconds: float = 0.0
+    bytes_transferred: int = 0
+    slowest_themes: list[tuple[str, float]] = field(default_factory=list)  # (theme, mean seconds)
+
+    @property
+    def success_rate(self) -> float:
+        return self.successful / self.prompts * 100 if self.prompts else 0.0
+
+
+def _read_entries(path: Path) -> tuple[str, list[dict]]:
+    """(batch id, prompt entries) from manifest.json or manifest.jsonl"""
+    if path.name == MANIFEST_LINES_FILENAME:
+        latest: dict[str, dict] = {}
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    latest[entry["id"]] = entry
+                except (ValueError, KeyError):
+                    # Torn last line from a batch still being written
+                    continue
+        return path.parent.name, list(latest.values())
+
+    data = json.loads(path.read_text())
+    return data.get("batch_id", path.parent.name), data.get("results", [])
+
+
+def parse_manifest(path: Path) -> ManifestTotals:
+    """Add up one manifest"""
+    st = path.stat()
+    batch_id, entries = _read_entries(path)
+    totals = ManifestTotals(batch_id=batch_id, path=str(path), mtime=st.st_mtime, size=st.st_size)
+    for entry in entries:
+        totals.prompts += 1
+        if not entry.get("success"):
+            continue
+        totals.successful += 1
+        if entry.get("type") == "video":
+            totals.videos += 1
+        else:
+            totals.images += entry.get("image_count", 0)
+        totals.bytes_transferred += entry.get("bytes") or 0
+        elapsed = entry.get("elapsed")
+        # Prompts served from the prompt cache took no generation time
+        if elapsed is not None and not entry.get("cached"):
+            totals.elapsed_seconds += elapsed
+            totals.timed_prompts += 1
+            theme = totals.themes.setdefault(entry.get("theme") or "?", [0.0, 0])
+            theme[0] += elapsed
+            theme[1] += 1
+    return totals
+
+
+class ManifestCache:
+    """Parsed manifest totals on disk, reused while a manifest's mtime and size are unchanged"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Optional[dict[str, dict]] = None
+        self._dirty = False
+        self.parsed = 0
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def totals(self, path: Path, mtime: float, size: int) -> ManifestTotals:
+        with self._lock:
+            cached = self._load().get(str(path))
+            if cached and cached["mtime"] == mtime and cached["size"] == size:
+                try:
+                    return ManifestTotals(**cached)
+                except TypeError:
+                    pass
+        totals = parse_manifest(path)
+        with self._lock:
+            self._load()[str(path)] = asdict(totals)
+            self._dirty = True
+            self.parsed += 1
+        return totals
+
+    def prune(self, seen: set[str]):
+        """Forget manifests that no longer exist"""
+        with self._lock:
+            entries = self._load()
+            for path in set(entries) - seen:
+                del entries[path]
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            if atomic_write_json(self.path, self._entries, "manifest cache"):
+                self._dirty = False
+
+
+def find_manifests(roots: list[Path]) -> list[Path]:
+    """Batch manifests one level below each root (e.g. IMAGES/<year>/<batch>/manifest.json)"""
+    manifests = []
+    for root in roots:
+        try:
+            batch_dirs = [entry for entry in os.scandir(root) if entry.is_dir()]
+        except OSError:
+            continue
+        for batch_dir in batch_dirs:
+            batch_path = Path(batch_dir.path)
+            for name in (MANIFEST_FILENAME, MANIFEST_LINES_FILENAME):
+                if (batch_path / name).is_file():
+                    manifests.append(batch_path / name)
+                    break
+    return manifests
+
+
+def collect_batch_stats(roots: list[Path], since: datetime, cache: Optional[ManifestCache] = None,
+                        slowest: int = 3) -> BatchStats:
+    """
+    Batch statistics from manifests under roots written since a time.
+
+    A batch written to several roots (images and video storage) is counted
+    once, from its most recent manifest.
+    """
+    cache = cache or ManifestCache()
+    threshold = since.timestamp()
+    batches: dict[str, ManifestTotals] = {}
+    seen = set()
+
+    for path in find_manifests(roots):
+        seen.add(str(path))
+        try:
+            st = path.stat()
+            if st.st_mtime < threshold:
+                continue
+            totals = cache.totals(path, st.st_mtime, st.st_size)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Error reading manifest {path}: {e}")
+            continue
+        previous = batches.get(totals.batch_id)
+        if previous is None or totals.mtime > previous.mtime:
+            batches[totals.batch_id] = totals
+
+    cache.prune(seen)
+    cache.save()
+
+    stats = BatchStats(batches=len(batches))
+    elapsed = timed = 0.0
+    themes: dict[str, list[float]] = {}
+    for totals in batches.values():
+        stats.prompts += totals.prompts
+        stats.successful += totals.successful
+        stats.images += totals.images
+        stats.videos += totals.videos
+        stats.bytes_transferred += totals.bytes_transferred
+        elapsed += totals.elapsed_seconds
+        timed += totals.timed_prompts
+        for theme, (seconds, count) in totals.themes.items():
+            entry = themes.setdefault(theme, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += count
+    stats.failed = stats.prompts - stats.successful
+    stats.mean_generation_seconds = elapsed / timed if timed else 0.0
+    means = [(theme, seconds / count) for theme, (seconds, count) in themes.items() if count]
+    stats.slowest_themes = sorted(means, key=lambda item: -item[1])[:slowest]
+    return stats
@@ -0,0 +1,41 @@
+"""
+Cache Files
+Atomic writes for the JSON caches and state files under ~/.arthur. Each
+writer uses its own pid-suffixed temporary file and renames it into place,
+so concurrent launchd and CLI runs never see or leave a partial file (the
+last writer wins).
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_text(path: Path, text: str):
+    """Replace path with text in one rename; raises OSError"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        tmp.write_text(text)
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_json(path: Path, data: Any, what: str = "cache", **dumps_kwargs) -> bool:
+    """
+    Replace path with data as JSON. A cache that can't be written is only
+    logged (the next run rebuilds it); returns whether it was written.
+    """
+    try:
+        atomic_write_text(path, json.dumps(data, **dumps_kwargs))
+        return True
+    except OSError as e:
+        logger.warning(f"Could not write {what} {path}: {e}")
+        return False
@@ -0,0 +1,195 @@
+"""
+Summary Collectors
+Plugin interface for the data sources behind the daily summary. Each
+collector declares a timeout and a cache policy, and all collectors run
+concurrently, so the summary takes as long as its slowest collector
+rather than the sum of them. A collector that fails or overruns its
+timeout only leaves its own section empty.
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .cache_file import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".arthur" / "collector_cache.json"
+
+STATUS_ICONS = {
+    "ok": "✅",
+    "cached": "♻️",
+    "timeout": "⏱️",
+    "error": "❌",
+}
+
+
+@dataclass
+class CollectContext:
+    """What a collection run is about"""
+    now: datetime
+    since: datetime
+    lookback_hours: int
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Collector:
+    """A data source for the summary
+
+    collect returns a dict of summary field values. Results are reused for
+    cache_ttl seconds (0 = always collect fresh).
+    """
+    name: str
+    collect: Callable[[CollectContext], dict[str, Any]]
+    timeout: float = 10.0
+    cache_ttl: float = 0.0
+
+
+@dataclass
+class CollectorResult:
+    """Outcome of one collector: ok, cached, timeout or error"""
+    name: str
+    status: str
+    seconds: float
+    values: dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("ok", "cached")
+
+    @property
+    def icon(self) -> str:
+        return STATUS_ICONS.get(self.status, "❓")
+
+
+class CollectorCache:
+    """Collector results on disk, keyed by collector and lookback period"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(collector: Collector, context: CollectContext) -> str:
+        return f"{collector.name}:{context.lookback_hours}h"
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, collector: Collector, context: CollectContext) -> Optional[dict[str, Any]]:
+        if collector.cache_ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._load().get(self.key(collector, context))
+        if entry and time.time() - entry["at"] < collector.cache_ttl:
+            return entry["values"]
+        return None
+
+    def put(self, collector: Collector, context: CollectContext, values: dict[str, Any]):
+        if collector.cache_ttl <= 0:
+            return
+        with self._lock:
+            data = self._load()
+            data[self.key(collector, context)] = {"at": time.time(), "values": values}
+            atomic_write_json(self.path, data, "collector cache", default=str)
+
+
+def _run_in_thread(collector: Collector, context: CollectContext) -> Future:
+    """Start a collector on a daemon thread, so one that hangs can't block exit"""
+    future: Future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(collector.collect(context))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, name=f"collector-{collector.name}", daemon=True).start()
+    return future
+
+
+class CollectorRegistry:
+    """Ordered set of collectors, run together"""
+
+    def __init__(self):
+        self._collectors: dict[str, Collector] = {}
+
+    def add(self, collector: Collector):
+        """Register (or replace) a collector"""
+        self._collectors[collector.name] = collector
+
+    def register(self, name: str, timeout: float = 10.0, cache_ttl: float = 0.0):
+        """Decorator form of add()"""
+        def decorator(fn: Callable[[CollectContext], dict[str, Any]]):
+            self.add(Collector(name=name, collect=fn, timeout=timeout, cache_ttl=cache_ttl))
+            return fn
+        return decorator
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._collectors)
+
+    def run(self, context: CollectContext, skip: Optional[set[str]] = None,
+            cache: Optional[CollectorCache] = None) -> list[CollectorResult]:
+        """Run every collector concurrently, each bounded by its own timeout"""
+        skip = skip or set()
+        started = time.monotonic()
+        results: dict[str, CollectorResult] = {}
+        running: dict[Future, Collector] = {}
+
+        for collector in self._collectors.values():
+            if collector.name in skip:
+                continue
+            cached = cache.get(collector, context) if cache else None
+            if cached is not None:
+                results[collector.name] = CollectorResult(collector.name, "cached", 0.0, cached)
+                continue
+            running[_run_in_thread(collector, context)] = collector
+
+        finished_at: dict[Future, float] = {}
+        pending = set(running)
+        while pending:
+            now = time.monotonic()
+            deadline = min(started + running[f].timeout for f in pending)
+            done, pending = wait(pending, timeout=max(0.0, deadline - now), return_when="FIRST_COMPLETED")
+            now = time.monotonic()
+            for future in done:
+                finished_at[future] = now
+            expired = {f for f in pending if now >= started + running[f].timeout}
+            for future in expired:
+                collector = running[future]
+                results[collector.name] = CollectorResult(
+                    collector.name, "timeout", now - started,
+                    error=f"timed out after {collector.timeout:.0f}s"
+                )
+                logger.warning(f"Collector {collector.name} timed out after {collector.timeout:.0f}s")
+            pending -= expired
+
+        for future, finished in finished_at.items():
+            collector = running[future]
+            seconds = finished - started
+            try:
+                values = future.result() or {}
+            except Exception as e:
+                logger.warning(f"Collector {collector.name} failed: {e}")
+                results[collector.name] = CollectorResult(collector.name, "error", seconds, error=str(e))
+                continue
+            results[collector.name] = CollectorResult(collector.name, "ok", seconds, values)
+            if cache:
+                cache.put(collector, context, values)
+
+        return [results[name] for name in self._collectors if name in results]
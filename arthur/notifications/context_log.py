@@ -0,0 +1,147 @@
+"""
+Incremental Context Log Parsing
+Items (completed tasks, decisions) extracted from append-mostly markdown
+files such as progress.md and decisions.md, each tagged with the time it
+first appeared.
+
+The parser remembers how far into each file it has read and a hash of the
+last 64 KiB before that point. While that window still matches, only the
+appended lines are read and parsed, so parsing cost stays constant as the
+file grows (an unchanged file isn't even opened). If the file shrank, was
+replaced, or was edited within the window (e.g. a recent checkbox ticked
+in place), it is re-parsed once. Edits further up are not noticed until
+the file is otherwise rewritten. Items seen before keep their original
+time.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from .cache_file import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = Path.home() / ".arthur" / "context_logs.json"
+
+# Item texts are kept this long; older ones are only remembered by digest
+RETENTION_SECONDS = 30 * 86400
+
+# Bytes before the read offset that must be unchanged for an append-only read
+WINDOW_BYTES = 64 * 1024
+
+_state_lock = threading.Lock()
+
+
+@dataclass
+class LogItem:
+    """An extracted item and when it was first seen (0 = already there when indexing started)"""
+    text: str
+    first_seen: float
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def _window(f, offset: int) -> bytes:
+    """The WINDOW_BYTES of an open file ending at offset"""
+    start = max(0, offset - WINDOW_BYTES)
+    f.seek(start)
+    return f.read(offset - start)
+
+
+def _window_hash(window: bytes) -> str:
+    return hashlib.sha1(window).hexdigest()
+
+
+class IncrementalLogParser:
+    """Extracts items from the lines appended to a file since the last read"""
+
+    def __init__(self, path: Path, extract: Callable[[str], list[str]],
+                 state_path: Path = DEFAULT_STATE_PATH):
+        """
+        Args:
+            path: File to follow
+            extract: Returns the items found in a block of complete lines
+            state_path: Where offsets, hashes and item times are kept
+        """
+        self.path = Path(path)
+        self.extract = extract
+        self.state_path = Path(state_path)
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            return json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, state: dict[str, dict]):
+        atomic_write_json(self.state_path, state, "context log state")
+
+    def refresh(self) -> list[LogItem]:
+        """Read what was appended since the last refresh; returns all retained items"""
+        key = str(self.path)
+        with _state_lock:
+            state = self._load()
+            entry: Optional[dict] = state.get(key)
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                return []
+
+            if entry is not None and (entry["inode"], entry["size"], entry["mtime"]) == (
+                    st.st_ino, st.st_size, st.st_mtime):
+                return [LogItem(**item) for item in entry["items"]]
+
+            with open(self.path, "rb") as f:
+                appended = False
+                window = b""
+                if entry is not None and entry["inode"] == st.st_ino and st.st_size >= entry["offset"]:
+                    window = _window(f, entry["offset"])
+                    appended = _window_hash(window) == entry.get("window_hash")
+                if not appended:
+                    window = b""
+                start = entry["offset"] if appended else 0
+                f.seek(start)
+                data = f.read()
+            # A trailing partial line is left for the next read
+            end = data.rfind(b"\n") + 1
+            offset = start + end
+            window = (window + data[max(0, end - WINDOW_BYTES):end])[-WINDOW_BYTES:]
+
+            # New items appeared by the file's mtime; the first index has no history
+            when = st.st_mtime if entry is not None else 0.0
+            known: dict[str, float] = entry["known"] if entry else {}
+            items = [LogItem(**item) for item in entry["items"]] if appended else []
+            for text in self.extract(data[:end].decode("utf-8", errors="replace")):
+                items.append(LogItem(text, known.setdefault(_digest(text), when)))
+
+            cutoff = time.time() - RETENTION_SECONDS
+            items = [item for item in items if item.first_seen >= cutoff]
+            if not appended and entry is not None:
+                logger.info(f"{self.path.name} changed above the last read offset; re-parsed")
+
+            state[key] = {
+                "inode": st.st_ino,
+                "size": st.st_size,
+                "mtime": st.st_mtime,
+                "offset": offset,
+                "window_hash": _window_hash(window),
+                "known": known,
+                "items": [vars(item) for item in items],
+            }
+            self._save(state)
+        return items
+
+    def items_since(self, since: datetime) -> list[LogItem]:
+        """Items that first appeared at or after since, in file order"""
+        threshold = since.timestamp()
+        return [item for item in self.refresh() if item.first_seen >= threshold]
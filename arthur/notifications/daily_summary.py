@@ -6,19 +6,29 @@ Reports from AIR node to infrastructure status
 
 import os
 import re
-import subprocess
 import socket
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 import logging
 
+from ..config import GIT, INFRA
+from .batch_stats import BatchStats, collect_batch_stats
+from .context_log import IncrementalLogParser
+from .collectors import CollectContext, CollectorCache, CollectorRegistry
+from .git_activity import GitIndex, RepoActivity, collect_git_activity
+from .infra_probe import ProbeCache, probe_hosts
+from .media_inventory import shared_inventory
+from .summary_history import MetricTrend
+from .system_metrics import SystemMetrics, get_provider
+
 logger = logging.getLogger(__name__)
 
-# Node identification
-NODE_ID = "AIR"
-NODE_ROLE = "Development & Automation Controller"
+# Node identification (set ARTHUR_NODE_ID / ARTHUR_NODE_ROLE on the other nodes)
+NODE_ID = os.getenv("ARTHUR_NODE_ID", "AIR")
+NODE_ROLE = os.getenv("ARTHUR_NODE_ROLE", "Development & Automation Controller")
 
 # Project paths
 PROJECT_ROOT = Path("/Users/arthurdell/ARTHUR")
@@ -38,6 +48,8 @@ class DailySummary:
     """Data structure for daily work summary"""
     date: datetime
     node_id: str = NODE_ID
+    node_role: str = NODE_ROLE
+    hostname: str = field(default_factory=socket.gethostname)
     images_created: int = 0
     images_size_mb: float = 0.0
     videos_created: int = 0
@@ -46,204 +58,134 @@ class DailySummary:
     tasks_completed: list[str] = field(default_factory=list)
     decisions_made: list[str] = field(default_factory=list)
     infrastructure_status: dict[str, str] = field(default_factory=dict)
+    infrastructure_details: dict[str, str] = field(default_factory=dict)
     commits: list[str] = field(default_factory=list)
     commit_count: int = 0
+    lines_added: int = 0
+    lines_deleted: int = 0
+    files_touched: int = 0
+    repo_commits: dict[str, int] = field(default_factory=dict)
     mj_batches_run: int = 0
+    mj_prompts: int = 0
+    mj_prompts_failed: int = 0
+    mj_success_rate: float = 0.0
+    mj_generation_seconds_mean: float = 0.0
+    mj_bytes_transferred: int = 0
+    mj_slowest_themes: list[str] = field(default_factory=list)
     # AIR node metrics
     air_uptime_hours: float = 0.0
     air_disk_free_gb: float = 0.0
     air_memory_used_pct: float = 0.0
+    air_swap_used_pct: float = 0.0
+    air_load: list[float] = field(default_factory=list)  # 1, 5 and 15 minute averages
+    air_cpu_count: int = 0
+    # How long each collector took, and those that failed or timed out
+    collector_seconds: dict[str, float] = field(default_factory=dict)
+    collector_issues: dict[str, str] = field(default_factory=dict)
+    collect_seconds: float = 0.0
 
 
 def _get_files_created_since(directory: Path, since: datetime, extensions: list[str]) -> tuple[int, float]:
-    """Count files created since a given time"""
+    """Count files created since a given time
+
+    Served from the media inventory, which is refreshed incrementally (only
+    directories that changed since the last run are re-listed).
+    """
     if not directory.exists():
         return 0, 0.0
 
-    count = 0
-    total_size = 0
-
+    inventory = shared_inventory()
     try:
-        # Walk directory tree for nested year/batch folders
-        for root, dirs, files in os.walk(directory):
-            for f in files:
-                filepath = Path(root) / f
-                if filepath.suffix.lower() in extensions:
-                    try:
-                        mtime = datetime.fromtimestamp(filepath.stat().st_mtime)
-                        if mtime >= since:
-                            count += 1
-                            total_size += filepath.stat().st_size
-                    except (OSError, PermissionError):
-                        continue
+        inventory.refresh(directory)
     except Exception as e:
         logger.warning(f"Error scanning {directory}: {e}")
 
+    count, total_size = inventory.created_since(directory, since, extensions=extensions)
     return count, total_size / (1024 * 1024)
 
 
-def _parse_progress_file(since: datetime) -> list[str]:
-    """Extract completed tasks from progress.md"""
-    progress_file = CONTEXT_DIR / "progress.md"
-    if not progress_file.exists():
-        return []
-
+def _extract_tasks(text: str) -> list[str]:
+    """Completed checkboxes: - [x] Task description"""
     tasks = []
-    try:
-        content = progress_file.read_text()
-        # Look for completed checkboxes: - [x] Task description
-        for match in re.finditer(r'-\s*\[x\]\s*(.+)', content, re.IGNORECASE):
-            task = match.group(1).strip()
-            if task and len(task) > 3:
-                tasks.append(task[:100])
-    except Exception as e:
-        logger.warning(f"Error parsing progress.md: {e}")
-
-    return tasks[:10]
+    for match in re.finditer(r'-\s*\[x\]\s*(.+)', text, re.IGNORECASE):
+        task = match.group(1).strip()
+        if task and len(task) > 3:
+            tasks.append(task[:100])
+    return tasks
 
 
-def _parse_decisions_file(since: datetime) -> list[str]:
-    """Extract recent decisions from decisions.md"""
-    decisions_file = CONTEXT_DIR / "decisions.md"
-    if not decisions_file.exists():
-        return []
-
+def _extract_decisions(text: str) -> list[str]:
+    """Decision headers or bold bullet points"""
     decisions = []
-    try:
-        content = decisions_file.read_text()
-        # Look for decision headers or bullet points
-        for match in re.finditer(r'##\s*(.+)|^\s*[-*]\s*\*\*(.+?)\*\*', content, re.MULTILINE):
-            decision = (match.group(1) or match.group(2) or "").strip()
-            if decision and len(decision) > 5 and not decision.startswith('#'):
-                decisions.append(decision[:80])
-    except Exception as e:
-        logger.warning(f"Error parsing decisions.md: {e}")
+    for match in re.finditer(r'##\s*(.+)|^\s*[-*]\s*\*\*(.+?)\*\*', text, re.MULTILINE):
+        decision = (match.group(1) or match.group(2) or "").strip()
+        if decision and len(decision) > 5 and not decision.startswith('#'):
+            decisions.append(decision[:80])
+    return decisions
 
-    return decisions[:5]
 
+# Only content appended since the last run is parsed; items carry when they first appeared
+_PROGRESS_LOG = IncrementalLogParser(CONTEXT_DIR / "progress.md", _extract_tasks)
+_DECISIONS_LOG = IncrementalLogParser(CONTEXT_DIR / "decisions.md", _extract_decisions)
 
-def _get_git_commits(since: datetime) -> tuple[list[str], int]:
-    """Get git commits from last 24 hours"""
-    commits = []
-    count = 0
 
+def _parse_progress_file(since: datetime) -> list[str]:
+    """Tasks completed in progress.md since a given time (most recent 10)"""
     try:
-        result = subprocess.run(
-            ["git", "log", "--since=24 hours ago", "--oneline", "--no-merges"],
-            cwd=PROJECT_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-
-        if result.returncode == 0 and result.stdout.strip():
-            lines = result.stdout.strip().split('\n')
-            count = len(lines)
-            for line in lines[:5]:
-                parts = line.split(' ', 1)
-                if len(parts) > 1:
-                    commits.append(parts[1][:60])
+        tasks = _PROGRESS_LOG.items_since(since)
+    except Exception as e:
+        logger.warning(f"Error parsing progress.md: {e}")
+        return []
+    return [task.text for task in tasks[-10:]]
 
+
+def _parse_decisions_file(since: datetime) -> list[str]:
+    """Decisions added to decisions.md since a given time (most recent 5)"""
+    try:
+        decisions = _DECISIONS_LOG.items_since(since)
     except Exception as e:
-        logger.warning(f"Error getting git commits: {e}")
+        logger.warning(f"Error parsing decisions.md: {e}")
+        return []
+    return [decision.text for decision in decisions[-5:]]
 
-    return commits, count
 
+def _get_git_activity(since: datetime) -> list[RepoActivity]:
+    """Commits, lines changed and files touched per repo since a given time
 
-def _get_air_metrics() -> tuple[float, float, float]:
-    """Get AIR node system metrics: uptime, disk free, memory used"""
-    uptime_hours = 0.0
-    disk_free_gb = 0.0
-    memory_used_pct = 0.0
+    Each repo's cursor is brought up to date with one `git log --numstat`
+    for only the commits since the last run; repos are read in parallel.
+    """
+    index = GitIndex(GIT.index_path, retention_days=GIT.retention_days)
+    return collect_git_activity(GIT.repos, since, index=index, timeout=GIT.timeout_seconds)
 
-    # Get uptime
-    try:
-        result = subprocess.run(
-            ["sysctl", "-n", "kern.boottime"],
-            capture_output=True, text=True, timeout=5
-        )
-        if result.returncode == 0:
-            # Parse: { sec = 1704567890, usec = 0 }
-            import re
-            match = re.search(r'sec\s*=\s*(\d+)', result.stdout)
-            if match:
-                boot_time = int(match.group(1))
-                uptime_hours = (datetime.now().timestamp() - boot_time) / 3600
-    except Exception as e:
-        logger.warning(f"Error getting uptime: {e}")
 
-    # Get disk free space on root volume
-    try:
-        result = subprocess.run(
-            ["df", "-g", "/"],
-            capture_output=True, text=True, timeout=5
-        )
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')
-            if len(lines) > 1:
-                parts = lines[1].split()
-                if len(parts) >= 4:
-                    disk_free_gb = float(parts[3])
-    except Exception as e:
-        logger.warning(f"Error getting disk space: {e}")
+def _get_air_metrics() -> SystemMetrics:
+    """Get AIR node system metrics: uptime, disk, memory, swap and load
 
-    # Get memory usage
-    try:
-        result = subprocess.run(
-            ["vm_stat"],
-            capture_output=True, text=True, timeout=5
-        )
-        if result.returncode == 0:
-            # Parse vm_stat output
-            lines = result.stdout.strip().split('\n')
-            stats = {}
-            for line in lines:
-                if ':' in line:
-                    key, val = line.split(':', 1)
-                    val = val.strip().rstrip('.')
-                    try:
-                        stats[key.strip()] = int(val)
-                    except ValueError:
-                        pass
-
-            page_size = 16384  # Apple Silicon default
-            free = stats.get('Pages free', 0) * page_size
-            active = stats.get('Pages active', 0) * page_size
-            inactive = stats.get('Pages inactive', 0) * page_size
-            wired = stats.get('Pages wired down', 0) * page_size
-
-            total_used = active + wired
-            total_mem = free + active + inactive + wired
-            if total_mem > 0:
-                memory_used_pct = (total_used / total_mem) * 100
-    except Exception as e:
-        logger.warning(f"Error getting memory stats: {e}")
+    Read natively (statvfs, sysctl / /proc), without spawning processes.
+    """
+    return get_provider().sample()
 
-    return uptime_hours, disk_free_gb, memory_used_pct
 
+def _check_infrastructure(refresh: bool = False) -> tuple[dict[str, str], dict[str, str]]:
+    """Check infrastructure health status - AIR node plus remotes
 
-def _check_infrastructure() -> dict[str, str]:
-    """Check infrastructure health status - AIR node plus remotes"""
+    Returns (status icon, detail line) per node. Remote hosts are probed in
+    parallel under one deadline; results newer than the cache TTL are reused.
+    """
     status = {}
+    details = {}
 
     # AIR node is always the source - mark it explicitly
     status["AIR"] = "✅"
 
     # Check remote hosts via SSH
-    hosts = ["alpha", "beta", "gamma"]
-    for host in hosts:
-        try:
-            result = subprocess.run(
-                ["ssh", "-o", "ConnectTimeout=5", "-o", "BatchMode=yes", host, "echo ok"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            status[host.upper()] = "✅" if result.returncode == 0 else "❌"
-        except subprocess.TimeoutExpired:
-            status[host.upper()] = "⏱️"
-        except Exception:
-            status[host.upper()] = "❓"
+    cache = ProbeCache(INFRA.cache_path, ttl_seconds=INFRA.cache_ttl_seconds)
+    probes = probe_hosts(INFRA.hosts, deadline=INFRA.deadline_seconds, cache=cache, refresh=refresh,
+                         disk_path=INFRA.disk_path, disk_warn_pct=INFRA.disk_warn_pct)
+    for host, probe in probes.items():
+        status[host.upper()] = probe.icon
+        details[host.upper()] = probe.describe()
 
     # Check mounted volumes
     if REMOTE_IMAGES_BASE.exists():
@@ -251,95 +193,153 @@ def _check_infrastructure() -> dict[str, str]:
     else:
         status["STUDIO"] = "❌"
 
-    return status
+    return status, details
+
 
+def _get_batch_stats(since: datetime) -> BatchStats:
+    """MJ batch statistics from the manifests written in the time period
 
-def _count_mj_batches(since: datetime) -> int:
-    """Count MJ batch manifests created in the time period"""
-    count = 0
+    Batches are found under both image and video storage; manifests are
+    only parsed again when they changed since the last run.
+    """
     year = datetime.now().strftime('%Y')
+    return collect_batch_stats([REMOTE_IMAGES_BASE / year, REMOTE_VIDEO_BASE / year], since)
 
-    # Check remote images path for batch manifests
-    batches_dir = REMOTE_IMAGES_BASE / year
-    if batches_dir.exists():
-        try:
-            for batch_dir in batches_dir.iterdir():
-                if batch_dir.is_dir():
-                    manifest = batch_dir / "manifest.json"
-                    if manifest.exists():
-                        mtime = datetime.fromtimestamp(manifest.stat().st_mtime)
-                        if mtime >= since:
-                            count += 1
-        except Exception as e:
-            logger.warning(f"Error counting batches: {e}")
-
-    return count
-
-
-def generate_daily_summary(lookback_hours: int = 24, check_infrastructure: bool = True) -> DailySummary:
-    """Generate summary of work performed from AIR node"""
-    now = datetime.now()
-    since = now - timedelta(hours=lookback_hours)
-    year = now.strftime('%Y')
 
-    summary = DailySummary(date=now, node_id=NODE_ID)
+# Data sources behind the summary; more can be registered with COLLECTORS.add()
+COLLECTORS = CollectorRegistry()
 
-    # Get AIR node metrics
-    summary.air_uptime_hours, summary.air_disk_free_gb, summary.air_memory_used_pct = _get_air_metrics()
 
-    # Count images from remote storage
-    images_dir = REMOTE_IMAGES_BASE / year
-    summary.images_created, summary.images_size_mb = _get_files_created_since(
-        images_dir, since, ['.png', '.jpg', '.jpeg', '.webp']
-    )
+@COLLECTORS.register("air_metrics", timeout=10, cache_ttl=60)
+def _collect_air_metrics(ctx: CollectContext) -> dict:
+    metrics = _get_air_metrics()
+    return {
+        "air_uptime_hours": metrics.uptime_hours,
+        "air_disk_free_gb": metrics.disk_free_gb,
+        "air_memory_used_pct": metrics.memory_used_pct,
+        "air_swap_used_pct": metrics.swap_used_pct,
+        "air_load": [metrics.load_1m, metrics.load_5m, metrics.load_15m],
+        "air_cpu_count": metrics.cpu_count,
+    }
 
+
+@COLLECTORS.register("images", timeout=60)
+def _collect_images(ctx: CollectContext) -> dict:
+    extensions = ['.png', '.jpg', '.jpeg', '.webp']
+    # Count images from remote storage
+    count, size_mb = _get_files_created_since(REMOTE_IMAGES_BASE / ctx.now.strftime('%Y'), ctx.since, extensions)
     # Also check local downloads if remote not available
-    if summary.images_created == 0 and LOCAL_DOWNLOADS.exists():
-        summary.images_created, summary.images_size_mb = _get_files_created_since(
-            LOCAL_DOWNLOADS, since, ['.png', '.jpg', '.jpeg', '.webp']
-        )
-
-    # Count videos
-    videos_dir = REMOTE_VIDEO_BASE / year
-    summary.videos_created, _ = _get_files_created_since(
-        videos_dir, since, ['.mp4', '.mov', '.webm']
-    )
-    # Estimate 10s per video average
-    summary.videos_duration_sec = summary.videos_created * 10
+    if count == 0 and LOCAL_DOWNLOADS.exists():
+        count, size_mb = _get_files_created_since(LOCAL_DOWNLOADS, ctx.since, extensions)
+    return {"images_created": count, "images_size_mb": size_mb}
 
-    # Count MJ batches
-    summary.mj_batches_run = _count_mj_batches(since)
 
-    # Parse state files
-    summary.tasks_completed = _parse_progress_file(since)
-    summary.decisions_made = _parse_decisions_file(since)
+@COLLECTORS.register("videos", timeout=60)
+def _collect_videos(ctx: CollectContext) -> dict:
+    count, _ = _get_files_created_since(REMOTE_VIDEO_BASE / ctx.now.strftime('%Y'), ctx.since,
+                                        ['.mp4', '.mov', '.webm'])
+    # Estimate 10s per video average
+    return {"videos_created": count, "videos_duration_sec": count * 10}
+
+
+@COLLECTORS.register("mj_batches", timeout=30)
+def _collect_mj_batches(ctx: CollectContext) -> dict:
+    stats = _get_batch_stats(ctx.since)
+    return {
+        "mj_batches_run": stats.batches,
+        "mj_prompts": stats.prompts,
+        "mj_prompts_failed": stats.failed,
+        "mj_success_rate": stats.success_rate,
+        "mj_generation_seconds_mean": stats.mean_generation_seconds,
+        "mj_bytes_transferred": stats.bytes_transferred,
+        "mj_slowest_themes": [f"{theme} ({seconds:.0f}s)" for theme, seconds in stats.slowest_themes],
+    }
+
+
+@COLLECTORS.register("progress", timeout=5)
+def _collect_progress(ctx: CollectContext) -> dict:
+    return {"tasks_completed": _parse_progress_file(ctx.since)}
+
+
+@COLLECTORS.register("decisions", timeout=5)
+def _collect_decisions(ctx: CollectContext) -> dict:
+    return {"decisions_made": _parse_decisions_file(ctx.since)}
+
+
+@COLLECTORS.register("git", timeout=GIT.timeout_seconds + 5, cache_ttl=300)
+def _collect_git(ctx: CollectContext) -> dict:
+    activities = _get_git_activity(ctx.since)
+    if activities and all(a.error for a in activities):
+        raise RuntimeError(activities[0].error)
+    commits = sorted((c for a in activities for c in a.commits), key=lambda c: -c.timestamp)
+    return {
+        "commits": [c.subject[:60] for c in commits[:5]],
+        "commit_count": len(commits),
+        "lines_added": sum(a.insertions for a in activities),
+        "lines_deleted": sum(a.deletions for a in activities),
+        "files_touched": sum(len(a.files_touched) for a in activities),
+        "repo_commits": {a.name: len(a.commits) for a in activities if not a.error or a.commits},
+    }
+
+
+@COLLECTORS.register("infrastructure", timeout=INFRA.deadline_seconds + 5)
+def _collect_infrastructure(ctx: CollectContext) -> dict:
+    status, details = _check_infrastructure(refresh=ctx.options.get("refresh_infrastructure", False))
+    return {"infrastructure_status": status, "infrastructure_details": details}
+
+
+def generate_daily_summary(lookback_hours: int = 24, check_infrastructure: bool = True,
+                           refresh_infrastructure: bool = False) -> DailySummary:
+    """Generate summary of work performed from AIR node
+
+    Collectors run concurrently; one that fails or times out leaves its
+    section empty and is listed in the summary. refresh_infrastructure
+    probes the remote hosts even if cached results are still fresh.
+    """
+    now = datetime.now()
+    context = CollectContext(
+        now=now,
+        since=now - timedelta(hours=lookback_hours),
+        lookback_hours=lookback_hours,
+        options={"refresh_infrastructure": refresh_infrastructure}
+    )
 
-    # Git commits
-    summary.commits, summary.commit_count = _get_git_commits(since)
+    summary = DailySummary(date=now, node_id=NODE_ID)
 
-    # Infrastructure status
-    if check_infrastructure:
-        summary.infrastructure_status = _check_infrastructure()
+    started = time.monotonic()
+    skip = set() if check_infrastructure else {"infrastructure"}
+    for result in COLLECTORS.run(context, skip=skip, cache=CollectorCache()):
+        summary.collector_seconds[result.name] = result.seconds
+        if result.ok:
+            for name, value in result.values.items():
+                setattr(summary, name, value)
+        else:
+            summary.collector_issues[result.name] = result.error or result.status
+    summary.collect_seconds = time.monotonic() - started
 
     return summary
 
 
-def format_email_body(summary: DailySummary) -> str:
-    """Format DailySummary as email body with AIR node branding"""
-    hostname = socket.gethostname()
+def format_email_body(summary: DailySummary, trends: Optional[list[MetricTrend]] = None) -> str:
+    """Format DailySummary as email body with AIR node branding
+
+    trends (from SummaryHistory.trends) adds a week-over-week section.
+    """
     date_str = summary.date.strftime("%Y-%m-%d")
     time_str = summary.date.strftime("%H:%M")
 
     lines = [
         "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        f"[{NODE_ID}] ARTHUR Daily Summary - {date_str}",
-        f"Source: {NODE_ID} Node ({NODE_ROLE})",
+        f"[{summary.node_id}] ARTHUR Daily Summary - {date_str}",
+        f"Source: {summary.node_id} Node ({summary.node_role})",
         "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
         "",
-        f"{NODE_ID} NODE STATUS",
+        f"{summary.node_id} NODE STATUS",
         f"  Uptime: {summary.air_uptime_hours:.1f} hours",
         f"  Disk Free: {summary.air_disk_free_gb:.0f} GB",
         f"  Memory Used: {summary.air_memory_used_pct:.1f}%",
+        f"  Swap Used: {summary.air_swap_used_pct:.1f}%",
+        f"  Load: {' / '.join(f'{x:.2f}' for x in summary.air_load) or 'n/a'} ({summary.air_cpu_count} CPUs)",
         "",
         "PRODUCTION METRICS (Last 24 Hours)",
         f"  Images: {summary.images_created} created ({summary.images_size_mb:.1f}MB)",
@@ -348,6 +348,16 @@ def format_email_body(summary: DailySummary) -> str:
         "",
     ]
 
+    if summary.mj_prompts:
+        lines.append("MJ BATCHES")
+        lines.append(f"  Prompts: {summary.mj_prompts} ({summary.mj_success_rate:.0f}% succeeded, "
+                     f"{summary.mj_prompts_failed} failed)")
+        lines.append(f"  Mean generation: {summary.mj_generation_seconds_mean:.0f}s per prompt")
+        lines.append(f"  Transferred: {summary.mj_bytes_transferred / (1024 * 1024):.1f}MB")
+        if summary.mj_slowest_themes:
+            lines.append(f"  Slowest themes: {', '.join(summary.mj_slowest_themes)}")
+        lines.append("")
+
     if summary.tasks_completed:
         lines.append("WORK COMPLETED")
         for task in summary.tasks_completed[:5]:
@@ -368,17 +378,38 @@ def format_email_body(summary: DailySummary) -> str:
         # Split into rows of 3
         for i in range(0, len(status_parts), 3):
             lines.append("  " + "  ".join(status_parts[i:i+3]))
+        for name, detail in summary.infrastructure_details.items():
+            if detail:
+                lines.append(f"  {name}: {detail}")
         lines.append("")
 
     if summary.commit_count > 0:
         lines.append("CODE CHANGES")
-        lines.append(f"  {summary.commit_count} commits")
+        lines.append(f"  {summary.commit_count} commits, +{summary.lines_added}/-{summary.lines_deleted} lines, "
+                     f"{summary.files_touched} files")
+        if len(summary.repo_commits) > 1:
+            lines.append("  " + ", ".join(f"{repo}: {count}" for repo, count in summary.repo_commits.items()))
         for commit in summary.commits[:3]:
             lines.append(f"    - {commit}")
         lines.append("")
 
+    if trends and any(trend.days for trend in trends):
+        lines.append("TRENDS (Week over Week)")
+        for trend in trends:
+            lines.append(f"  {trend.describe()}")
+        lines.append("")
+
+    if summary.collector_seconds:
+        lines.append(f"COLLECTION ({summary.collect_seconds:.1f}s)")
+        timing_parts = [f"{name} {seconds:.1f}s" for name, seconds in summary.collector_seconds.items()]
+        for i in range(0, len(timing_parts), 4):
+            lines.append("  " + "  ".join(timing_parts[i:i+4]))
+        for name, issue in summary.collector_issues.items():
+            lines.append(f"  ⚠️ {name}: {issue} (section incomplete)")
+        lines.append("")
+
     lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    lines.append(f"Generated at {time_str} from {NODE_ID} ({hostname})")
+    lines.append(f"Generated at {time_str} from {summary.node_id} ({summary.hostname})")
     lines.append("ARTHUR - Autonomous Runtime Through Unified Resources")
 
     return "\n".join(lines)
@@ -399,4 +430,4 @@ def format_email_subject(summary: DailySummary) -> str:
 
     activity_str = ", ".join(activities) if activities else "No activity"
 
-    return f"[{NODE_ID}] ARTHUR Daily - {date_str} ({activity_str})"
+    return f"[{summary.node_id}] ARTHUR Daily - {date_str} ({activity_str})"
@@ -0,0 +1,206 @@
+"""
+Fleet Summary
+Each node publishes its DailySummary as a compact JSON document; the
+aggregator fetches every node's document concurrently under one deadline
+and sends a single fleet report. Nodes that don't answer in time, or whose
+latest summary is too old, are reported as stale rather than holding up
+the report.
+"""
+
+import json
+import logging
+import socket
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from urllib.request import urlopen
+
+from .cache_file import atomic_write_text
+from .daily_summary import DailySummary
+from .ssh import ssh_command
+
+logger = logging.getLogger(__name__)
+
+STATUS_ICONS = {
+    "ok": "✅",
+    "stale": "⏱️",
+    "error": "❌",
+}
+
+_SUMMARY_FIELDS = {f.name for f in fields(DailySummary)}
+
+
+def summary_to_json(summary: DailySummary) -> str:
+    """Compact JSON document for a summary"""
+    data = asdict(summary)
+    data["date"] = summary.date.isoformat()
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def summary_from_dict(data: dict) -> DailySummary:
+    """DailySummary from a published document; fields unknown to either side are dropped or defaulted"""
+    values = {key: value for key, value in data.items() if key in _SUMMARY_FIELDS}
+    values["date"] = datetime.fromisoformat(values["date"])
+    return DailySummary(**values)
+
+
+def publish_summary(summary: DailySummary, path: Path) -> Path:
+    """Write this node's summary where the aggregator will fetch it"""
+    path = Path(path)
+    atomic_write_text(path, summary_to_json(summary))
+    return path
+
+
+@dataclass
+class NodeReport:
+    """One node's contribution to the fleet report"""
+    node_id: str
+    source: str
+    status: str  # ok, stale, error
+    summary: Optional[DailySummary] = None
+    age_hours: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def icon(self) -> str:
+        return STATUS_ICONS.get(self.status, "❓")
+
+
+def fetch_summary(source: str, timeout: float, remote_path: str) -> DailySummary:
+    """
+    Fetch a published summary.
+
+    source is an http(s) URL, a local file path, or an SSH host (the
+    document is read from remote_path over the multiplexed connection).
+    """
+    if source.startswith(("http://", "https://")):
+        with urlopen(source, timeout=timeout) as response:
+            document = response.read().decode("utf-8")
+    elif "/" in source:
+        document = Path(source).read_text()
+    else:
+        result = subprocess.run(ssh_command(source, connect_timeout=min(5.0, timeout))
+                                + [f"cat {remote_path}"],
+                                capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().split("\n")[-1] or "unreachable")
+        document = result.stdout
+    return summary_from_dict(json.loads(document))
+
+
+def collect_fleet(nodes: dict[str, str], deadline: float = 10.0, stale_after_hours: float = 26.0,
+                  remote_path: str = ".arthur/summaries/latest.json",
+                  local: Optional[DailySummary] = None) -> list[NodeReport]:
+    """
+    Fetch every node's summary concurrently; the call takes at most about deadline seconds.
+
+    local, if given, is used for its own node instead of fetching it.
+    """
+    reports: dict[str, NodeReport] = {}
+    pending = dict(nodes)
+    if local is not None and local.node_id in pending:
+        reports[local.node_id] = NodeReport(local.node_id, "local", "ok", local, age_hours=0.0)
+        del pending[local.node_id]
+
+    if pending:
+        pool = ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="fleet")
+        # Each fetch may run slightly past the deadline, so the deadline decides what is stale
+        futures = {pool.submit(fetch_summary, source, deadline + 1, remote_path): node_id
+                   for node_id, source in pending.items()}
+        done, not_done = wait(futures, timeout=deadline)
+        now = datetime.now()
+        for future in done:
+            node_id = futures[future]
+            try:
+                summary = future.result()
+            except (socket.timeout, subprocess.TimeoutExpired):
+                reports[node_id] = NodeReport(node_id, pending[node_id], "stale",
+                                              error=f"no summary within {deadline:.0f}s")
+                continue
+            except Exception as e:
+                reports[node_id] = NodeReport(node_id, pending[node_id], "error", error=str(e))
+                continue
+            age = (now - summary.date).total_seconds() / 3600
+            status = "stale" if age > stale_after_hours else "ok"
+            error = f"latest summary is {age:.0f}h old" if status == "stale" else None
+            reports[node_id] = NodeReport(node_id, pending[node_id], status, summary, age, error)
+        for future in not_done:
+            node_id = futures[future]
+            reports[node_id] = NodeReport(node_id, pending[node_id], "stale",
+                                          error=f"no summary within {deadline:.0f}s")
+        # Fetches past the deadline end with their own timeouts
+        pool.shutdown(wait=False)
+
+    for report in reports.values():
+        if report.status != "ok":
+            logger.warning(f"Fleet node {report.node_id}: {report.status} ({report.error})")
+    return [reports[node_id] for node_id in nodes if node_id in reports]
+
+
+def format_fleet_subject(reports: list[NodeReport], date: Optional[datetime] = None) -> str:
+    date_str = (date or datetime.now()).strftime("%Y-%m-%d")
+    summaries = [r.summary for r in reports if r.status == "ok"]
+    activities = [f"{len(summaries)}/{len(reports)} nodes"]
+    images = sum(s.images_created for s in summaries)
+    videos = sum(s.videos_created for s in summaries)
+    commits = sum(s.commit_count for s in summaries)
+    if images:
+        activities.append(f"{images} imgs")
+    if videos:
+        activities.append(f"{videos} vids")
+    if commits:
+        activities.append(f"{commits} commits")
+    return f"[FLEET] ARTHUR Daily - {date_str} ({', '.join(activities)})"
+
+
+def format_fleet_body(reports: list[NodeReport], date: Optional[datetime] = None) -> str:
+    """One consolidated report: fleet totals, then a block per node"""
+    date = date or datetime.now()
+    ok = [r.summary for r in reports if r.status == "ok"]
+
+    lines = [
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"[FLEET] ARTHUR Daily Summary - {date.strftime('%Y-%m-%d')}",
+        f"Nodes reporting: {len(ok)}/{len(reports)}",
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        "",
+        "FLEET TOTALS (Last 24 Hours)",
+        f"  Images: {sum(s.images_created for s in ok)} created "
+        f"({sum(s.images_size_mb for s in ok):.1f}MB)",
+        f"  Videos: {sum(s.videos_created for s in ok)} generated",
+        f"  MJ Batches: {sum(s.mj_batches_run for s in ok)} completed",
+        f"  Commits: {sum(s.commit_count for s in ok)} "
+        f"(+{sum(s.lines_added for s in ok)}/-{sum(s.lines_deleted for s in ok)} lines)",
+        "",
+        "NODES",
+    ]
+    for report in reports:
+        s = report.summary
+        if s is None:
+            lines.append(f"  {report.icon} {report.node_id}: {report.error}")
+            continue
+        age = f", {report.error}" if report.error else ""
+        lines.append(f"  {report.icon} {report.node_id} ({s.node_role}, {s.hostname}{age})")
+        lines.append(f"      Images {s.images_created}, videos {s.videos_created}, "
+                     f"batches {s.mj_batches_run}, commits {s.commit_count}")
+        load = f"{s.air_load[0]:.2f}" if s.air_load else "n/a"
+        lines.append(f"      Disk free {s.air_disk_free_gb:.0f} GB, memory {s.air_memory_used_pct:.0f}%, "
+                     f"load {load}, up {s.air_uptime_hours:.0f}h")
+        for name, issue in s.collector_issues.items():
+            lines.append(f"      ⚠️ {name}: {issue}")
+
+    tasks = [(r.node_id, task) for r in reports if r.status == "ok" for task in r.summary.tasks_completed]
+    if tasks:
+        lines.append("")
+        lines.append("WORK COMPLETED")
+        for node_id, task in tasks[:10]:
+            lines.append(f"  [x] [{node_id}] {task}")
+
+    lines.append("")
+    lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    lines.append(f"Generated at {date.strftime('%H:%M')} on {socket.gethostname()}")
+    lines.append("ARTHUR - Autonomous Runtime Through Unified Resources")
+    return "\n".join(lines)
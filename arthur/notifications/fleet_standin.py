@@ -0,0 +1,142 @@
+"""
+Fleet Stand-In
+Local stand-in for the tailnet nodes: each fake node is a separate process
+serving a published summary over HTTP, with a configurable response
+delay, summary age or failure. This exercises the fleet aggregator without
+real hosts:
+
+    python3 -m arthur.notifications.fleet_standin
+"""
+
+import multiprocessing
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .daily_summary import DailySummary
+from .fleet import collect_fleet, format_fleet_body, format_fleet_subject, summary_to_json
+
+
+def _fake_summary(node_id: str, age_hours: float, seed: int) -> DailySummary:
+    rng = random.Random(seed)
+    return DailySummary(
+        date=datetime.now() - timedelta(hours=age_hours),
+        node_id=node_id,
+        node_role="Stand-in node",
+        hostname=f"{node_id.lower()}-standin",
+        images_created=rng.randint(0, 200),
+        images_size_mb=rng.uniform(0, 2000),
+        videos_created=rng.randint(0, 20),
+        mj_batches_run=rng.randint(0, 5),
+        commit_count=rng.randint(0, 15),
+        lines_added=rng.randint(0, 2000),
+        lines_deleted=rng.randint(0, 800),
+        tasks_completed=[f"{node_id.lower()} task {i}" for i in range(rng.randint(0, 2))],
+        air_uptime_hours=rng.uniform(1, 500),
+        air_disk_free_gb=rng.uniform(50, 900),
+        air_memory_used_pct=rng.uniform(20, 90),
+        air_load=[rng.uniform(0, 4) for _ in range(3)],
+    )
+
+
+def _serve_node(node_id: str, ports, delay: float, age_hours: float, fail: bool, seed: int):
+    """Child process: serve one node's summary document until terminated"""
+    document = summary_to_json(_fake_summary(node_id, age_hours, seed)).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            if fail:
+                self.send_error(500, "stand-in failure")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(document)))
+            self.end_headers()
+            self.wfile.write(document)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    ports.put((node_id, server.server_address[1]))
+    server.serve_forever()
+
+
+class FleetStandIn:
+    """A set of fake nodes, one process each"""
+
+    def __init__(self, nodes: dict[str, dict]):
+        """
+        Args:
+            nodes: Node ID -> options: delay (seconds before answering),
+                   age_hours (how old its summary is), fail (answer HTTP 500)
+        """
+        self.nodes = nodes
+        self.sources: dict[str, str] = {}
+        self._processes: list[multiprocessing.Process] = []
+
+    def start(self, timeout: float = 10.0) -> 'FleetStandIn':
+        ports = multiprocessing.Queue()
+        for seed, (node_id, options) in enumerate(self.nodes.items()):
+            process = multiprocessing.Process(
+                target=_serve_node, name=f"standin-{node_id}", daemon=True,
+                args=(node_id, ports, options.get("delay", 0.0), options.get("age_hours", 0.0),
+                      options.get("fail", False), seed)
+            )
+            process.start()
+            self._processes.append(process)
+        for _ in self.nodes:
+            node_id, port = ports.get(timeout=timeout)
+            self.sources[node_id] = f"http://127.0.0.1:{port}/summary.json"
+        # Keep the configured node order
+        self.sources = {node_id: self.sources[node_id] for node_id in self.nodes}
+        return self
+
+    def stop(self):
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join()
+        self._processes = []
+
+    def __enter__(self) -> 'FleetStandIn':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(deadline: float = 2.0) -> int:
+    """Aggregate a stand-in fleet and check each node got the expected status"""
+    nodes = {
+        "AIR": {},
+        "ALPHA": {"delay": 0.5},
+        "BETA": {"delay": deadline + 3},  # misses the deadline
+        "GAMMA": {"age_hours": 50},  # published two days ago
+        "DELTA": {"fail": True},
+    }
+    expected = {"AIR": "ok", "ALPHA": "ok", "BETA": "stale", "GAMMA": "stale", "DELTA": "error"}
+
+    with FleetStandIn(nodes) as standin:
+        started = time.monotonic()
+        reports = collect_fleet(standin.sources, deadline=deadline)
+        elapsed = time.monotonic() - started
+
+    print(format_fleet_subject(reports))
+    print(format_fleet_body(reports))
+    print(f"\nCollected {len(reports)} nodes in {elapsed:.2f}s (deadline {deadline:.1f}s)")
+
+    failures = [f"{r.node_id}: expected {expected[r.node_id]}, got {r.status}"
+                for r in reports if r.status != expected[r.node_id]]
+    if elapsed > deadline + 1:
+        failures.append(f"aggregation took {elapsed:.1f}s, past the {deadline:.1f}s deadline")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else 2.0))
@@ -0,0 +1,223 @@
+"""
+Git Activity
+Commit counts, lines changed and files touched across ARTHUR repositories,
+local or on other nodes (over SSH).
+
+A cursor at the last-seen HEAD is kept for each repo. Every run asks git
+for just the commits since that cursor, with --numstat, in one invocation
+per repo, and the repos are read in parallel. The parsed commits are kept
+in a small index, so the day's activity is a lookup rather than a history
+walk.
+"""
+
+import json
+import logging
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .cache_file import atomic_write_json
+from .ssh import ssh_command
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = Path.home() / ".arthur" / "git_index.json"
+
+# Record and field separators that can't appear in hashes or subjects
+_RS, _FS = "\x1e", "\x1f"
+_LOG_FORMAT = "%x1e%H%x1f%P%x1f%ct%x1f%s"
+
+
+@dataclass
+class CommitRecord:
+    """One commit with its line and file counts"""
+    sha: str
+    timestamp: float
+    subject: str
+    insertions: int = 0
+    deletions: int = 0
+    files: list[str] = field(default_factory=list)
+    parents: list[str] = field(default_factory=list)
+
+    @property
+    def merge(self) -> bool:
+        return len(self.parents) > 1
+
+
+@dataclass
+class RepoActivity:
+    """A repo's commits in the reporting period"""
+    repo: str
+    commits: list[CommitRecord] = field(default_factory=list)  # newest first, merges excluded
+    new_commits: int = 0  # parsed in this run
+    error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """Short label: the repo directory, prefixed by its host if remote"""
+        host, path = _split_repo(self.repo)
+        name = Path(path).name
+        return f"{host}:{name}" if host else name
+
+    @property
+    def insertions(self) -> int:
+        return sum(c.insertions for c in self.commits)
+
+    @property
+    def deletions(self) -> int:
+        return sum(c.deletions for c in self.commits)
+
+    @property
+    def files_touched(self) -> set[str]:
+        return {path for c in self.commits for path in c.files}
+
+
+def _split_repo(repo: str) -> tuple[Optional[str], str]:
+    """(host, path) from "host:/path", or (None, path) for a local repo"""
+    host, sep, path = repo.partition(":")
+    if sep and host and "/" not in host:
+        return host, path
+    return None, repo
+
+
+def _git(repo: str, args: list[str], timeout: float) -> str:
+    """Run a git command in a local or remote repo"""
+    host, path = _split_repo(repo)
+    args = ["git", "-C", path, *args]
+    if host:
+        args = ssh_command(host, connect_timeout=min(5.0, timeout)) + [shlex.join(args)]
+    result = subprocess.run(args, capture_output=True, text=True, timeout=timeout,
+                            errors="replace")
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().split("\n")[-1] or f"git exited {result.returncode}")
+    return result.stdout
+
+
+def _git_log(repo: str, revisions: list[str], timeout: float) -> str:
+    """Run git log --numstat on a local or remote repo"""
+    return _git(repo, ["log", "--numstat", f"--format={_LOG_FORMAT}", *revisions, "--"], timeout)
+
+
+def _git_head(repo: str, timeout: float) -> str:
+    return _git(repo, ["rev-parse", "HEAD"], timeout).strip()
+
+
+def parse_log(output: str) -> list[CommitRecord]:
+    """Commits from `git log --numstat --format=<_LOG_FORMAT>` output, newest first"""
+    commits = []
+    for record in output.split(_RS):
+        if not record.strip():
+            continue
+        header, _, numstat = record.partition("\n")
+        sha, parents, timestamp, subject = header.split(_FS, 3)
+        commit = CommitRecord(sha=sha, timestamp=float(timestamp), subject=subject,
+                              parents=parents.split())
+        for line in numstat.splitlines():
+            parts = line.split("\t", 2)
+            if len(parts) != 3:
+                continue
+            added, deleted, path = parts
+            # Binary files show "-" for both counts
+            commit.insertions += int(added) if added.isdigit() else 0
+            commit.deletions += int(deleted) if deleted.isdigit() else 0
+            commit.files.append(path)
+        commits.append(commit)
+    return commits
+
+
+class GitIndex:
+    """Per-repo cursor and recent commits on disk"""
+
+    def __init__(self, path: Path = DEFAULT_INDEX_PATH, retention_days: int = 30):
+        self.path = Path(path)
+        self.retention_seconds = retention_days * 86400
+        self._lock = threading.Lock()
+        try:
+            self._data: dict[str, dict] = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self._data = {}
+
+    def update(self, repo: str, timeout: float = 10.0) -> int:
+        """Parse commits added since the repo's cursor; returns how many"""
+        with self._lock:
+            entry = self._data.get(repo, {})
+        cursor = entry.get("head")
+        known = [CommitRecord(**c) for c in entry.get("commits", [])]
+        cutoff = time.time() - self.retention_seconds
+
+        new = None
+        head = None
+        if cursor:
+            try:
+                new = parse_log(_git_log(repo, [f"{cursor}..HEAD"], timeout))
+            except RuntimeError as e:
+                logger.info(f"Git cursor for {repo} no longer valid ({e}); re-reading recent history")
+            # If the cursor is still an ancestor of HEAD, one new commit has it as parent;
+            # otherwise history was rewritten (amend, rebase, force-push)
+            if new and not any(cursor in c.parents for c in new):
+                logger.info(f"History of {repo} was rewritten; re-reading recent history")
+                new = None
+            elif new == []:
+                # Nothing new also means a reset to an ancestor of the cursor:
+                # the commits after it would otherwise stay indexed
+                head = _git_head(repo, timeout)
+                if head != cursor:
+                    logger.info(f"{repo} was reset from {cursor[:8]} to {head[:8]}; re-reading recent history")
+                    new = None
+        if new is None:
+            new = parse_log(_git_log(repo, [f"--since=@{int(cutoff)}", "HEAD"], timeout))
+            known = []
+
+        commits = [c for c in new + known if c.timestamp >= cutoff]
+        with self._lock:
+            self._data[repo] = {
+                "head": new[0].sha if new else head or cursor,
+                "updated_at": time.time(),
+                "commits": [asdict(c) for c in commits],
+            }
+        return len(new)
+
+    def commits_since(self, repo: str, since: datetime) -> list[CommitRecord]:
+        """Non-merge commits since a time, newest first"""
+        threshold = since.timestamp()
+        with self._lock:
+            entry = self._data.get(repo, {})
+        return [record for record in (CommitRecord(**c) for c in entry.get("commits", []))
+                if record.timestamp >= threshold and not record.merge]
+
+    def save(self):
+        with self._lock:
+            atomic_write_json(self.path, self._data, "git index")
+
+
+def collect_git_activity(repos: list[str], since: datetime, index: Optional[GitIndex] = None,
+                         timeout: float = 10.0) -> list[RepoActivity]:
+    """Bring every repo's cursor up to date in parallel and report commits since a time"""
+    index = index or GitIndex()
+    if not repos:
+        return []
+
+    def scan(repo: str) -> RepoActivity:
+        activity = RepoActivity(repo)
+        try:
+            activity.new_commits = index.update(repo, timeout)
+        except subprocess.TimeoutExpired:
+            activity.error = f"no answer within {timeout:.0f}s"
+        except (RuntimeError, OSError, ValueError) as e:
+            activity.error = str(e)
+        if activity.error:
+            logger.warning(f"Git activity for {repo}: {activity.error}")
+        # Commits indexed by earlier runs are still reported if this update failed
+        activity.commits = index.commits_since(repo, since)
+        return activity
+
+    with ThreadPoolExecutor(max_workers=len(repos), thread_name_prefix="git-activity") as pool:
+        activities = list(pool.map(scan, repos))
+    index.save()
+    return activities
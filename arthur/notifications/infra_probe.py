@@ -0,0 +1,205 @@
+"""
+Infrastructure Probes
+Parallel SSH health checks of remote nodes: reachability, latency, load
+average and disk, under one overall deadline, with a TTL cache shared by
+summary runs and dashboards
+"""
+
+import json
+import logging
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from .cache_file import atomic_write_json
+from .ssh import ssh_command
+
+logger = logging.getLogger(__name__)
+
+STATUS_ICONS = {
+    "ok": "✅",
+    "warn": "⚠️",
+    "down": "❌",
+    "timeout": "⏱️",
+    "error": "❓",
+}
+
+_LOAD_RE = re.compile(r'load averages?:\s*([\d.]+),?\s+([\d.]+),?\s+([\d.]+)')
+
+
+@dataclass
+class HostStatus:
+    """Result of probing one host"""
+    host: str
+    status: str  # ok, warn, down, timeout, error
+    checked_at: float
+    latency_ms: Optional[float] = None
+    load: Optional[list[float]] = None  # 1, 5 and 15 minute averages
+    disk_used_pct: Optional[float] = None
+    disk_free_gb: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def icon(self) -> str:
+        return STATUS_ICONS.get(self.status, "❓")
+
+    @property
+    def healthy(self) -> bool:
+        return self.status in ("ok", "warn")
+
+    def describe(self) -> str:
+        """One-line detail for the summary email"""
+        if not self.healthy:
+            return self.error or self.status
+        parts = []
+        if self.latency_ms is not None:
+            parts.append(f"{self.latency_ms:.0f} ms")
+        if self.load:
+            parts.append("load " + "/".join(f"{x:.2f}" for x in self.load))
+        if self.disk_used_pct is not None:
+            parts.append(f"disk {self.disk_used_pct:.0f}% used ({self.disk_free_gb:.0f} GB free)")
+        return ", ".join(parts)
+
+
+def _parse_metrics(output: str) -> tuple[Optional[list[float]], Optional[float], Optional[float]]:
+    """(load averages, disk used %, disk free GB) from `uptime; df -Pk <path>` output"""
+    load = None
+    match = _LOAD_RE.search(output)
+    if match:
+        load = [float(x) for x in match.groups()]
+
+    disk_used_pct = disk_free_gb = None
+    lines = output.strip().split('\n')
+    for i, line in enumerate(lines):
+        if line.startswith("Filesystem") and i + 1 < len(lines):
+            parts = lines[i + 1].split()
+            if len(parts) >= 5:
+                try:
+                    disk_free_gb = int(parts[3]) / (1024 * 1024)
+                    disk_used_pct = float(parts[4].rstrip('%'))
+                except ValueError:
+                    pass
+            break
+
+    return load, disk_used_pct, disk_free_gb
+
+
+def probe_host(host: str, timeout: float = 8.0, disk_path: str = "/",
+               disk_warn_pct: float = 90.0) -> HostStatus:
+    """
+    Probe one host over SSH within timeout seconds.
+
+    Load and disk come from a single command; latency is a second, empty
+    command over the same (now established) master connection.
+    """
+    started = time.monotonic()
+    checked_at = time.time()
+    ssh = ssh_command(host, connect_timeout=min(5.0, timeout))
+
+    try:
+        result = subprocess.run(ssh + [f"uptime; df -Pk {disk_path}"],
+                                capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return HostStatus(host, "timeout", checked_at, error=f"no answer within {timeout:.0f}s")
+    except Exception as e:
+        return HostStatus(host, "error", checked_at, error=str(e))
+
+    if result.returncode != 0:
+        stderr = result.stderr.strip().split('\n')
+        return HostStatus(host, "down", checked_at, error=stderr[-1] if stderr[-1] else "unreachable")
+
+    load, disk_used_pct, disk_free_gb = _parse_metrics(result.stdout)
+
+    latency_ms = None
+    remaining = timeout - (time.monotonic() - started)
+    if remaining > 0:
+        ping_started = time.monotonic()
+        try:
+            ping = subprocess.run(ssh + ["true"], capture_output=True, timeout=remaining)
+            if ping.returncode == 0:
+                latency_ms = (time.monotonic() - ping_started) * 1000
+        except subprocess.TimeoutExpired:
+            pass
+
+    status = "warn" if disk_used_pct is not None and disk_used_pct >= disk_warn_pct else "ok"
+    return HostStatus(host, status, checked_at, latency_ms=latency_ms, load=load,
+                      disk_used_pct=disk_used_pct, disk_free_gb=disk_free_gb)
+
+
+class ProbeCache:
+    """Recent probe results on disk, so repeated runs within the TTL don't probe again"""
+
+    def __init__(self, path: Path, ttl_seconds: float = 300, failure_ttl_seconds: float = 60):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        # Failures expire sooner so a recovered host shows up quickly
+        self.failure_ttl_seconds = failure_ttl_seconds
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def fresh(self, hosts: list[str]) -> dict[str, HostStatus]:
+        """Cached results still within their TTL"""
+        now = time.time()
+        results = {}
+        for host, data in self._load().items():
+            if host not in hosts:
+                continue
+            try:
+                status = HostStatus(**data)
+            except TypeError:
+                continue
+            ttl = self.ttl_seconds if status.healthy else self.failure_ttl_seconds
+            if now - status.checked_at < ttl:
+                results[host] = status
+        return results
+
+    def update(self, results: list[HostStatus]):
+        data = self._load()
+        for status in results:
+            data[status.host] = asdict(status)
+        atomic_write_json(self.path, data, "probe cache", indent=1)
+
+
+def probe_hosts(hosts: list[str], deadline: float = 8.0, cache: Optional[ProbeCache] = None,
+                refresh: bool = False, disk_path: str = "/",
+                disk_warn_pct: float = 90.0) -> dict[str, HostStatus]:
+    """
+    Probe hosts concurrently; the whole call takes at most about deadline seconds.
+
+    Results within the cache TTL are reused unless refresh is set. Hosts
+    that haven't answered by the deadline are reported as timed out.
+    """
+    results = {} if refresh or cache is None else cache.fresh(hosts)
+    pending = [host for host in hosts if host not in results]
+
+    if pending:
+        pool = ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="infra-probe")
+        futures = {pool.submit(probe_host, host, deadline, disk_path, disk_warn_pct): host
+                   for host in pending}
+        done, not_done = wait(futures, timeout=deadline + 1)
+        probed = []
+        for future in done:
+            probed.append(future.result())
+        for future in not_done:
+            host = futures[future]
+            probed.append(HostStatus(host, "timeout", time.time(),
+                                     error=f"no answer within {deadline:.0f}s"))
+        # Probes past the deadline are killed by their own subprocess timeout
+        pool.shutdown(wait=False)
+
+        for status in probed:
+            results[status.host] = status
+            if not status.healthy:
+                logger.warning(f"Probe {status.host}: {status.status} ({status.error})")
+        if cache is not None:
+            cache.update(probed)
+
+    return {host: results[host] for host in hosts}
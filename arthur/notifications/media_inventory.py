@@ -0,0 +1,197 @@
+"""
+Media Inventory Index
+Persistent SQLite index of media files (path, size, mtime, type) under the
+storage volumes, so daily counts and sizes are indexed range queries
+
+The index is refreshed incrementally: a directory is only re-listed when its
+own mtime changed (a file was added, removed or renamed in it). Unchanged
+directories cost a single stat, so a refresh scales with the number of
+directories and the day's new files, not the year's total output. Media is
+written once (rsync renames a temp file into place), so files that were
+rewritten in place without touching their directory are not picked up.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path.home() / ".arthur" / "media_inventory.db"
+
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.webp']
+VIDEO_EXTENSIONS = ['.mp4', '.mov', '.webm']
+
+# A directory modified this recently may still be receiving files within
+# the same mtime tick; it is re-listed on the next refresh
+SETTLE_SECONDS = 2.0
+
+
+def media_kind(path: str) -> Optional[str]:
+    """'image', 'video' or None from a file's extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return "image"
+    if ext in VIDEO_EXTENSIONS:
+        return "video"
+    return None
+
+
+def _subtree_bounds(directory: str) -> tuple[str, str]:
+    """Path range covering everything below a directory ('/' sorts just before '0')"""
+    directory = directory.rstrip("/")
+    return directory + "/", directory + "0"
+
+
+class MediaInventory:
+    """Incrementally refreshed index of media files on disk"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript('''
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    kind TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_kind_mtime ON files (kind, mtime);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+''')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def refresh(self, root: Path) -> dict[str, int]:
+        """
+        Bring the index up to date for everything under root.
+
+        Returns counts of directories listed/skipped and files added/removed.
+        """
+        root = str(root).rstrip("/")
+        stats = {"dirs_listed": 0, "dirs_skipped": 0, "files_added": 0, "files_removed": 0}
+        if not os.path.isdir(root):
+            return stats
+
+        started = time.time()
+        with self._lock, self._conn:
+            known = dict(self._conn.execute(
+                'SELECT path, mtime FROM dirs WHERE path = ? OR (path >= ? AND path < ?)',
+                (root, *_subtree_bounds(root))
+            ).fetchall())
+            stack = [(root, None)]
+            while stack:
+                directory, parent = stack.pop()
+                try:
+                    mtime = os.stat(directory).st_mtime
+                except OSError:
+                    self._forget_dir(directory)
+                    continue
+
+                if known.get(directory) == mtime:
+                    # Entries unchanged: only its subdirectories need checking
+                    stats["dirs_skipped"] += 1
+                    children = self._conn.execute(
+                        'SELECT path FROM dirs WHERE parent = ?', (directory,)
+                    ).fetchall()
+                    stack.extend((child, directory) for (child,) in children)
+                    continue
+
+                stats["dirs_listed"] += 1
+                subdirs = self._list_dir(directory, stats)
+                stack.extend((sub, directory) for sub in subdirs)
+                settled = started - mtime >= SETTLE_SECONDS
+                self._conn.execute('INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)',
+                                   (directory, parent, mtime if settled else -1.0))
+
+        logger.debug(f"Inventory refresh {root}: {stats} in {time.time() - started:.2f}s")
+        return stats
+
+    def _list_dir(self, directory: str, stats: dict[str, int]) -> list[str]:
+        """Re-list one directory: sync its files, drop vanished subdirectories"""
+        files = {}
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            kind = media_kind(entry.name)
+                            if kind:
+                                st = entry.stat(follow_symlinks=False)
+                                files[entry.path] = (st.st_size, st.st_mtime, kind)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"Error listing {directory}: {e}")
+            return []
+
+        indexed = {path for (path,) in self._conn.execute(
+            'SELECT path FROM files WHERE dir = ?', (directory,))}
+        removed = indexed - files.keys()
+        self._conn.executemany('DELETE FROM files WHERE path = ?', [(p,) for p in removed])
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)',
+            [(path, directory, size, mtime, kind) for path, (size, mtime, kind) in files.items()]
+        )
+        stats["files_added"] += len(files.keys() - indexed)
+        stats["files_removed"] += len(removed)
+
+        for (child,) in self._conn.execute('SELECT path FROM dirs WHERE parent = ?', (directory,)).fetchall():
+            if child not in subdirs:
+                self._forget_dir(child)
+        return subdirs
+
+    def _forget_dir(self, directory: str):
+        low, high = _subtree_bounds(directory)
+        self._conn.execute('DELETE FROM files WHERE dir = ? OR (path >= ? AND path < ?)', (directory, low, high))
+        self._conn.execute('DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)', (directory, low, high))
+
+    def created_since(self, root: Path, since: datetime, kind: Optional[str] = None,
+                      extensions: Optional[list[str]] = None) -> tuple[int, int]:
+        """(count, total bytes) of indexed files under root modified since a time"""
+        low, high = _subtree_bounds(str(root))
+        query = 'SELECT path, size FROM files WHERE mtime >= ? AND path >= ? AND path < ?'
+        params: list = [since.timestamp(), low, high]
+        if kind:
+            query += ' AND kind = ?'
+            params.append(kind)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        if extensions:
+            wanted = {ext.lower() for ext in extensions}
+            rows = [row for row in rows if os.path.splitext(row[0])[1].lower() in wanted]
+        return len(rows), sum(size for _, size in rows)
+
+
+_shared: dict[str, MediaInventory] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_inventory(db_path: Path = DEFAULT_DB_PATH) -> MediaInventory:
+    """Process-wide inventory per database file"""
+    with _shared_lock:
+        key = str(db_path)
+        if key not in _shared:
+            _shared[key] = MediaInventory(db_path)
+        return _shared[key]
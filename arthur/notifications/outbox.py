@@ -0,0 +1,383 @@
+"""
+Email Outbox
+Durable SQLite queue for outbound email. Callers enqueue, which is a single
+local insert and never waits on Postmark or the network. A delivery worker
+drains the queue in the background, in batches.
+
+- Idempotency: an enqueue with a key that is already queued or sent is
+  ignored, so a retried job doesn't email twice. A key whose message
+  failed is queued again.
+- Retries: failed messages are retried with jittered exponential backoff
+  until max_attempts; nothing is dropped because Postmark was unreachable.
+- Digests: messages enqueued with a digest group are held for the digest
+  window, then everything in the group for a recipient goes out as one
+  email.
+
+Delivery is at least once: if a worker dies after Postmark accepted a
+batch but before recording it, that batch is sent again once its claim
+expires.
+
+    python3 -m arthur.notifications.outbox            # run a worker
+    python3 -m arthur.notifications.outbox --once     # drain what is due and exit
+    python3 -m arthur.notifications.outbox --status
+"""
+
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .postmark import BATCH_MAX_MESSAGES, EmailMessage, EmailResult, PostmarkNotifier
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path.home() / ".arthur" / "outbox.db"
+
+# A claimed batch not recorded as sent or failed within this time is retried
+CLAIM_SECONDS = 300
+
+
+@dataclass
+class OutboxEntry:
+    """A queued message"""
+    id: int
+    message: EmailMessage
+    key: Optional[str]
+    digest: Optional[str]
+    attempts: int
+    created_at: float
+
+
+class Outbox:
+    """The queue itself; safe to share between threads and processes"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                     timeout=30, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE,
+    digest TEXT,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    from_addr TEXT,
+    html_body TEXT,
+    tag TEXT,
+    message_stream TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, sending, sent, failed, coalesced
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    claimed_at REAL,
+    sent_at REAL,
+    message_id TEXT,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_due ON messages (status, next_attempt_at);
+''')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, message: EmailMessage, key: Optional[str] = None,
+                digest: Optional[str] = None) -> Optional[int]:
+        """
+        Queue a message for delivery. Returns its id, or None if key is already queued or sent.
+
+        Args:
+            message: The email
+            key: Idempotency key; a second enqueue with the same key is ignored
+                 unless the first one failed, in which case it is queued again
+            digest: Digest group; messages in a group are combined per recipient
+        """
+        now = time.time()
+        values = (digest, message.to, message.subject, message.body, message.from_addr,
+                  message.html_body, message.tag, message.message_stream)
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                cursor = self._conn.execute(
+                    'INSERT OR IGNORE INTO messages (key, digest, recipient, subject, body, from_addr, html_body, '
+                    'tag, message_stream, created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, *values, now, now)
+                )
+                message_id = cursor.lastrowid if cursor.rowcount else None
+                if message_id is None:
+                    # Gave up earlier (e.g. an outage outlasted max_attempts): start over
+                    cursor = self._conn.execute(
+                        "UPDATE messages SET digest = ?, recipient = ?, subject = ?, body = ?, from_addr = ?, "
+                        "html_body = ?, tag = ?, message_stream = ?, status = 'pending', attempts = 0, "
+                        "created_at = ?, next_attempt_at = ?, claimed_at = NULL, last_error = NULL "
+                        "WHERE key = ? AND status = 'failed'",
+                        (*values, now, now, key)
+                    )
+                    if cursor.rowcount:
+                        message_id = self._conn.execute('SELECT id FROM messages WHERE key = ?',
+                                                        (key,)).fetchone()[0]
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        if message_id is None:
+            logger.info(f"Outbox: {key} already queued or sent, ignored")
+        return message_id
+
+    def counts(self) -> dict[str, int]:
+        """Messages per status"""
+        with self._lock:
+            return dict(self._conn.execute('SELECT status, COUNT(*) FROM messages GROUP BY status').fetchall())
+
+    def get(self, message_id: int) -> Optional[dict]:
+        return self._row('SELECT * FROM messages WHERE id = ?', (message_id,))
+
+    def get_by_key(self, key: str) -> Optional[dict]:
+        return self._row('SELECT * FROM messages WHERE key = ?', (key,))
+
+    def _row(self, query: str, params: tuple) -> Optional[dict]:
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            row = cursor.fetchone()
+            return dict(zip([c[0] for c in cursor.description], row)) if row else None
+
+    def coalesce(self, window: float) -> int:
+        """
+        Combine digest messages whose window has passed into one message per
+        (group, recipient). Returns the number of digests created.
+        """
+        now = time.time()
+        created = 0
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                groups = self._conn.execute(
+                    "SELECT digest, recipient, MIN(created_at) FROM messages "
+                    "WHERE status = 'pending' AND digest IS NOT NULL GROUP BY digest, recipient"
+                ).fetchall()
+                for digest, recipient, oldest in groups:
+                    if now - oldest < window:
+                        continue
+                    rows = self._conn.execute(
+                        "SELECT id, subject, body, from_addr, tag, message_stream, created_at FROM messages "
+                        "WHERE status = 'pending' AND digest = ? AND recipient = ? ORDER BY id",
+                        (digest, recipient)
+                    ).fetchall()
+                    ids = [row[0] for row in rows]
+                    if len(rows) == 1:
+                        # Nothing to combine: send it as it is
+                        self._conn.execute('UPDATE messages SET digest = NULL WHERE id = ?', (ids[0],))
+                        continue
+                    sections = []
+                    for _, subject, body, _, _, _, at in rows:
+                        sections.append(f"[{time.strftime('%H:%M', time.localtime(at))}] {subject}\n\n{body}")
+                    _, _, _, from_addr, tag, stream, _ = rows[0]
+                    self._conn.execute(
+                        'INSERT INTO messages (key, recipient, subject, body, from_addr, tag, message_stream, '
+                        'created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (f"digest:{digest}:{recipient}:{ids[0]}-{ids[-1]}", recipient,
+                         f"[{digest}] {len(rows)} notifications", f"\n\n{'-' * 40}\n\n".join(sections),
+                         from_addr, tag, stream, now, now)
+                    )
+                    self._conn.executemany("UPDATE messages SET status = 'coalesced' WHERE id = ?",
+                                           [(i,) for i in ids])
+                    created += 1
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return created
+
+    def claim(self, limit: int = BATCH_MAX_MESSAGES) -> list[OutboxEntry]:
+        """Mark up to limit due messages as being sent and return them"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Claims abandoned by a worker that died mid-send
+                self._conn.execute(
+                    "UPDATE messages SET status = 'pending' WHERE status = 'sending' AND claimed_at < ?",
+                    (now - CLAIM_SECONDS,)
+                )
+                rows = self._conn.execute(
+                    "SELECT id, key, digest, recipient, subject, body, from_addr, html_body, tag, message_stream, "
+                    "attempts, created_at FROM messages "
+                    "WHERE status = 'pending' AND digest IS NULL AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                self._conn.executemany("UPDATE messages SET status = 'sending', claimed_at = ? WHERE id = ?",
+                                       [(now, row[0]) for row in rows])
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return [OutboxEntry(id=row[0], key=row[1], digest=row[2],
+                            message=EmailMessage(*row[3:10]), attempts=row[10], created_at=row[11])
+                for row in rows]
+
+    def mark_sent(self, entry: OutboxEntry, result: EmailResult):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE messages SET status = 'sent', sent_at = ?, message_id = ?, attempts = attempts + 1, "
+                "last_error = NULL WHERE id = ?",
+                (time.time(), result.message_id, entry.id)
+            )
+
+    def mark_failed(self, entry: OutboxEntry, error: str, retry_at: Optional[float]):
+        """Record a failed attempt; retry_at None gives up on the message"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE messages SET status = ?, attempts = attempts + 1, next_attempt_at = ?, "
+                "last_error = ? WHERE id = ?",
+                ('failed' if retry_at is None else 'pending', retry_at or 0, error, entry.id)
+            )
+
+    def next_due(self, digest_window: float) -> Optional[float]:
+        """When the next pending message becomes due; digest messages wait out their window"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(CASE WHEN digest IS NULL THEN next_attempt_at ELSE created_at + ? END) "
+                "FROM messages WHERE status = 'pending'", (digest_window,)
+            ).fetchone()
+        return row[0] if row else None
+
+
+class OutboxWorker:
+    """Delivers queued messages in the background"""
+
+    def __init__(self, outbox: Outbox, notifier: PostmarkNotifier, interval: float = 5.0,
+                 max_attempts: int = 8, digest_window: float = 300.0,
+                 backoff_base: float = 30.0, backoff_max: float = 3600.0):
+        """
+        Args:
+            outbox: Queue to drain
+            notifier: Sends the batches
+            interval: Seconds between polls of the queue
+            max_attempts: Attempts before a message is marked failed
+            digest_window: Seconds digest messages are held to be combined
+            backoff_base: First retry delay, doubled per attempt (with jitter)
+            backoff_max: Longest retry delay
+        """
+        self.outbox = outbox
+        self.notifier = notifier
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.digest_window = digest_window
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _retry_at(self, attempts: int) -> Optional[float]:
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return time.time() + random.uniform(delay / 2, delay)
+
+    def run_once(self) -> dict[str, int]:
+        """Coalesce digests and send everything due. Returns counts of this pass."""
+        stats = {"digests": self.outbox.coalesce(self.digest_window), "sent": 0, "failed": 0, "retrying": 0}
+        while not self._stop.is_set():
+            entries = self.outbox.claim()
+            if not entries:
+                break
+            results = self.notifier.send_batch([entry.message for entry in entries])
+            for entry, result in zip(entries, results):
+                if result.success:
+                    self.outbox.mark_sent(entry, result)
+                    stats["sent"] += 1
+                    continue
+                retry_at = self._retry_at(entry.attempts + 1)
+                self.outbox.mark_failed(entry, result.error or "unknown error", retry_at)
+                if retry_at is None:
+                    logger.error(f"Outbox: giving up on message {entry.id} to {entry.message.to}: {result.error}")
+                    stats["failed"] += 1
+                else:
+                    stats["retrying"] += 1
+        if any(stats.values()):
+            logger.info(f"Outbox pass: {stats}")
+        return stats
+
+    def drain(self, timeout: float) -> dict[str, int]:
+        """Deliver until nothing is due within timeout seconds; returns what is still pending"""
+        deadline = time.monotonic() + timeout
+        while True:
+            self.run_once()
+            next_due = self.outbox.next_due(self.digest_window)
+            if next_due is None:
+                break
+            wait = max(0.0, next_due - time.time())
+            if time.monotonic() + wait > deadline:
+                break
+            time.sleep(max(wait, 0.1))
+        return self.outbox.counts()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Outbox worker pass failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> 'OutboxWorker':
+        self._thread = threading.Thread(target=self._run, name="outbox-worker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'OutboxWorker':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Deliver queued ARTHUR email")
+    parser.add_argument("--once", action="store_true", help="Send what is due and exit")
+    parser.add_argument("--status", action="store_true", help="Show queue counts and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    from ..config import OUTBOX, POSTMARK
+
+    outbox = Outbox(OUTBOX.db_path)
+    if args.status:
+        print(outbox.counts())
+    else:
+        notifier = PostmarkNotifier(os.getenv("POSTMARK_SERVER_TOKEN", "") or POSTMARK.server_token,
+                                    base_url=POSTMARK.api_base_url,
+                                    connect_timeout=POSTMARK.connect_timeout,
+                                    read_timeout=POSTMARK.read_timeout,
+                                    max_retries=POSTMARK.max_retries)
+        worker = OutboxWorker(outbox, notifier, interval=OUTBOX.poll_seconds,
+                              max_attempts=OUTBOX.max_attempts,
+                              digest_window=OUTBOX.digest_window_seconds,
+                              backoff_base=OUTBOX.backoff_base_seconds,
+                              backoff_max=OUTBOX.backoff_max_seconds)
+        if args.once:
+            print(worker.run_once())
+        else:
+            try:
+                worker._run()
+            except KeyboardInterrupt:
+                pass
+        notifier.close()
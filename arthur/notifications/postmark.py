@@ -1,18 +1,53 @@
 """
 Postmark Email Client
-Send transactional emails via Postmark API
+Send transactional emails via Postmark API, over a pooled keep-alive
+transport with retries
 """
 
 import os
 import json
 import logging
-from dataclasses import dataclass
-from typing import Optional
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError, URLError
+import http.client
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+from .transport import PooledHttpTransport, Transport
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SENDER = "alerts@dellight.ai"
+
+# Postmark /email/batch limits
+BATCH_MAX_MESSAGES = 500
+BATCH_MAX_BYTES = 50 * 1024 * 1024
+
+
+@dataclass
+class EmailMessage:
+    """One outbound email"""
+    to: str
+    subject: str
+    body: str
+    from_addr: Optional[str] = None
+    html_body: Optional[str] = None
+    tag: Optional[str] = None
+    message_stream: str = "outbound"
+
+    def payload(self) -> dict[str, str]:
+        """Postmark JSON for this message"""
+        payload = {
+            "From": self.from_addr or DEFAULT_SENDER,
+            "To": self.to,
+            "Subject": self.subject,
+            "TextBody": self.body,
+            "MessageStream": self.message_stream
+        }
+        if self.html_body:
+            payload["HtmlBody"] = self.html_body
+        if self.tag:
+            payload["Tag"] = self.tag
+        return payload
+
 
 @dataclass
 class EmailResult:
@@ -21,17 +56,63 @@ class EmailResult:
     message_id: Optional[str] = None
     error: Optional[str] = None
     to: Optional[str] = None
+    attempts: int = 0  # HTTP attempts, including retries
+    latency_ms: Optional[float] = None
 
 
 class PostmarkNotifier:
     """Send emails via Postmark API"""
 
-    API_URL = "https://api.postmarkapp.com/email"
-
-    def __init__(self, server_token: Optional[str] = None):
+    API_BASE_URL = "https://api.postmarkapp.com"
+
+    def __init__(self, server_token: Optional[str] = None, transport: Optional[Transport] = None,
+                 base_url: Optional[str] = None, connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0, max_retries: int = 3):
+        """
+        Args:
+            server_token: Postmark server token (default: POSTMARK_SERVER_TOKEN)
+            transport: HTTP transport to use (default: a pooled keep-alive
+                       transport for base_url)
+            base_url: API origin, e.g. a local stub server in tests
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for Postmark's response
+            max_retries: Retries of 429/5xx responses
+        """
         self.server_token = server_token or os.getenv("POSTMARK_SERVER_TOKEN", "")
         if not self.server_token:
             logger.warning("No Postmark server token provided")
+        self.transport = transport or PooledHttpTransport(
+            base_url or self.API_BASE_URL, connect_timeout=connect_timeout,
+            read_timeout=read_timeout, max_retries=max_retries
+        )
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Request count, retries, failures and latency of the transport"""
+        stats = getattr(self.transport, "stats", None)
+        return stats.summary() if stats else {}
+
+    def close(self):
+        """Close pooled connections"""
+        if hasattr(self.transport, "close"):
+            self.transport.close()
+
+    def _post(self, path: str, payload: Any):
+        """POST JSON to the API. Returns (response, parsed body or None)."""
+        response = self.transport.request(
+            "POST", path,
+            body=json.dumps(payload).encode("utf-8"),
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "X-Postmark-Server-Token": self.server_token
+            }
+        )
+        try:
+            result = json.loads(response.body.decode("utf-8")) if response.body else None
+        except ValueError:
+            result = None
+        return response, result
 
     def send(
         self,
@@ -47,51 +128,30 @@ class PostmarkNotifier:
         if not self.server_token:
             return EmailResult(success=False, error="No Postmark server token configured", to=to)
 
-        sender = from_addr or "alerts@dellight.ai"
-
-        payload = {
-            "From": sender,
-            "To": to,
-            "Subject": subject,
-            "TextBody": body,
-            "MessageStream": message_stream
-        }
-
-        if html_body:
-            payload["HtmlBody"] = html_body
-        if tag:
-            payload["Tag"] = tag
+        payload = EmailMessage(to, subject, body, from_addr, html_body, tag, message_stream).payload()
 
         try:
-            request = Request(
-                self.API_URL,
-                data=json.dumps(payload).encode("utf-8"),
-                headers={
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                    "X-Postmark-Server-Token": self.server_token
-                },
-                method="POST"
-            )
-
-            with urlopen(request, timeout=30) as response:
-                result = json.loads(response.read().decode("utf-8"))
-                logger.info(f"Email sent successfully to {to}: {result.get('MessageID')}")
-                return EmailResult(success=True, message_id=result.get("MessageID"), to=to)
-
-        except HTTPError as e:
-            error_body = e.read().decode("utf-8") if e.fp else str(e)
-            logger.error(f"Postmark API error: {e.code} - {error_body}")
-            return EmailResult(success=False, error=f"HTTP {e.code}: {error_body}", to=to)
-
-        except URLError as e:
+            response, result = self._post("/email", payload)
+
+        except (OSError, http.client.HTTPException) as e:
             logger.error(f"Network error sending email: {e}")
-            return EmailResult(success=False, error=f"Network error: {e.reason}", to=to)
+            return EmailResult(success=False, error=f"Network error: {e}", to=to)
 
         except Exception as e:
             logger.error(f"Unexpected error sending email: {e}")
             return EmailResult(success=False, error=str(e), to=to)
 
+        if not response.ok:
+            error_body = response.body.decode("utf-8", errors="replace")
+            logger.error(f"Postmark API error: {response.status} - {error_body}")
+            return EmailResult(success=False, error=f"HTTP {response.status}: {error_body}", to=to,
+                               attempts=response.attempts, latency_ms=response.latency_ms)
+
+        message_id = (result or {}).get("MessageID")
+        logger.info(f"Email sent successfully to {to}: {message_id}")
+        return EmailResult(success=True, message_id=message_id, to=to,
+                           attempts=response.attempts, latency_ms=response.latency_ms)
+
     def send_daily_summary(
         self,
         to: str,
@@ -101,3 +161,75 @@ class PostmarkNotifier:
     ) -> EmailResult:
         """Send daily summary email with appropriate tag"""
         return self.send(to=to, subject=subject, body=body, from_addr=from_addr, tag="daily-summary")
+
+    def send_batch(self, messages: list[EmailMessage]) -> list[EmailResult]:
+        """
+        Send messages through /email/batch, up to 500 per request.
+
+        Returns one EmailResult per message, in order. Postmark accepts or
+        rejects each message of a batch separately, so some can fail while
+        the rest are sent; a failed request fails every message in it.
+        """
+        if not self.server_token:
+            return [EmailResult(success=False, error="No Postmark server token configured", to=m.to)
+                    for m in messages]
+
+        results: list[EmailResult] = []
+        for chunk in _chunks([m.payload() for m in messages]):
+            results.extend(self._send_chunk(chunk))
+
+        failed = sum(not r.success for r in results)
+        if failed:
+            logger.error(f"Batch: {failed} of {len(results)} messages failed")
+        else:
+            logger.info(f"Batch: {len(results)} messages sent")
+        return results
+
+    def _send_chunk(self, payloads: list[dict]) -> list[EmailResult]:
+        def fail(error: str, **kwargs) -> list[EmailResult]:
+            return [EmailResult(success=False, error=error, to=p["To"], **kwargs) for p in payloads]
+
+        try:
+            response, result = self._post("/email/batch", payloads)
+        except (OSError, http.client.HTTPException) as e:
+            logger.error(f"Network error sending batch of {len(payloads)}: {e}")
+            return fail(f"Network error: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error sending batch of {len(payloads)}: {e}")
+            return fail(str(e))
+
+        timing = {"attempts": response.attempts, "latency_ms": response.latency_ms}
+        if not response.ok or not isinstance(result, list) or len(result) != len(payloads):
+            error_body = response.body.decode("utf-8", errors="replace")
+            logger.error(f"Postmark batch API error: {response.status} - {error_body}")
+            return fail(f"HTTP {response.status}: {error_body}", **timing)
+
+        results = []
+        for payload, item in zip(payloads, result):
+            if item.get("ErrorCode", 0) == 0:
+                results.append(EmailResult(success=True, message_id=item.get("MessageID"),
+                                           to=payload["To"], **timing))
+            else:
+                results.append(EmailResult(success=False, to=payload["To"],
+                                           error=f"Postmark {item.get('ErrorCode')}: {item.get('Message')}",
+                                           **timing))
+        return results
+
+    def send_daily_summary_batch(self, messages: list[EmailMessage]) -> list[EmailResult]:
+        """Send several summaries (e.g. a fleet report and per-node reports) in one batch"""
+        return self.send_batch([m if m.tag else replace(m, tag="daily-summary") for m in messages])
+
+
+def _chunks(payloads: list[dict]):
+    """Split payloads into batches within Postmark's message count and size limits"""
+    chunk: list[dict] = []
+    size = 2
+    for payload in payloads:
+        payload_size = len(json.dumps(payload).encode("utf-8")) + 1
+        if chunk and (len(chunk) >= BATCH_MAX_MESSAGES or size + payload_size > BATCH_MAX_BYTES):
+            yield chunk
+            chunk, size = [], 2
+        chunk.append(payload)
+        size += payload_size
+    if chunk:
+        yield chunk
@@ -0,0 +1,226 @@
+"""
+Postmark Stub Server
+Local stand-in for the Postmark API, speaking HTTP/1.1 keep-alive, that
+records what it receives and can be told to fail upcoming requests (429
+with Retry-After, 5xx). Point PostmarkNotifier at it with base_url:
+
+    with PostmarkStub() as stub:
+        notifier = PostmarkNotifier("test-token", base_url=stub.url)
+
+    python3 -m arthur.notifications.postmark_stub   # self-check
+"""
+
+import json
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class PostmarkStub:
+    """Threaded stub of the Postmark /email and /email/batch endpoints"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.messages: list[dict] = []
+        self.requests = 0
+        self.connections: set[tuple] = set()
+        self._failures: list[tuple[int, Optional[str]]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail_next(self, status: int, count: int = 1, retry_after: Optional[str] = None):
+        """Answer the next count requests with an error status"""
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * count)
+
+    def _accept(self, message: dict) -> dict:
+        """Postmark's answer for one message"""
+        if not message.get("To") or not message.get("From"):
+            return {"ErrorCode": 300, "Message": "Invalid email request", "To": message.get("To")}
+        self.messages.append(message)
+        return {
+            "To": message["To"],
+            "SubmittedAt": datetime.now(timezone.utc).isoformat(),
+            "MessageID": str(uuid.uuid4()),
+            "ErrorCode": 0,
+            "Message": "OK",
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status: int, body: dict, headers: Optional[dict] = None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = self.rfile.read(length)
+                with stub._lock:
+                    stub.requests += 1
+                    stub.connections.add(self.client_address)
+                    failure = stub._failures.pop(0) if stub._failures else None
+                if failure:
+                    status, retry_after = failure
+                    headers = {"Retry-After": retry_after} if retry_after is not None else None
+                    self._reply(status, {"ErrorCode": status, "Message": "Stub failure"}, headers)
+                    return
+                if not self.headers.get("X-Postmark-Server-Token"):
+                    self._reply(401, {"ErrorCode": 10, "Message": "No Account or Server API tokens were supplied"})
+                    return
+                try:
+                    body = json.loads(payload)
+                except ValueError:
+                    self._reply(422, {"ErrorCode": 402, "Message": "Received invalid JSON input"})
+                    return
+
+                with stub._lock:
+                    if self.path == "/email":
+                        result = stub._accept(body)
+                        self._reply(200 if result["ErrorCode"] == 0 else 422, result)
+                    elif self.path == "/email/batch":
+                        if not isinstance(body, list) or len(body) > 500:
+                            self._reply(422, {"ErrorCode": 300, "Message": "Batch must be 1-500 messages"})
+                        else:
+                            # Messages are accepted or rejected individually
+                            self._reply(200, [stub._accept(message) for message in body])
+                    else:
+                        self._reply(404, {"ErrorCode": 404, "Message": f"Unknown endpoint {self.path}"})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'PostmarkStub':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="postmark-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'PostmarkStub':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def check_outbox(stub: PostmarkStub, notifier, check):
+    """Dedupe, retry across a Postmark outage and digest coalescing through the outbox"""
+    import tempfile
+    import time
+    from pathlib import Path
+    from .outbox import Outbox, OutboxWorker
+    from .postmark import EmailMessage
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = Outbox(Path(tmp) / "outbox.db")
+        worker = OutboxWorker(outbox, notifier, max_attempts=3, digest_window=0.5,
+                              backoff_base=0.2, backoff_max=1.0)
+
+        started = time.monotonic()
+        first = outbox.enqueue(EmailMessage("outbox@example.com", "Report", "Body"), key="report:1")
+        duplicate = outbox.enqueue(EmailMessage("outbox@example.com", "Report", "Body"), key="report:1")
+        for i in range(5):
+            outbox.enqueue(EmailMessage("oncall@example.com", f"Alert {i}", f"Disk {90 + i}%"), digest="alerts")
+        check(time.monotonic() - started < 1.0, "enqueue should not wait on delivery")
+        check(first is not None and duplicate is None, "duplicate idempotency key should be ignored")
+
+        # Postmark down for longer than the transport's own retries
+        received = len(stub.messages)
+        stub.fail_next(503, count=notifier.transport.max_retries + 1)
+        counts = worker.drain(timeout=10)
+        check(outbox.get(first)["status"] == "sent" and outbox.get(first)["attempts"] == 2,
+              f"queued message should be retried until sent: {outbox.get(first)}")
+        digests = [m for m in stub.messages[received:] if m["To"] == "oncall@example.com"]
+        check(len(digests) == 1 and "Alert 4" in digests[0]["TextBody"],
+              f"5 alerts should arrive as 1 digest, got {len(digests)} messages")
+        check(counts == {"sent": 2, "coalesced": 5}, f"outbox counts: {counts}")
+
+        # A key whose message was given up on can be queued again
+        failed = outbox.enqueue(EmailMessage("outbox@example.com", "Report 2", "Body"), key="report:2")
+        for entry in outbox.claim():
+            outbox.mark_failed(entry, "Postmark unreachable", retry_at=None)
+        again = outbox.enqueue(EmailMessage("outbox@example.com", "Report 2", "Body"), key="report:2")
+        check(again == failed and outbox.get(failed)["status"] == "pending",
+              f"failed key should be queued again: {outbox.get(failed)}")
+        worker.drain(timeout=5)
+        check(outbox.get(failed)["status"] == "sent", f"requeued message not sent: {outbox.get(failed)}")
+        check(outbox.enqueue(EmailMessage("outbox@example.com", "Report 2", "Body"), key="report:2") is None,
+              "sent key should stay deduplicated")
+        outbox.close()
+
+
+def main() -> int:
+    """Check connection reuse, retries, Retry-After, batching and the outbox against the stub"""
+    from .postmark import EmailMessage, PostmarkNotifier
+
+    failures = []
+
+    def check(condition: bool, message: str):
+        if not condition:
+            failures.append(message)
+            print(f"FAIL {message}")
+
+    with PostmarkStub() as stub:
+        notifier = PostmarkNotifier("stub-token", base_url=stub.url)
+        notifier.transport.backoff_base = 0.05
+
+        for i in range(20):
+            result = notifier.send(f"user{i}@example.com", f"Test {i}", "Body")
+            check(result.success, f"send {i} failed: {result.error}")
+        check(len(stub.connections) == 1, f"expected 1 connection for 20 sends, saw {len(stub.connections)}")
+
+        stub.fail_next(429, retry_after="1")
+        result = notifier.send("retry@example.com", "Rate limited", "Body")
+        check(result.success and result.attempts == 2, f"429 retry: {result}")
+        check(result.latency_ms >= 1000, f"Retry-After not honoured ({result.latency_ms:.0f} ms)")
+
+        stub.fail_next(503, count=2)
+        result = notifier.send("retry@example.com", "Unavailable", "Body")
+        check(result.success and result.attempts == 3, f"503 retries: {result}")
+
+        stub.fail_next(500, count=4)
+        result = notifier.send("fail@example.com", "Down", "Body")
+        check(not result.success and result.attempts == 4, f"gives up after max_retries: {result}")
+
+        requests = stub.requests
+        messages = [EmailMessage(f"batch{i}@example.com", f"Batch {i}", "Body") for i in range(1203)]
+        messages[7] = EmailMessage("", "No recipient", "Body")
+        results = notifier.send_batch(messages)
+        check(stub.requests - requests == 3, f"1203 messages should take 3 requests, took {stub.requests - requests}")
+        check(len(results) == 1203 and [r.success for r in results].count(False) == 1 and not results[7].success,
+              "batch: exactly the invalid message should fail")
+
+        check_outbox(stub, notifier, check)
+
+        print(f"Stub received {stub.requests} requests on {len(stub.connections)} connections")
+        print(f"Transport: {notifier.stats}")
+        notifier.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""
+SSH
+Commands for reaching other nodes over SSH. Connections are multiplexed:
+the first command to a host opens a master connection that later probes,
+git reads and summary fetches reuse, so they skip the handshake.
+"""
+
+from pathlib import Path
+
+# SSH master connections live here; %C keeps socket paths short
+CONTROL_DIR = Path.home() / ".ssh" / "arthur-cm"
+
+
+def ssh_command(host: str, connect_timeout: float) -> list[str]:
+    """ssh with a multiplexed master connection per host, kept open between calls"""
+    CONTROL_DIR.mkdir(parents=True, exist_ok=True, mode=0o700)
+    return [
+        "ssh",
+        "-o", "BatchMode=yes",
+        "-o", f"ConnectTimeout={max(1, int(connect_timeout))}",
+        "-o", "ControlMaster=auto",
+        "-o", f"ControlPath={CONTROL_DIR}/%C",
+        "-o", "ControlPersist=600",
+        host,
+    ]
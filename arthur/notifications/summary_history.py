@@ -0,0 +1,249 @@
+"""
+Summary History
+Every daily summary is stored in a local SQLite database, one row per node
+and day. Trends like week-over-week deltas and moving averages are plain
+queries over that table. Nothing is re-collected and no media volume is
+rescanned.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path.home() / ".arthur" / "summary_history.db"
+
+# Metric column -> (label, how a week is aggregated: "sum" for counts, "mean" for gauges)
+METRICS: dict[str, tuple[str, str]] = {
+    "images_created": ("Images", "sum"),
+    "images_size_mb": ("Images MB", "sum"),
+    "videos_created": ("Videos", "sum"),
+    "mj_batches_run": ("MJ Batches", "sum"),
+    "commit_count": ("Commits", "sum"),
+    "air_disk_free_gb": ("Disk Free GB", "mean"),
+    "air_memory_used_pct": ("Memory %", "mean"),
+    "air_swap_used_pct": ("Swap %", "mean"),
+    "air_load_1m": ("Load 1m", "mean"),
+}
+
+# Metric column -> the daily_summary collector that measures it. When that
+# collector failed or timed out the metric is stored as NULL, not as 0.
+METRIC_COLLECTORS: dict[str, str] = {
+    "images_created": "images",
+    "images_size_mb": "images",
+    "videos_created": "videos",
+    "mj_batches_run": "mj_batches",
+    "commit_count": "git",
+    "air_disk_free_gb": "air_metrics",
+    "air_memory_used_pct": "air_metrics",
+    "air_swap_used_pct": "air_metrics",
+    "air_load_1m": "air_metrics",
+}
+
+
+@dataclass
+class MetricTrend:
+    """One metric over the latest week compared with the week before"""
+    metric: str
+    label: str
+    latest: Optional[float]
+    this_week: Optional[float]  # total (counts) or average (gauges) over the last 7 days
+    last_week: Optional[float]
+    moving_avg: Optional[float]  # 7-day average of the daily values
+    days: int  # days with data in the last 7
+    aggregate: str = "sum"
+
+    @property
+    def delta_pct(self) -> Optional[float]:
+        if self.this_week is None or not self.last_week:
+            return None
+        return (self.this_week - self.last_week) / abs(self.last_week) * 100
+
+    def describe(self) -> str:
+        """One-line trend for reports"""
+        if self.this_week is None:
+            return f"{self.label}: no data"
+        if self.aggregate == "sum":
+            line = f"{self.label}: {self.this_week:.1f} this week"
+        else:
+            line = f"{self.label}: avg {self.this_week:.1f} this week"
+        if self.last_week is not None:
+            line += f" vs {self.last_week:.1f}"
+            if self.delta_pct is not None:
+                line += f" ({self.delta_pct:+.0f}%)"
+        if self.aggregate == "sum":
+            line += f", 7d avg {self.moving_avg:.1f}/day"
+        if self.latest is not None and self.aggregate != "sum":
+            line += f", latest {self.latest:.1f}"
+        return line
+
+
+def _summary_values(summary) -> dict[str, Optional[float]]:
+    """Metric columns from a DailySummary; None for metrics whose collector failed"""
+    values = {name: float(getattr(summary, name, 0) or 0) for name in METRICS if name != "air_load_1m"}
+    values["air_load_1m"] = float(summary.air_load[0]) if summary.air_load else 0.0
+    issues = getattr(summary, "collector_issues", {})
+    for name, collector in METRIC_COLLECTORS.items():
+        if collector in issues:
+            values[name] = None
+    return values
+
+
+class SummaryHistory:
+    """Daily summaries on disk, one row per node and day"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript(self._schema("summaries"))
+        self._migrate()
+
+    @staticmethod
+    def _schema(table: str) -> str:
+        # Metrics are NULL when they couldn't be measured
+        columns = ",\n".join(f"    {name} REAL" for name in METRICS)
+        return f'''
+CREATE TABLE IF NOT EXISTS {table} (
+    node_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    lookback_hours INTEGER NOT NULL,
+    generated_at TEXT NOT NULL,
+{columns},
+    data TEXT NOT NULL,
+    PRIMARY KEY (node_id, day, lookback_hours)
+);
+'''
+
+    def _migrate(self):
+        """Rebuild tables created with NOT NULL metric columns, which stored failures as 0"""
+        info = self._conn.execute('PRAGMA table_info(summaries)').fetchall()
+        if not any(row[1] in METRICS and row[3] for row in info):
+            return
+        names = ", ".join(row[1] for row in info)
+        with self._conn:
+            self._conn.execute(self._schema("summaries_new"))
+            self._conn.execute(f'INSERT INTO summaries_new ({names}) SELECT {names} FROM summaries')
+            self._conn.execute('DROP TABLE summaries')
+            self._conn.execute('ALTER TABLE summaries_new RENAME TO summaries')
+        logger.info("Summary history: metric columns made nullable")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def record(self, summary, lookback_hours: int = 24):
+        """Store a summary; a later summary for the same day replaces it"""
+        values = _summary_values(summary)
+        data = json.dumps(asdict(summary), default=str)
+        names = ", ".join(METRICS)
+        placeholders = ", ".join("?" for _ in METRICS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f'INSERT OR REPLACE INTO summaries (node_id, day, lookback_hours, generated_at, {names}, data) '
+                f'VALUES (?, ?, ?, ?, {placeholders}, ?)',
+                (summary.node_id, summary.date.date().isoformat(), lookback_hours,
+                 summary.date.isoformat(), *(values[name] for name in METRICS), data)
+            )
+
+    def daily(self, node_id: str, start: date, end: date,
+              lookback_hours: int = 24) -> dict[date, dict[str, Optional[float]]]:
+        """Metric values per day in [start, end]; days without a summary are absent, unmeasured metrics None"""
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT day, {", ".join(METRICS)} FROM summaries '
+                'WHERE node_id = ? AND lookback_hours = ? AND day >= ? AND day <= ? ORDER BY day',
+                (node_id, lookback_hours, start.isoformat(), end.isoformat())
+            ).fetchall()
+        return {date.fromisoformat(row[0]): dict(zip(METRICS, row[1:])) for row in rows}
+
+    def get(self, node_id: str, day: date, lookback_hours: int = 24) -> Optional[dict[str, Any]]:
+        """The stored summary for one day, as a dict"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM summaries WHERE node_id = ? AND day = ? AND lookback_hours = ?',
+                (node_id, day.isoformat(), lookback_hours)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def trends(self, node_id: str, as_of: Optional[date] = None,
+               lookback_hours: int = 24) -> list[MetricTrend]:
+        """Week-over-week trend of every metric, for the 7 days ending as_of (default: today)"""
+        as_of = as_of or datetime.now().date()
+        week_start = as_of - timedelta(days=6)
+        days = self.daily(node_id, week_start - timedelta(days=7), as_of, lookback_hours)
+        this_week = [values for day, values in days.items() if day >= week_start]
+        last_week = [values for day, values in days.items() if day < week_start]
+
+        trends = []
+        for name, (label, how) in METRICS.items():
+            # Days the metric couldn't be measured are left out, not counted as 0
+            current = [values[name] for values in this_week if values[name] is not None]
+            previous = [values[name] for values in last_week if values[name] is not None]
+            measured = [day for day, values in days.items() if values[name] is not None]
+            trends.append(MetricTrend(
+                metric=name,
+                label=label,
+                latest=days[max(measured)][name] if measured else None,
+                this_week=_aggregate(current, how),
+                last_week=_aggregate(previous, how),
+                moving_avg=sum(current) / len(current) if current else None,
+                days=len(current),
+                aggregate=how,
+            ))
+        return trends
+
+
+def _aggregate(values: list[float], how: str) -> Optional[float]:
+    if not values:
+        return None
+    return sum(values) if how == "sum" else sum(values) / len(values)
+
+
+def moving_averages(series: dict[date, float], window: int = 7) -> dict[date, float]:
+    """Trailing moving average per day, over the days in the window that have data"""
+    averages = {}
+    for day in series:
+        values = [series[d] for d in series if day - timedelta(days=window - 1) <= d <= day]
+        averages[day] = sum(values) / len(values)
+    return averages
+
+
+def format_history_report(history: SummaryHistory, node_id: str, days: int = 14,
+                          as_of: Optional[date] = None, lookback_hours: int = 24) -> str:
+    """Daily table with 7-day moving averages, followed by week-over-week deltas"""
+    as_of = as_of or datetime.now().date()
+    # Extra week so the first rows' moving averages cover a full window
+    daily = history.daily(node_id, as_of - timedelta(days=days + 6), as_of, lookback_hours)
+    shown = [day for day in daily if day > as_of - timedelta(days=days)]
+
+    lines = [f"[{node_id}] ARTHUR Summary History - last {days} days to {as_of.isoformat()}", ""]
+    if not shown:
+        lines.append("  No summaries recorded in this period")
+        return "\n".join(lines)
+
+    columns = ["images_created", "videos_created", "mj_batches_run", "commit_count",
+               "air_disk_free_gb", "air_memory_used_pct", "air_load_1m"]
+    averages = {name: moving_averages({day: values[name] for day, values in daily.items()
+                                       if values[name] is not None})
+                for name in columns}
+    lines.append("  " + f"{'Day':<10}" + "".join(f"{METRICS[name][0]:>14}" for name in columns))
+    for day in shown:
+        cells = "".join(f"{daily[day][name]:>7.1f} ({averages[name][day]:>4.1f})"
+                        if daily[day][name] is not None else f"{'n/a':>14}"
+                        for name in columns)
+        lines.append(f"  {day.isoformat():<10}{cells}")
+    lines.append("  (7-day moving average in brackets)")
+    lines.append("")
+
+    lines.append("WEEK OVER WEEK")
+    for trend in history.trends(node_id, as_of, lookback_hours):
+        lines.append(f"  {trend.describe()}")
+    return "\n".join(lines)
@@ -0,0 +1,301 @@
+"""
+System Metrics
+Cross-platform node metrics read directly from the OS, with no process
+spawns: os.statvfs and os.getloadavg everywhere, /proc on Linux, and
+sysctl / mach host statistics via ctypes on macOS. Cheap enough to sample
+every few seconds.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+
+@dataclass
+class SystemMetrics:
+    """One sample of node metrics"""
+    timestamp: float
+    uptime_hours: float = 0.0
+    disk_total_gb: float = 0.0
+    disk_free_gb: float = 0.0
+    memory_total_gb: float = 0.0
+    memory_used_pct: float = 0.0
+    swap_total_gb: float = 0.0
+    swap_used_pct: float = 0.0
+    load_1m: float = 0.0
+    load_5m: float = 0.0
+    load_15m: float = 0.0
+    cpu_count: int = 0
+    cpu_busy_pct: Optional[float] = None  # since the previous sample (None on the first)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _LinuxSource:
+    """Reads /proc"""
+
+    @staticmethod
+    def _meminfo() -> dict[str, int]:
+        values = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                parts = rest.split()
+                if parts:
+                    values[key] = int(parts[0]) * 1024  # kB
+        return values
+
+    def uptime_seconds(self) -> float:
+        with open("/proc/uptime") as f:
+            return float(f.read().split()[0])
+
+    def memory(self) -> tuple[int, float, int, float]:
+        """(total bytes, used %, swap total bytes, swap used %)"""
+        info = self._meminfo()
+        total = info.get("MemTotal", 0)
+        available = info.get("MemAvailable", info.get("MemFree", 0))
+        swap_total = info.get("SwapTotal", 0)
+        swap_free = info.get("SwapFree", 0)
+        used_pct = (total - available) / total * 100 if total else 0.0
+        swap_pct = (swap_total - swap_free) / swap_total * 100 if swap_total else 0.0
+        return total, used_pct, swap_total, swap_pct
+
+    def cpu_ticks(self) -> Optional[tuple[int, int]]:
+        """(busy, total) jiffies across all CPUs"""
+        with open("/proc/stat") as f:
+            fields = [int(x) for x in f.readline().split()[1:]]
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+        total = sum(fields[:8])  # guest time is already counted in user
+        return total - idle, total
+
+
+class _Timeval(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_usec", ctypes.c_int32)]
+
+
+class _XswUsage(ctypes.Structure):
+    _fields_ = [("xsu_total", ctypes.c_uint64), ("xsu_avail", ctypes.c_uint64),
+                ("xsu_used", ctypes.c_uint64), ("xsu_pagesize", ctypes.c_uint32),
+                ("xsu_encrypted", ctypes.c_bool)]
+
+
+class _VmStatistics64(ctypes.Structure):
+    _fields_ = [
+        ("free_count", ctypes.c_uint32), ("active_count", ctypes.c_uint32),
+        ("inactive_count", ctypes.c_uint32), ("wire_count", ctypes.c_uint32),
+        ("zero_fill_count", ctypes.c_uint64), ("reactivations", ctypes.c_uint64),
+        ("pageins", ctypes.c_uint64), ("pageouts", ctypes.c_uint64),
+        ("faults", ctypes.c_uint64), ("cow_faults", ctypes.c_uint64),
+        ("lookups", ctypes.c_uint64), ("hits", ctypes.c_uint64), ("purges", ctypes.c_uint64),
+        ("purgeable_count", ctypes.c_uint32), ("speculative_count", ctypes.c_uint32),
+        ("decompressions", ctypes.c_uint64), ("compressions", ctypes.c_uint64),
+        ("swapins", ctypes.c_uint64), ("swapouts", ctypes.c_uint64),
+        ("compressor_page_count", ctypes.c_uint32), ("throttled_count", ctypes.c_uint32),
+        ("external_page_count", ctypes.c_uint32), ("internal_page_count", ctypes.c_uint32),
+        ("total_uncompressed_pages_in_compressor", ctypes.c_uint64),
+    ]
+
+
+class _DarwinSource:
+    """sysctl and mach host statistics through libSystem"""
+
+    HOST_CPU_LOAD_INFO = 3
+    HOST_VM_INFO64 = 4
+    CPU_STATE_IDLE = 2  # user, system, idle, nice
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.libc.mach_host_self.restype = ctypes.c_uint32
+        self.host = self.libc.mach_host_self()
+        page_size = ctypes.c_size_t()
+        if self.libc.host_page_size(self.host, ctypes.byref(page_size)) != 0:
+            raise OSError("host_page_size failed")
+        self.page_size = page_size.value
+
+    def _sysctl(self, name: str, ctype):
+        value = ctype()
+        size = ctypes.c_size_t(ctypes.sizeof(value))
+        if self.libc.sysctlbyname(name.encode(), ctypes.byref(value), ctypes.byref(size), None, 0) != 0:
+            raise OSError(ctypes.get_errno(), f"sysctl {name} failed")
+        return value
+
+    def uptime_seconds(self) -> float:
+        boot = self._sysctl("kern.boottime", _Timeval)
+        return time.time() - (boot.tv_sec + boot.tv_usec / 1e6)
+
+    def memory(self) -> tuple[int, float, int, float]:
+        """(total bytes, used %, swap total bytes, swap used %)"""
+        total = self._sysctl("hw.memsize", ctypes.c_uint64).value
+        stats = _VmStatistics64()
+        count = ctypes.c_uint32(ctypes.sizeof(stats) // 4)
+        if self.libc.host_statistics64(self.host, self.HOST_VM_INFO64, ctypes.byref(stats),
+                                       ctypes.byref(count)) != 0:
+            raise OSError("host_statistics64 failed")
+        # Same definition the summary has always used: active + wired of the
+        # free/active/inactive/wired pages
+        pages = stats.free_count + stats.active_count + stats.inactive_count + stats.wire_count
+        used_pct = (stats.active_count + stats.wire_count) / pages * 100 if pages else 0.0
+
+        swap = self._sysctl("vm.swapusage", _XswUsage)
+        swap_pct = swap.xsu_used / swap.xsu_total * 100 if swap.xsu_total else 0.0
+        return total, used_pct, swap.xsu_total, swap_pct
+
+    def cpu_ticks(self) -> Optional[tuple[int, int]]:
+        """(busy, total) ticks across all CPUs"""
+        ticks = (ctypes.c_uint32 * 4)()
+        count = ctypes.c_uint32(4)
+        if self.libc.host_statistics(self.host, self.HOST_CPU_LOAD_INFO, ticks, ctypes.byref(count)) != 0:
+            return None
+        total = sum(ticks)
+        return total - ticks[self.CPU_STATE_IDLE], total
+
+
+def _platform_source():
+    if sys.platform.startswith("linux"):
+        return _LinuxSource()
+    if sys.platform == "darwin":
+        return _DarwinSource()
+    return None
+
+
+class MetricsProvider:
+    """Samples node metrics; CPU busy % is measured between consecutive samples"""
+
+    def __init__(self, disk_path: str = "/"):
+        self.disk_path = disk_path
+        self._lock = threading.Lock()
+        self._last_ticks: Optional[tuple[int, int]] = None
+        try:
+            self.source = _platform_source()
+        except (OSError, AttributeError) as e:
+            logger.warning(f"Native metrics unavailable: {e}")
+            self.source = None
+
+    def sample(self) -> SystemMetrics:
+        metrics = SystemMetrics(timestamp=time.time(), cpu_count=os.cpu_count() or 0)
+
+        try:
+            metrics.load_1m, metrics.load_5m, metrics.load_15m = os.getloadavg()
+        except OSError as e:
+            logger.warning(f"Error getting load average: {e}")
+
+        try:
+            st = os.statvfs(self.disk_path)
+            metrics.disk_total_gb = st.f_blocks * st.f_frsize / GB
+            metrics.disk_free_gb = st.f_bavail * st.f_frsize / GB
+        except OSError as e:
+            logger.warning(f"Error getting disk space: {e}")
+
+        if self.source is None:
+            return metrics
+
+        try:
+            metrics.uptime_hours = self.source.uptime_seconds() / 3600
+        except (OSError, ValueError) as e:
+            logger.warning(f"Error getting uptime: {e}")
+
+        try:
+            total, metrics.memory_used_pct, swap_total, metrics.swap_used_pct = self.source.memory()
+            metrics.memory_total_gb = total / GB
+            metrics.swap_total_gb = swap_total / GB
+        except (OSError, ValueError) as e:
+            logger.warning(f"Error getting memory stats: {e}")
+
+        try:
+            ticks = self.source.cpu_ticks()
+        except (OSError, ValueError, IndexError) as e:
+            logger.warning(f"Error getting CPU ticks: {e}")
+            ticks = None
+        with self._lock:
+            previous, self._last_ticks = self._last_ticks, ticks
+        if ticks and previous and ticks[1] > previous[1]:
+            metrics.cpu_busy_pct = (ticks[0] - previous[0]) / (ticks[1] - previous[1]) * 100
+
+        return metrics
+
+
+class MetricsSampler:
+    """Background sampler keeping a rolling window of samples"""
+
+    def __init__(self, interval: float = 5.0, window: int = 720,
+                 provider: Optional[MetricsProvider] = None,
+                 on_sample: Optional[Callable[[SystemMetrics], None]] = None):
+        """
+        Args:
+            interval: Seconds between samples
+            window: Number of samples kept (default: an hour at 5s)
+            provider: Metrics provider (default: a new one for "/")
+            on_sample: Called with each sample (e.g. to persist it)
+        """
+        self.interval = interval
+        self.provider = provider or MetricsProvider()
+        self.on_sample = on_sample
+        self.samples: deque = deque(maxlen=window)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'MetricsSampler':
+        self.provider.sample()  # CPU ticks baseline
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            sample = self.provider.sample()
+            self.samples.append(sample)
+            if self.on_sample:
+                try:
+                    self.on_sample(sample)
+                except Exception as e:
+                    logger.warning(f"Metrics sample callback failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'MetricsSampler':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+_provider: Optional[MetricsProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> MetricsProvider:
+    """Process-wide provider for the root volume"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = MetricsProvider()
+        return _provider
+
+
+if __name__ == "__main__":
+    # Print a sample every few seconds: python3 -m arthur.notifications.system_metrics [interval]
+    interval = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    provider = MetricsProvider()
+    provider.sample()
+    while True:
+        time.sleep(interval)
+        m = provider.sample()
+        cpu = f"{m.cpu_busy_pct:.0f}%" if m.cpu_busy_pct is not None else "-"
+        print(f"{time.strftime('%H:%M:%S')}  cpu {cpu}  load {m.load_1m:.2f}  "
+              f"mem {m.memory_used_pct:.0f}%  swap {m.swap_used_pct:.0f}%  disk free {m.disk_free_gb:.0f} GB")
@@ -0,0 +1,234 @@
+"""
+HTTP Transport
+Pooled keep-alive HTTP(S) connections for API clients. Requests reuse open
+connections, so there is one TCP/TLS handshake per pooled connection
+rather than per request. Connect and read have separate timeouts. 429 and
+5xx responses are retried with jittered exponential backoff, honouring
+Retry-After. Latency and retry counts are kept per transport.
+
+PostmarkNotifier takes any object with the same request() method, so
+tests can point it at a local stub (see postmark_stub) or replace the
+transport entirely.
+"""
+
+import http.client
+import logging
+import queue
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Optional, Protocol
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class HttpResponse:
+    """A response plus what it took to get it"""
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    attempts: int = 1
+    latency_ms: float = 0.0  # all attempts, including backoff
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class ConnectError(OSError):
+    """A connection couldn't be established; nothing was sent"""
+
+
+class Transport(Protocol):
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[dict[str, str]] = None) -> HttpResponse: ...
+
+
+@dataclass
+class TransportStats:
+    """Request counts and latencies of one transport"""
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0  # network errors and final non-2xx responses
+    connections_opened: int = 0
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    def summary(self) -> dict[str, float]:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "connections_opened": self.connections_opened,
+            "latency_ms_mean": statistics.fmean(latencies) if latencies else 0.0,
+            "latency_ms_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+        }
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds: either delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class PooledHttpTransport:
+    """Keep-alive connections to one origin, with retries"""
+
+    def __init__(self, base_url: str, pool_size: int = 4, connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0):
+        """
+        Args:
+            base_url: Scheme and host (and optional path prefix), e.g. https://api.postmarkapp.com
+            pool_size: Idle connections kept open
+            connect_timeout: Seconds to establish a connection (including TLS)
+            read_timeout: Seconds to wait for a response once sent
+            max_retries: Retries of 429/5xx responses and failed connects
+            backoff_base: First backoff in seconds, doubled per retry (with full jitter)
+            backoff_max: Longest wait between attempts, including Retry-After
+        """
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {base_url}")
+        self.base_url = base_url.rstrip("/")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = TransportStats()
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+        self._stats_lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        conn = cls(self.host, self.port, timeout=self.connect_timeout)
+        try:
+            conn.connect()
+        except OSError as e:
+            conn.close()
+            raise ConnectError(f"connect to {self.host} failed: {e}") from e
+        conn.sock.settimeout(self.read_timeout)
+        with self._stats_lock:
+            self.stats.connections_opened += 1
+        return conn
+
+    def _checkout(self) -> tuple[http.client.HTTPConnection, bool]:
+        """(connection, reused)"""
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._connect(), False
+
+    def _checkin(self, conn: http.client.HTTPConnection):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _send_once(self, method: str, path: str, body: Optional[bytes],
+                   headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+        conn, reused = self._checkout()
+        try:
+            conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+            # The server closed an idle keep-alive connection before reading
+            # the request; a fresh connection is safe to try once
+            conn = self._connect()
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+        return response.status, {k.lower(): v for k, v in response.getheaders()}, data
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[dict[str, str]] = None) -> HttpResponse:
+        """
+        Send a request, retrying 429/5xx responses and failed connects.
+
+        Returns the last response (which may be an error status); raises
+        OSError / http.client.HTTPException if no response was received.
+        """
+        headers = dict(headers or {})
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                status, response_headers, data = self._send_once(method, path, body, headers)
+            except ConnectError as e:
+                # Nothing was sent: safe to retry
+                if attempt >= self.max_retries:
+                    self._record(started, attempt, failed=True)
+                    raise
+                delay = self._backoff(attempt, None)
+                logger.info(f"{method} {path}: {e}; retrying in {delay:.1f}s")
+            except (OSError, http.client.HTTPException):
+                # Timeouts and resets after sending: the request may have been
+                # processed, so it isn't repeated
+                self._record(started, attempt, failed=True)
+                raise
+            else:
+                if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                    latency = self._record(started, attempt, failed=not 200 <= status < 300)
+                    return HttpResponse(status, response_headers, data, attempt + 1, latency)
+                delay = self._backoff(attempt, _retry_after_seconds(response_headers.get("retry-after")))
+                logger.info(f"{method} {path}: HTTP {status}; retrying in {delay:.1f}s")
+            attempt += 1
+            time.sleep(delay)
+
+    def _record(self, started: float, retries: int, failed: bool) -> float:
+        latency = (time.monotonic() - started) * 1000
+        with self._stats_lock:
+            self.stats.requests += 1
+            self.stats.retries += retries
+            self.stats.failures += failed
+            self.stats.latencies_ms.append(latency)
+        return latency
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
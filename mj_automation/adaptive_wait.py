@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Adaptive Wait Model
+
+Learns how long Midjourney image and video jobs take (submission to
+completion) and schedules status polls around that: sparse early in a job,
+dense near the expected finish, backing off again if the job runs late.
+
+Usage:
+    model = WaitModel()
+    while not done:
+        time.sleep(model.next_interval('image', elapsed))
+    model.record('image', elapsed)
+"""
+
+import json
+import os
+import statistics
+import threading
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_HISTORY_PATH = os.path.expanduser("~/.mj_automation/durations.json")
+
+
+class WaitModel:
+    """Duration history per job kind and the poll schedule derived from it"""
+
+    def __init__(self, history_path: Optional[str] = DEFAULT_HISTORY_PATH,
+                 min_interval: float = 1.0, max_interval: float = 15.0,
+                 default_interval: float = 5.0, window: int = 50):
+        """
+        Args:
+            history_path: JSON file the history is persisted to (None = memory only)
+            min_interval: Poll interval near the expected finish
+            max_interval: Longest sleep between polls early in a job
+            default_interval: Fixed interval used until there is history
+            window: Number of recent durations kept per kind
+        """
+        self.history_path = history_path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.window = window
+        self._lock = threading.Lock()
+        self._history: Dict[str, List[float]] = {}
+        if history_path and os.path.exists(history_path):
+            try:
+                with open(history_path) as f:
+                    self._history = {k: [float(x) for x in v] for k, v in json.load(f).items()}
+            except (OSError, ValueError):
+                self._history = {}
+
+    def record(self, kind: str, seconds: float):
+        """Add an observed job duration"""
+        with self._lock:
+            durations = self._history.setdefault(kind, [])
+            durations.append(round(seconds, 2))
+            del durations[:-self.window]
+            if self.history_path:
+                os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+                tmp = f"{self.history_path}.{os.getpid()}.tmp"
+                with open(tmp, 'w') as f:
+                    json.dump(self._history, f)
+                os.replace(tmp, self.history_path)
+
+    def expected(self, kind: str) -> Optional[Tuple[float, float, float]]:
+        """(early, median, late) duration estimate, or None without history"""
+        with self._lock:
+            durations = list(self._history.get(kind, []))
+        if not durations:
+            return None
+        median = statistics.median(durations)
+        if len(durations) < 5:
+            return median * 0.8, median, median * 1.25
+        deciles = statistics.quantiles(durations, n=10)
+        return deciles[0], median, deciles[-1]
+
+    def next_interval(self, kind: str, elapsed: float, fallback: Optional[float] = None) -> float:
+        """
+        Seconds to sleep before the next poll.
+
+        Before the early estimate, sleep half the remaining time (so polls
+        converge on it); between early and late estimates, poll at
+        min_interval; after the late estimate, back off gradually. Without
+        history for this kind, returns fallback (or default_interval).
+        """
+        estimate = self.expected(kind)
+        if estimate is None:
+            return fallback if fallback is not None else self.default_interval
+        early, _, late = estimate
+
+        if elapsed < early:
+            interval = (early - elapsed) / 2
+        elif elapsed <= late:
+            interval = self.min_interval
+        else:
+            interval = (elapsed - late) / 4
+
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def describe(self, kind: str, fallback: Optional[float] = None) -> str:
+        """One-line summary; pass the same fallback as to next_interval"""
+        estimate = self.expected(kind)
+        if estimate is None:
+            interval = fallback if fallback is not None else self.default_interval
+            return f"{kind}: no history (fixed {interval:g}s polls)"
+        early, median, late = estimate
+        count = len(self._history.get(kind, []))
+        return f"{kind}: ~{median:.0f}s typical ({early:.0f}-{late:.0f}s, {count} jobs)"
+
+
+_shared_models: Dict[str, WaitModel] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_wait_model(history_path: str = DEFAULT_HISTORY_PATH) -> WaitModel:
+    """Process-wide model per history file, so parallel tabs learn together"""
+    with _shared_lock:
+        if history_path not in _shared_models:
+            _shared_models[history_path] = WaitModel(history_path)
+        return _shared_models[history_path]
@@ -6,6 +6,14 @@ Generates themed images/videos in batch and saves to remote storage.
 
 Usage:
     python3 batch_workflow.py themes.json
+    python3 batch_workflow.py themes.json --resume   # continue a crashed run
+    python3 batch_workflow.py themes.json --cache    # reuse earlier identical prompts
+    python3 batch_workflow.py themes.json --tabs 3   # three Chrome tabs in parallel
+    python3 batch_workflow.py themes.json --trace trace.json   # per-stage Chrome trace
+    python3 batch_workflow.py themes.jsonl           # large batch, themes read lazily
+    python3 batch_workflow.py themes.json --video-source batch --video-tabs 1
+                                                     # animate batch images on a separate tab
+    python3 batch_workflow.py themes.json --postprocess   # thumbnails, conversions, contact sheets
 
 Example themes.json:
 {
@@ -26,18 +34,51 @@ Example themes.json:
         "video_path": "/Volumes/STUDIO/VIDEO/2026"
     }
 }
+
+Example themes.jsonl (first line is the batch header, then one theme per line):
+{"batch_id": "batch_001", "output": {"remote_host": "beta"}}
+{"id": "cosmic_dawn", "image_prompts": ["ethereal sunrise over alien landscape --ar 16:9 --v 6.1"]}
+{"id": "ocean_depths", "image_prompts": ["deep ocean bioluminescence --ar 16:9 --v 6.1"]}
 """
 
+import argparse
 import json
 import sys
 import os
+import subprocess
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
 
 # Import our automation module
 from mj_web_automation import MidjourneyAutomation, VideoGenerationResult, batch_generate
+from media_index import MediaIndex
+from prompt_cache import PromptCache, CACHE_MODES
+from tab_pool import TabPool
+from tracer import Tracer
+from postprocess import PostProcessor
+
+# Checkpoint journal, one JSON line per stage transition
+JOURNAL_FILENAME = "journal.jsonl"
+
+# Chrome trace of the run (open in chrome://tracing or ui.perfetto.dev)
+TRACE_FILENAME = "trace.json"
+
+# Manifest lines appended as prompts finish, compacted into manifest.json at the end
+MANIFEST_LINES_FILENAME = "manifest.jsonl"
+MANIFEST_FILENAME = "manifest.json"
+
+# Seconds between remote syncs of manifest.jsonl during a run
+MANIFEST_SYNC_INTERVAL = 60
+
+# Where a theme's video comes from: a freshly generated image, or an image
+# this batch already generated for the theme
+VIDEO_SOURCES = ('generate', 'batch')
 
 
 @dataclass
@@ -48,166 +89,762 @@ class BatchConfig:
     remote_host: str = "beta"
     images_path: str = "/Volumes/STUDIO/IMAGES"
     video_path: str = "/Volumes/STUDIO/VIDEO"
+    cache: bool = False  # Reuse earlier generations of identical prompts
+    themes_file: Optional[str] = None  # JSON Lines themes, read lazily instead of themes
+    video_source: Optional[str] = None  # Default video_source for themes without one
 
 
 @dataclass
 class BatchResult:
-    """Result of a batch run"""
+    """Result of a batch run (per-prompt entries are in the manifest files)"""
     batch_id: str
     started_at: str
     completed_at: str
     total_prompts: int
     successful: int
     failed: int
-    results: List[Dict]
+    manifest_path: str
+    contact_sheets: Dict[str, str] = field(default_factory=dict)  # theme -> remote path
 
 
 def load_themes(filepath: str) -> BatchConfig:
-    """Load themes from JSON file"""
+    """
+    Load themes from a JSON file, or the header of a JSON Lines file.
+
+    For .jsonl files only the first line (batch settings) is read here;
+    themes are streamed from the file by iter_themes as the batch runs.
+    """
+    streaming = filepath.endswith('.jsonl')
     with open(filepath) as f:
-        data = json.load(f)
+        if streaming:
+            line = f.readline()
+            while line and not line.strip():
+                line = f.readline()
+            data = json.loads(line) if line else {}
+        else:
+            data = json.load(f)
 
     output = data.get('output', {})
     return BatchConfig(
         batch_id=data.get('batch_id', f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"),
-        themes=data.get('themes', []),
+        themes=[] if streaming else data.get('themes', []),
         remote_host=output.get('remote_host', 'beta'),
         images_path=output.get('images_path', '/Volumes/STUDIO/IMAGES'),
-        video_path=output.get('video_path', '/Volumes/STUDIO/VIDEO')
+        video_path=output.get('video_path', '/Volumes/STUDIO/VIDEO'),
+        cache=bool(data.get('cache', False)),
+        themes_file=filepath if streaming else None,
+        video_source=data.get('video_source')
     )
 
 
-def run_batch(config: BatchConfig) -> BatchResult:
-    """Run a batch of themed generations"""
-    mj = MidjourneyAutomation(poll_interval=5, max_wait=180)
+def iter_themes(config: BatchConfig) -> Iterator[Dict]:
+    """Themes in order, read one line at a time for JSON Lines themes files"""
+    yield from config.themes
+    if not config.themes_file:
+        return
+    with open(config.themes_file) as f:
+        header_seen = False
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if not header_seen:
+                header_seen = True
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{config.themes_file}:{line_no}: invalid theme line: {e}")
+
+
+class BatchJournal:
+    """
+    Append-only checkpoint journal for a batch run.
+
+    Every stage transition (generate, download, transfer) of every prompt is
+    appended as one JSON line, so a crashed run can be resumed and the
+    manifest rebuilt from what actually finished.
+    """
+
+    STAGES = ('generate', 'download', 'postprocess', 'transfer')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Dict]] = {}
+        self._order: List[str] = []
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line from a crash mid-write
+                    continue
+                self._apply(record)
+
+    def _apply(self, record: Dict):
+        prompt_id = record['id']
+        if prompt_id not in self._stages:
+            self._stages[prompt_id] = {}
+            self._order.append(prompt_id)
+        self._stages[prompt_id][record['stage']] = record
+
+    def archive(self):
+        """Move an existing journal aside so a fresh run starts empty"""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.replace(self.path, f"{self.path}.{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            self._stages = {}
+            self._order = []
+
+    def record(self, prompt_id: str, stage: str, status: str, **data):
+        """Append a stage transition and flush it to disk"""
+        record = {
+            'id': prompt_id,
+            'stage': stage,
+            'status': status,
+            'at': datetime.now().isoformat(),
+            'data': data
+        }
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._apply(record)
+
+    def get(self, prompt_id: str, stage: str) -> Optional[Dict]:
+        """Latest record for a prompt stage, if any"""
+        return self._stages.get(prompt_id, {}).get(stage)
+
+    def is_done(self, prompt_id: str, stage: str) -> bool:
+        record = self.get(prompt_id, stage)
+        return record is not None and record['status'] == 'done'
+
+    def completed_count(self) -> int:
+        """Number of prompts whose transfer is done"""
+        return sum(1 for prompt_id in self._order if self.is_done(prompt_id, 'transfer'))
+
+    def build_entry(self, prompt_id: str) -> Optional[Dict]:
+        """Manifest entry for one prompt, or None if it never reached generate"""
+        generate = self.get(prompt_id, 'generate')
+        if generate is None:
+            return None
+        data = generate['data']
+        entry = {
+            'id': prompt_id,
+            'type': data.get('type'),
+            'theme': data.get('theme'),
+            'prompt': data.get('prompt'),
+        }
+        if data.get('type') == 'video':
+            entry['motion_mode'] = data.get('motion_mode')
+
+        if generate['status'] != 'done':
+            entry['success'] = False
+            entry['error'] = data.get('error')
+        else:
+            transfer = self.get(prompt_id, 'transfer')
+            entry['success'] = True
+            if data.get('type') == 'video':
+                entry['video_url'] = data.get('video_url')
+                entry['source_image_url'] = data.get('source_image_url')
+            else:
+                entry['image_count'] = len(data.get('image_urls', []))
+            entry['remote_path'] = (transfer or {}).get('data', {}).get('remote_dir')
+            if transfer and transfer['status'] == 'done':
+                entry['bytes'] = transfer['data'].get('bytes')
+            entry['elapsed'] = data.get('elapsed')
+            if data.get('cached'):
+                entry['cached'] = True
+
+        entry['stages'] = {
+            stage: self.get(prompt_id, stage)['status']
+            for stage in self.STAGES if self.get(prompt_id, stage)
+        }
+        postprocess = self.get(prompt_id, 'postprocess')
+        if postprocess:
+            # Small derived files, so tools needn't decode full-size media
+            base = entry.get('remote_path')
+            for key in ('thumbnails', 'posters'):
+                paths = postprocess['data'].get(key, [])
+                if paths:
+                    entry[key] = [f"{base}/{os.path.basename(p)}" if base else p for p in paths]
+        trace = self.get(prompt_id, 'trace')
+        if trace:
+            entry['spans'] = trace['data']['spans']
+        return entry
+
+    def theme_images(self) -> Dict[str, List[str]]:
+        """Downloaded image files per theme, for contact sheets"""
+        images: Dict[str, List[str]] = {}
+        for prompt_id in self._order:
+            generate = self.get(prompt_id, 'generate')
+            download = self.get(prompt_id, 'download')
+            if not generate or not download or generate['data'].get('type') != 'image':
+                continue
+            theme = generate['data'].get('theme')
+            images.setdefault(theme, []).extend(
+                f for f in download['data'].get('local_files', []) if os.path.exists(f))
+        return images
+
+
+class ManifestWriter:
+    """
+    Incremental batch manifest.
+
+    Each finished prompt's entry is appended to manifest.jsonl and the file
+    is synced to the remote host every sync_interval seconds, so a crash
+    loses at most one interval of manifest. compact() writes the final
+    manifest.json, keeping the last entry per prompt (resumed prompts are
+    appended again).
+    """
+
+    def __init__(self, local_dir: str, remote_host: str, remote_dir: str,
+                 sync_interval: float = MANIFEST_SYNC_INTERVAL):
+        self.lines_path = os.path.join(local_dir, MANIFEST_LINES_FILENAME)
+        self.path = os.path.join(local_dir, MANIFEST_FILENAME)
+        self.remote_host = remote_host
+        self.remote_dir = remote_dir
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._last_sync = time.time()
+        self._remote_dir_created = False
+
+    def reset(self):
+        """Start an empty manifest (fresh, non-resumed run)"""
+        with self._lock:
+            if os.path.exists(self.lines_path):
+                os.remove(self.lines_path)
+
+    def append(self, entry: Dict):
+        """Record a finished prompt and sync if the interval has passed"""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.lines_path), exist_ok=True)
+            with open(self.lines_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+        if time.time() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self, *paths: str):
+        """Copy manifest.jsonl (or the given files) to the remote host"""
+        # Workers that find a sync in progress skip it rather than queue up
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if not self._remote_dir_created:
+                subprocess.run(f'ssh {self.remote_host} "mkdir -p {self.remote_dir}"', shell=True)
+                self._remote_dir_created = True
+            for path in paths or (self.lines_path,):
+                if os.path.exists(path):
+                    subprocess.run(f'rsync -az "{path}" "{self.remote_host}:{self.remote_dir}/"', shell=True)
+            self._last_sync = time.time()
+        finally:
+            self._sync_lock.release()
+
+    def latest_entries(self) -> Iterator[Dict]:
+        """Last entry per prompt, in first-seen order, read from disk"""
+        if not os.path.exists(self.lines_path):
+            return
+        # First pass: remember where each prompt's last entry starts
+        order: Dict[str, int] = {}
+        offsets: Dict[str, int] = {}
+        with open(self.lines_path, 'rb') as f:
+            offset = 0
+            for line in f:
+                try:
+                    prompt_id = json.loads(line)['id']
+                except (json.JSONDecodeError, KeyError):
+                    # Torn last line from a crash mid-write
+                    offset += len(line)
+                    continue
+                order.setdefault(prompt_id, len(order))
+                offsets[prompt_id] = offset
+                offset += len(line)
+
+            for prompt_id in sorted(order, key=order.get):
+                f.seek(offsets[prompt_id])
+                yield json.loads(f.readline())
+
+    def counts(self) -> Tuple[int, int]:
+        """(total, successful) over the latest entries"""
+        total = successful = 0
+        for entry in self.latest_entries():
+            total += 1
+            successful += bool(entry.get('success'))
+        return total, successful
+
+    def compact(self, result: 'BatchResult'):
+        """Write manifest.json, streaming entries from manifest.jsonl"""
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write('{\n')
+            for key, value in vars(result).items():
+                if key != 'manifest_path':
+                    f.write(f'  {json.dumps(key)}: {json.dumps(value)},\n')
+            f.write('  "results": [')
+            for i, entry in enumerate(self.latest_entries()):
+                f.write(',' if i else '')
+                f.write('\n    ' + json.dumps(entry))
+            f.write('\n  ]\n}\n')
+        os.replace(tmp, self.path)
+
+
+def plan_batch(config: BatchConfig) -> Iterator[Dict]:
+    """Lazily expand themes into an ordered stream of prompt work items"""
+    for theme_idx, theme in enumerate(iter_themes(config)):
+        theme_id = theme.get('id', f'theme_{theme_idx}')
+        if theme.get('cache', 'reuse') not in CACHE_MODES:
+            raise ValueError(f"Theme {theme_id}: cache must be one of {CACHE_MODES}")
+        video_source = theme.get('video_source', config.video_source or 'generate')
+        if video_source not in VIDEO_SOURCES:
+            raise ValueError(f"Theme {theme_id}: video_source must be one of {VIDEO_SOURCES}")
+        image_ids = []
+        for img_idx, prompt in enumerate(theme.get('image_prompts', [])):
+            image_ids.append(f"{theme_id}_img_{img_idx}")
+            yield {
+                'id': f"{theme_id}_img_{img_idx}",
+                'type': 'image',
+                'theme': theme_id,
+                'theme_index': theme_idx,
+                'prompt': prompt,
+                'cache': theme.get('cache', 'reuse')
+            }
+        if theme.get('video_prompt') or theme.get('video_job_id') or theme.get('video_image_url'):
+            yield {
+                'id': f"{theme_id}_video",
+                'type': 'video',
+                'theme': theme_id,
+                'theme_index': theme_idx,
+                'prompt': theme.get('video_prompt', ''),
+                'motion_mode': theme.get('motion_mode', 'low'),
+                'video_source': video_source,
+                'video_job_id': theme.get('video_job_id'),
+                'video_image_url': theme.get('video_image_url'),
+                'video_image_index': theme.get('video_image_index', 0),
+                'source_items': image_ids
+            }
+
+
+def _files_present(files: List[str]) -> bool:
+    return bool(files) and all(os.path.exists(f) for f in files)
 
-    started_at = datetime.now().isoformat()
-    results = []
-    successful = 0
-    failed = 0
-    total = 0
 
+# Manifest/journal group for each post-processing output kind
+_POSTPROCESS_GROUPS = {
+    'thumbnail': 'thumbnails',
+    'poster': 'posters',
+    'png': 'converted',
+    'avif': 'converted',
+}
+
+
+def _postprocess(mj: MidjourneyAutomation, processor: PostProcessor, journal: BatchJournal,
+                 item: Dict, local_files: List[str]) -> List[str]:
+    """Run the post-processing stage for an item. Returns the derived files."""
+    with mj.tracer.span('postprocess', files=len(local_files)) as attrs:
+        results = processor.process(local_files)
+        attrs['done'] = sum(1 for r in results if r.status == 'done')
+        attrs['skipped'] = sum(1 for r in results if r.status == 'skipped')
+
+    outputs: Dict[str, List[str]] = {group: [] for group in set(_POSTPROCESS_GROUPS.values())}
+    for result in results:
+        if result.ok:
+            outputs[_POSTPROCESS_GROUPS[result.transform.kind]].append(result.transform.output)
+    status = 'failed' if any(r.status == 'failed' for r in results) else 'done'
+    journal.record(item['id'], 'postprocess', status, **outputs)
+    return [path for paths in outputs.values() for path in paths]
+
+
+def _download_and_transfer(mj: MidjourneyAutomation, journal: BatchJournal, item: Dict,
+                           download, remote_host: str, remote_dir: str, job_id: Optional[str] = None,
+                           processor: Optional[PostProcessor] = None):
+    """Run download, post-process and transfer stages for an item, skipping journaled work"""
+    prompt_id = item['id']
+
+    download_record = journal.get(prompt_id, 'download')
+    if journal.is_done(prompt_id, 'download') and _files_present(download_record['data']['local_files']):
+        local_files = download_record['data']['local_files']
+        print(f"    ↺ Download already complete ({len(local_files)} files)")
+    else:
+        local_files, expected = download()
+        status = 'done' if local_files and len(local_files) >= expected else 'failed'
+        journal.record(prompt_id, 'download', status, local_files=local_files)
+
+    # Derived files are rebuilt only when their sources changed
+    derived = _postprocess(mj, processor, journal, item, local_files) if processor else []
+    transfer_files = local_files + derived
+
+    transfer_record = journal.get(prompt_id, 'transfer')
+    if (journal.is_done(prompt_id, 'transfer')
+            and set(transfer_files) <= set(transfer_record['data'].get('local_files', []))):
+        print(f"    ↺ Transfer already complete")
+        return
+
+    ok = mj.transfer_to_remote(transfer_files, remote_host, remote_dir, prompt=item['prompt'], job_id=job_id)
+    journal.record(prompt_id, 'transfer', 'done' if ok else 'failed',
+                   local_files=transfer_files, remote_dir=remote_dir,
+                   bytes=sum(os.path.getsize(f) for f in transfer_files if os.path.exists(f)))
+    if ok and item['type'] == 'image' and mj.prompt_cache:
+        mj.prompt_cache.update_paths(item['prompt'], local_files, remote_dir)
+
+
+def _process_image(mj: MidjourneyAutomation, config: BatchConfig, journal: BatchJournal,
+                   item: Dict, local_base: str, year: str, navigate: bool,
+                   processor: Optional[PostProcessor] = None) -> bool:
+    """Process one image prompt. Returns True if the browser was used."""
+    prompt_id = item['id']
+    theme_id = item['theme']
+    prompt = item['prompt']
+    used_browser = False
+
+    if journal.is_done(prompt_id, 'generate'):
+        generated = journal.get(prompt_id, 'generate')['data']
+        print(f"    ↺ Already generated ({len(generated['image_urls'])} images)")
+    else:
+        result = mj.generate(prompt, navigate=navigate, cache=item.get('cache', 'reuse'))
+        used_browser = not result.cached
+        if not result.success:
+            journal.record(prompt_id, 'generate', 'failed', error=result.error, **item)
+            print(f"    ❌ Failed: {result.error}")
+            return used_browser
+        generated = {
+            'job_id': result.job_id,
+            'image_urls': result.image_urls,
+            'elapsed': result.elapsed_seconds,
+            'cached': result.cached
+        }
+        journal.record(prompt_id, 'generate', 'done', **generated, **item)
+        if result.cached:
+            print(f"    ♻️  Reused {len(result.image_urls)} cached images (job {result.job_id})")
+        else:
+            print(f"    ✅ Generated {len(result.image_urls)} images in {result.elapsed_seconds:.1f}s")
+
+    image_urls = generated['image_urls']
+    local_dir = os.path.join(local_base, theme_id)
+    remote_dir = f"{config.images_path}/{year}/{config.batch_id}/{theme_id}"
+
+    def download():
+        return mj.download_images(image_urls, local_dir, prompt_id), len(image_urls)
+
+    _download_and_transfer(mj, journal, item, download, config.remote_host, remote_dir,
+                           job_id=generated.get('job_id'), processor=processor)
+    return used_browser
+
+
+def _video_source_image(journal: BatchJournal, item: Dict) -> Optional[Dict]:
+    """
+    Existing image to animate for a video item: an explicit job id / URL
+    from the theme, or (video_source 'batch') the first image this theme
+    generated. None means generate a fresh source image.
+    """
+    if item.get('video_job_id') or item.get('video_image_url'):
+        return {'job_id': item.get('video_job_id'), 'image_url': item.get('video_image_url'),
+                'image_index': item.get('video_image_index', 0)}
+    if item.get('video_source') != 'batch':
+        return None
+    index = item.get('video_image_index', 0)
+    for source_id in item.get('source_items', []):
+        if journal.is_done(source_id, 'generate'):
+            generated = journal.get(source_id, 'generate')['data']
+            image_urls = generated.get('image_urls', [])
+            if generated.get('job_id') and len(image_urls) > index:
+                return {'job_id': generated['job_id'], 'image_url': image_urls[index], 'image_index': index}
+    return None
+
+
+def _process_video(mj: MidjourneyAutomation, config: BatchConfig, journal: BatchJournal,
+                   item: Dict, local_base: str, year: str, navigate: bool,
+                   processor: Optional[PostProcessor] = None) -> bool:
+    """Process one video prompt. Returns True if the browser was used."""
+    prompt_id = item['id']
+    theme_id = item['theme']
+    used_browser = False
+
+    print(f"    Motion mode: {item['motion_mode']}")
+
+    if journal.is_done(prompt_id, 'generate'):
+        generated = journal.get(prompt_id, 'generate')['data']
+        print(f"    ↺ Already generated video")
+    else:
+        source = _video_source_image(journal, item)
+        if source:
+            print(f"    Animating existing image (job {source['job_id'] or source['image_url']})")
+            video_result = mj.animate_image(motion_mode=item['motion_mode'], prompt=item['prompt'], **source)
+        else:
+            if item.get('video_source') == 'batch':
+                print(f"    No image generated for this theme - generating a source image")
+            # Generates the source image first, then animates it
+            video_result = mj.generate_video(item['prompt'], motion_mode=item['motion_mode'], navigate=navigate)
+        used_browser = True
+        if not video_result.success:
+            journal.record(prompt_id, 'generate', 'failed', error=video_result.error, **item)
+            print(f"    ❌ Failed: {video_result.error}")
+            return used_browser
+        generated = {
+            'job_id': video_result.job_id,
+            'video_url': video_result.video_url,
+            'source_image_url': video_result.source_image_url,
+            'elapsed': video_result.elapsed_seconds
+        }
+        journal.record(prompt_id, 'generate', 'done', **generated, **item)
+        print(f"    ✅ Generated video in {video_result.elapsed_seconds:.1f}s")
+
+    local_dir = os.path.join(local_base, theme_id)
+    remote_dir = f"{config.video_path}/{year}/{config.batch_id}/{theme_id}"
+
+    def download():
+        local_files = []
+        expected = 0
+        # Download video file
+        if generated.get('video_url'):
+            expected += 1
+            video_file = mj.download_video(generated['video_url'], local_dir, prompt_id)
+            if video_file:
+                local_files.append(video_file)
+        # Also save the source image if available
+        if generated.get('source_image_url'):
+            expected += 1
+            local_files.extend(mj.download_images([generated['source_image_url']], local_dir, f"{prompt_id}_source"))
+        return local_files, expected
+
+    _download_and_transfer(mj, journal, item, download, config.remote_host, remote_dir,
+                           job_id=generated.get('job_id'), processor=processor)
+    return used_browser
+
+
+def _journal_path(config: BatchConfig) -> str:
+    return f"/tmp/mj_{config.batch_id}/{JOURNAL_FILENAME}"
+
+
+def _trace_path(config: BatchConfig) -> str:
+    return f"/tmp/mj_{config.batch_id}/{TRACE_FILENAME}"
+
+
+def _manifest_writer(config: BatchConfig) -> ManifestWriter:
+    year = datetime.now().strftime('%Y')
+    return ManifestWriter(f"/tmp/mj_{config.batch_id}", config.remote_host,
+                          f"{config.images_path}/{year}/{config.batch_id}")
+
+
+def _process_item(mj: MidjourneyAutomation, config: BatchConfig, journal: BatchJournal,
+                  manifest: ManifestWriter, item: Dict, local_base: str, year: str,
+                  navigate: bool, processor: Optional[PostProcessor] = None) -> bool:
+    """Process one work item. Returns True if the browser was used."""
+    with mj.tracer.job(item['id']):
+        with mj.tracer.span('item', type=item['type']):
+            if item['type'] == 'video':
+                print(f"\n  Generating video {item['id']}: {item['prompt'][:50]}...")
+                used_browser = _process_video(mj, config, journal, item, local_base, year, navigate, processor)
+            else:
+                print(f"\n  Generating image {item['id']}: {item['prompt'][:50]}...")
+                used_browser = _process_image(mj, config, journal, item, local_base, year, navigate, processor)
+
+    # Keep spans from earlier attempts of a resumed item
+    previous = journal.get(item['id'], 'trace')
+    spans = previous['data']['spans'] if previous else []
+    spans += [span.to_dict() for span in mj.tracer.spans(job=item['id'])]
+    journal.record(item['id'], 'trace', 'done', spans=spans)
+
+    entry = journal.build_entry(item['id'])
+    if entry is not None:
+        manifest.append(entry)
+    return used_browser
+
+
+def _process_item_after(mj: MidjourneyAutomation, dependencies: List[Future], config: BatchConfig,
+                        journal: BatchJournal, manifest: ManifestWriter, item: Dict,
+                        local_base: str, year: str, processor: Optional[PostProcessor] = None) -> bool:
+    """Process an item once the jobs it depends on (its theme's images) have finished"""
+    wait(dependencies)
+    return _process_item(mj, config, journal, manifest, item, local_base, year, False, processor)
+
+
+def _build_contact_sheets(config: BatchConfig, journal: BatchJournal, processor: PostProcessor,
+                          mj: MidjourneyAutomation, local_base: str, year: str) -> Dict[str, str]:
+    """Build and transfer one contact sheet per theme. Returns theme -> remote path."""
+    transforms = {}
+    for theme_id, images in journal.theme_images().items():
+        output = os.path.join(local_base, theme_id, f"{theme_id}_contact.jpg")
+        transform = processor.plan_contact_sheet(images, output)
+        if transform:
+            transforms[theme_id] = transform
+
+    contact_sheets = {}
+    # All themes' sheets are built in parallel
+    with mj.tracer.span('contact_sheets', themes=len(transforms)):
+        results = processor.run(list(transforms.values()))
+    for theme_id, result in zip(transforms, results):
+        if not result.ok:
+            continue
+        remote_dir = f"{config.images_path}/{year}/{config.batch_id}/{theme_id}"
+        if mj.transfer_to_remote([result.transform.output], config.remote_host, remote_dir):
+            contact_sheets[theme_id] = f"{remote_dir}/{os.path.basename(result.transform.output)}"
+    return contact_sheets
+
+
+def run_batch(config: BatchConfig, resume: bool = False, dedup: bool = True,
+              cache: Optional[bool] = None, tabs: int = 1,
+              trace_path: Optional[str] = None, video_tabs: int = 0,
+              postprocess: bool = False) -> BatchResult:
+    """
+    Run a batch of themed generations.
+
+    Args:
+        config: Batch configuration
+        resume: Skip stages already completed in the checkpoint journal
+                and retry only failed or missing ones
+        dedup: Skip or hard-link files already on the remote host (media index)
+        cache: Reuse earlier generations of identical prompts
+               (defaults to the themes file's "cache" setting)
+        tabs: Number of Chrome tabs to drive in parallel
+        trace_path: Where to write the Chrome trace of this run
+                    (defaults to trace.json next to the journal)
+        video_tabs: Run video jobs on this many separate tabs, in parallel
+                    with later image prompts (0 = inline with images)
+        postprocess: Derive thumbnails, PNG/AVIF conversions, video posters
+                     and per-theme contact sheets before transfer
+    """
+    use_cache = config.cache if cache is None else cache
+    tracer = Tracer()
+    automation_kwargs = {
+        'poll_interval': 5,
+        'max_wait': 180,
+        'media_index': MediaIndex() if dedup else None,
+        'prompt_cache': PromptCache() if use_cache else None,
+        'tracer': tracer
+    }
+
+    started_at = datetime.now().isoformat()
     year = datetime.now().strftime('%Y')
     local_base = f"/tmp/mj_{config.batch_id}"
 
+    journal = BatchJournal(_journal_path(config))
+    manifest = _manifest_writer(config)
+    if not resume:
+        journal.archive()
+        manifest.reset()
+
+    # Streamed: a JSON Lines themes file is read as the batch goes
+    items = plan_batch(config)
+    theme_total = None if config.themes_file else len(config.themes)
+
     print(f"\n{'='*60}")
     print(f"MIDJOURNEY BATCH WORKFLOW")
     print(f"Batch ID: {config.batch_id}")
-    print(f"Themes: {len(config.themes)}")
+    print(f"Themes: {theme_total if theme_total is not None else 'streamed from ' + config.themes_file}")
+    if tabs > 1:
+        print(f"Tabs: {tabs}")
+    if video_tabs > 0:
+        print(f"Video tabs: {video_tabs}")
+    if resume:
+        print(f"Resuming: {journal.completed_count()} prompts already complete")
     print(f"{'='*60}\n")
 
-    first_generation = True
+    # Video jobs take minutes; with video tabs they run on their own queue
+    # while image prompts carry on
+    video_pool = TabPool(video_tabs, **automation_kwargs).start() if video_tabs > 0 else None
+    video_futures: List[Future] = []
+    # CPU-bound transforms run in worker processes, off the tab threads
+    processor = PostProcessor() if postprocess else None
+    contact_sheets: Dict[str, str] = {}
+
+    try:
+        if tabs > 1:
+            # Each tab navigates once at pool start; jobs go to the next free tab.
+            # Only a few jobs per tab are queued ahead so the plan stays lazy.
+            with TabPool(tabs, **automation_kwargs) as pool:
+                pending = deque()
+                current_theme = None
+                theme_futures: List[Future] = []
+                for item in items:
+                    if item['theme'] != current_theme:
+                        current_theme = item['theme']
+                        theme_futures = []
+                    if video_pool and item['type'] == 'video':
+                        video_futures.append(video_pool.submit(_process_item_after, theme_futures, config,
+                                                               journal, manifest, item, local_base, year,
+                                                               processor))
+                        continue
+                    if item['type'] == 'video':
+                        # Waits for the theme's images (to animate one with video_source
+                        # 'batch'); jobs start in submission order, so those are already
+                        # running on other tabs and this can't deadlock the pool
+                        future = pool.submit(_process_item_after, list(theme_futures), config, journal,
+                                             manifest, item, local_base, year, processor)
+                        pending.append(future)
+                        continue
+                    future = pool.submit(_process_item, config, journal, manifest, item,
+                                         local_base, year, False, processor)
+                    pending.append(future)
+                    theme_futures.append(future)
+                    while len(pending) > tabs * 2:
+                        pending.popleft().result()
+                for future in pending:
+                    future.result()
+                print(f"\n{pool.report()}")
+        else:
+            mj = MidjourneyAutomation(**automation_kwargs)
+            navigate = True
+            current_theme = None
+
+            for item in items:
+                if item['theme'] != current_theme:
+                    current_theme = item['theme']
+                    total = f"/{theme_total}" if theme_total is not None else ""
+                    print(f"\n[Theme {item['theme_index'] + 1}{total}] {current_theme}")
+                    print("-" * 40)
+
+                if video_pool and item['type'] == 'video':
+                    # The theme's images are already done in serial mode
+                    print(f"\n  Queued video {item['id']} on the video tab")
+                    video_futures.append(video_pool.submit(_process_item_after, [], config, journal,
+                                                           manifest, item, local_base, year, processor))
+                    continue
+
+                if _process_item(mj, config, journal, manifest, item, local_base, year, navigate, processor):
+                    navigate = False
+
+            print(f"\nStatus probe: {mj.probe.describe()}")
+
+        if video_pool:
+            for future in video_futures:
+                future.result()
+            print(f"\nVideo {video_pool.report()}")
+
+        if processor:
+            contact_sheets = _build_contact_sheets(config, journal, processor,
+                                                   MidjourneyAutomation(**automation_kwargs), local_base, year)
+            print(f"\nContact sheets: {len(contact_sheets)} themes")
+    finally:
+        if video_pool:
+            video_pool.close()
+        if processor:
+            processor.close()
+
+    trace_path = trace_path or _trace_path(config)
+    tracer.export(trace_path)
+    print(f"Time by stage: {tracer.describe()}")
+    print(f"Trace written to: {trace_path}")
 
-    for theme_idx, theme in enumerate(config.themes):
-        theme_id = theme.get('id', f'theme_{theme_idx}')
-        image_prompts = theme.get('image_prompts', [])
-        video_prompt = theme.get('video_prompt')
-
-        print(f"\n[Theme {theme_idx + 1}/{len(config.themes)}] {theme_id}")
-        print("-" * 40)
+    completed_at = datetime.now().isoformat()
+    return build_batch_result(config, manifest, started_at, completed_at, contact_sheets)
 
-        # Process image prompts
-        for img_idx, prompt in enumerate(image_prompts):
-            total += 1
-            prompt_id = f"{theme_id}_img_{img_idx}"
-            print(f"\n  Generating image {img_idx + 1}: {prompt[:50]}...")
-
-            result = mj.generate(prompt, navigate=first_generation)
-            first_generation = False
-
-            if result.success:
-                successful += 1
-
-                # Download locally
-                local_dir = os.path.join(local_base, theme_id)
-                local_files = mj.download_images(result.image_urls, local_dir, prompt_id)
-
-                # Transfer to remote
-                remote_dir = f"{config.images_path}/{year}/{config.batch_id}/{theme_id}"
-                mj.transfer_to_remote(local_files, config.remote_host, remote_dir)
-
-                results.append({
-                    'id': prompt_id,
-                    'type': 'image',
-                    'theme': theme_id,
-                    'prompt': prompt,
-                    'success': True,
-                    'image_count': len(result.image_urls),
-                    'remote_path': remote_dir,
-                    'elapsed': result.elapsed_seconds
-                })
-                print(f"    ✅ Generated {len(result.image_urls)} images in {result.elapsed_seconds:.1f}s")
-            else:
-                failed += 1
-                results.append({
-                    'id': prompt_id,
-                    'type': 'image',
-                    'theme': theme_id,
-                    'prompt': prompt,
-                    'success': False,
-                    'error': result.error
-                })
-                print(f"    ❌ Failed: {result.error}")
-
-        # Process video prompt (if any)
-        # Uses the new image-to-video workflow
-        if video_prompt:
-            total += 1
-            prompt_id = f"{theme_id}_video"
-            motion_mode = theme.get('motion_mode', 'low')
-            print(f"\n  Generating video: {video_prompt[:50]}...")
-            print(f"    Motion mode: {motion_mode}")
-
-            # Use the new video generation method (generates image first, then animates)
-            video_result = mj.generate_video(video_prompt, motion_mode=motion_mode, navigate=False)
-
-            if video_result.success:
-                successful += 1
-
-                local_dir = os.path.join(local_base, theme_id)
-
-                # Download video file
-                local_files = []
-                if video_result.video_url:
-                    video_file = mj.download_video(video_result.video_url, local_dir, prompt_id)
-                    if video_file:
-                        local_files.append(video_file)
-
-                # Also save the source image if available
-                if video_result.source_image_url:
-                    source_files = mj.download_images([video_result.source_image_url], local_dir, f"{prompt_id}_source")
-                    local_files.extend(source_files)
-
-                remote_dir = f"{config.video_path}/{year}/{config.batch_id}/{theme_id}"
-                mj.transfer_to_remote(local_files, config.remote_host, remote_dir)
-
-                results.append({
-                    'id': prompt_id,
-                    'type': 'video',
-                    'theme': theme_id,
-                    'prompt': video_prompt,
-                    'motion_mode': motion_mode,
-                    'success': True,
-                    'video_url': video_result.video_url,
-                    'source_image_url': video_result.source_image_url,
-                    'remote_path': remote_dir,
-                    'elapsed': video_result.elapsed_seconds
-                })
-                print(f"    ✅ Generated video in {video_result.elapsed_seconds:.1f}s")
-            else:
-                failed += 1
-                results.append({
-                    'id': prompt_id,
-                    'type': 'video',
-                    'theme': theme_id,
-                    'prompt': video_prompt,
-                    'motion_mode': motion_mode,
-                    'success': False,
-                    'error': video_result.error
-                })
-                print(f"    ❌ Failed: {video_result.error}")
 
-    completed_at = datetime.now().isoformat()
+def build_batch_result(config: BatchConfig, manifest: ManifestWriter,
+                       started_at: str, completed_at: str,
+                       contact_sheets: Optional[Dict[str, str]] = None) -> BatchResult:
+    """Assemble a BatchResult by scanning the incremental manifest"""
+    total, successful = manifest.counts()
 
     return BatchResult(
         batch_id=config.batch_id,
@@ -215,31 +852,19 @@ def run_batch(config: BatchConfig) -> BatchResult:
         completed_at=completed_at,
         total_prompts=total,
         successful=successful,
-        failed=failed,
-        results=results
+        failed=total - successful,
+        manifest_path=manifest.path,
+        contact_sheets=contact_sheets or {}
     )
 
 
 def save_manifest(result: BatchResult, config: BatchConfig):
-    """Save batch manifest to remote storage"""
-    manifest = asdict(result)
-
-    # Save locally first
-    local_manifest = f"/tmp/mj_{config.batch_id}/manifest.json"
-    os.makedirs(os.path.dirname(local_manifest), exist_ok=True)
+    """Compact manifest.jsonl into manifest.json and sync both to remote storage"""
+    manifest = _manifest_writer(config)
+    manifest.compact(result)
+    manifest.sync(manifest.lines_path, manifest.path)
 
-    with open(local_manifest, 'w') as f:
-        json.dump(manifest, f, indent=2)
-
-    # Transfer to remote
-    import subprocess
-    year = datetime.now().strftime('%Y')
-    remote_manifest_dir = f"{config.images_path}/{year}/{config.batch_id}"
-
-    subprocess.run(f'ssh {config.remote_host} "mkdir -p {remote_manifest_dir}"', shell=True)
-    subprocess.run(f'rsync -avz "{local_manifest}" "{config.remote_host}:{remote_manifest_dir}/"', shell=True)
-
-    print(f"\nManifest saved to: {config.remote_host}:{remote_manifest_dir}/manifest.json")
+    print(f"\nManifest saved to: {config.remote_host}:{manifest.remote_dir}/{MANIFEST_FILENAME}")
 
 
 def create_sample_themes():
@@ -284,24 +909,50 @@ def create_sample_themes():
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 batch_workflow.py themes.json")
+    parser = argparse.ArgumentParser(description="Run a Midjourney themed batch")
+    parser.add_argument("themes", nargs="?", help="Themes JSON file")
+    parser.add_argument("--sample", action="store_true", help="Create sample_themes.json and run it")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume from the checkpoint journal, retrying only failed or missing stages")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Transfer every file even if identical content is already stored")
+    parser.add_argument("--cache", action="store_true", default=None,
+                        help="Reuse earlier results for identical prompts (overrides themes file)")
+    parser.add_argument("--tabs", type=int, default=1,
+                        help="Drive N Chrome tabs in parallel (default: 1, the active tab)")
+    parser.add_argument("--video-source", choices=VIDEO_SOURCES,
+                        help="Default for themes without video_source: 'batch' animates an image the "
+                             "theme already generated instead of generating a new one")
+    parser.add_argument("--video-tabs", type=int, default=0,
+                        help="Run video jobs on N separate tabs in parallel with image prompts")
+    parser.add_argument("--trace", metavar="PATH",
+                        help=f"Write the Chrome trace here (default: /tmp/mj_<batch_id>/{TRACE_FILENAME})")
+    parser.add_argument("--postprocess", action="store_true",
+                        help="Make thumbnails, PNG/AVIF copies, video posters and per-theme contact "
+                             "sheets before transfer (needs Pillow / ffmpeg)")
+    args = parser.parse_args()
+
+    if args.sample:
+        filepath = create_sample_themes()
+    elif args.themes:
+        filepath = args.themes
+    else:
+        parser.print_usage()
         print("\nTo create a sample themes file:")
         print("  python3 batch_workflow.py --sample")
         sys.exit(1)
 
-    if sys.argv[1] == '--sample':
-        filepath = create_sample_themes()
-    else:
-        filepath = sys.argv[1]
-
     if not os.path.exists(filepath):
         print(f"File not found: {filepath}")
         sys.exit(1)
 
     # Load and run
     config = load_themes(filepath)
-    result = run_batch(config)
+    if args.video_source:
+        config.video_source = args.video_source
+    result = run_batch(config, resume=args.resume, dedup=not args.no_dedup, cache=args.cache,
+                       tabs=args.tabs, trace_path=args.trace, video_tabs=args.video_tabs,
+                       postprocess=args.postprocess)
 
     # Save manifest
     save_manifest(result, config)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Automation Benchmarks
+
+Measures the automation layer against fake_mj_server, so performance
+changes to MidjourneyAutomation can be checked without Midjourney:
+
+- throughput: prompts/hour through async_batch_generate, and the time each
+  prompt spends beyond the fake's configured render time (automation overhead)
+- probe: status poll round-trip, in-page time and payload size, on a page
+  holding every job of the run
+- download: image download speed (and video, with --video)
+- video: animate flow time beyond the fake's render time (with --video)
+- transfer: rsync speed to a real host (with --remote-host)
+
+Results can be saved as JSON and compared against an earlier run.
+
+Usage:
+    python3 benchmark.py                                  # headless Chromium (Linux or macOS)
+    python3 benchmark.py --driver chrome                  # AppleScript + Chrome on macOS
+    python3 benchmark.py --prompts 8 --video --json after.json --compare before.json
+    python3 benchmark.py --remote-host beta --remote-path /tmp/mj_bench
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from adaptive_wait import WaitModel
+from fake_mj_server import FakeMidjourneyServer
+from mj_web_automation import AsyncMidjourneyAutomation, async_batch_generate
+from tracer import Tracer
+
+# Metrics where a larger value is better (everything else: smaller is better)
+HIGHER_IS_BETTER = {'prompts_per_hour', 'mb_per_second', 'success_rate'}
+
+
+async def _make_automation(driver: str, base_url: str, tracer: Tracer) -> AsyncMidjourneyAutomation:
+    # A throwaway wait model, so benchmark runs don't skew learned durations
+    kwargs = {'base_url': base_url, 'tracer': tracer, 'poll_interval': 1,
+              'wait_model': WaitModel(history_path=None)}
+    if driver == 'headless':
+        from headless_driver import HeadlessMidjourneyAutomation
+        return await HeadlessMidjourneyAutomation.launch(**kwargs)
+    return AsyncMidjourneyAutomation(**kwargs)
+
+
+def _mean(values: List[float]) -> float:
+    return statistics.fmean(values) if values else 0.0
+
+
+async def bench_throughput(mj: AsyncMidjourneyAutomation, server: FakeMidjourneyServer,
+                           prompts: int, work_dir: str) -> Dict[str, Any]:
+    """Run a batch and report throughput and per-prompt automation overhead"""
+    batch = [{'id': f'bench_{i}', 'prompt': f'benchmark prompt {i} --ar 16:9'} for i in range(prompts)]
+    started = time.time()
+    results = await async_batch_generate(batch, output_base=os.path.join(work_dir, 'batch'), mj=mj)
+    wall = time.time() - started
+
+    succeeded = [r for r in results if r['success']]
+    # The fake's own render + queue time; anything beyond it is ours
+    expected = server.timings['image_seconds'] + server.timings['queue_seconds']
+    generate = [s.seconds for s in mj.tracer.spans() if s.name == 'generate']
+    return {
+        'prompts': prompts,
+        'success_rate': len(succeeded) / prompts if prompts else 0.0,
+        'wall_seconds': wall,
+        'prompts_per_hour': len(succeeded) / wall * 3600 if wall > 0 else 0.0,
+        'generate_seconds_mean': _mean(generate),
+        'overhead_seconds_mean': _mean([g - expected for g in generate]),
+        'stages': {name: round(seconds, 3) for name, seconds in mj.tracer.totals().items()},
+        'image_urls': [url for r in succeeded for url in r['image_urls']],
+    }
+
+
+async def bench_probe(mj: AsyncMidjourneyAutomation, polls: int) -> Dict[str, Any]:
+    """Poll cost on the current page (which holds every job generated so far)"""
+    run_samples = len(mj.probe.samples)
+    run_summary = mj.probe.summary()
+
+    await mj.probe.begin('image', baseline=False)
+    await mj.probe.poll()  # first poll scans the whole page once
+    first = mj.probe.samples[-1]
+    for _ in range(polls):
+        await mj.probe.poll()
+    idle = list(mj.probe.samples)[-polls:] if polls else []
+    roundtrips = sorted(s.roundtrip_ms for s in idle)
+    return {
+        'batch_polls': run_samples,
+        'batch_roundtrip_ms_mean': run_summary.get('roundtrip_ms_mean', 0.0),
+        'batch_page_ms_mean': run_summary.get('page_ms_mean', 0.0),
+        'first_poll_page_ms': first.page_ms,
+        'first_poll_payload_bytes': first.payload_bytes,
+        'idle_roundtrip_ms_mean': _mean(roundtrips),
+        'idle_roundtrip_ms_p95': roundtrips[min(len(roundtrips) - 1, int(len(roundtrips) * 0.95))] if roundtrips else 0.0,
+        'idle_page_ms_mean': _mean([s.page_ms for s in idle]),
+        'idle_payload_bytes_mean': _mean([s.payload_bytes for s in idle]),
+    }
+
+
+async def bench_download(mj: AsyncMidjourneyAutomation, image_urls: List[str], work_dir: str) -> Dict[str, Any]:
+    """Download every image of the run again and report the rate"""
+    out_dir = os.path.join(work_dir, 'download')
+    started = time.time()
+    files = await mj.download_images(image_urls, out_dir, 'bench')
+    wall = time.time() - started
+    total = sum(os.path.getsize(f) for f in files)
+    return {
+        'images': len(files),
+        'bytes': total,
+        'wall_seconds': wall,
+        'mb_per_second': total / wall / 1e6 if wall > 0 else 0.0,
+        'files': files,
+    }
+
+
+async def bench_video(mj: AsyncMidjourneyAutomation, server: FakeMidjourneyServer,
+                      image_url: str, work_dir: str) -> Dict[str, Any]:
+    """Animate one generated image and download the video"""
+    result = await mj.animate_image(image_url=image_url, motion_mode='low', prompt='benchmark video')
+    expected = server.timings['video_seconds'] + server.timings['queue_seconds']
+    stats = {
+        'success': result.success,
+        'animate_seconds': result.elapsed_seconds,
+        'overhead_seconds': result.elapsed_seconds - expected,
+    }
+    if result.success and result.video_url:
+        started = time.time()
+        path = await mj.download_video(result.video_url, os.path.join(work_dir, 'video'), 'bench_video')
+        wall = time.time() - started
+        size = os.path.getsize(path) if path else 0
+        stats.update(download_seconds=wall, download_mb_per_second=size / wall / 1e6 if wall > 0 else 0.0)
+    return stats
+
+
+async def bench_transfer(mj: AsyncMidjourneyAutomation, files: List[str],
+                         remote_host: str, remote_path: str) -> Dict[str, Any]:
+    """rsync the downloaded files to a real host"""
+    remote_dir = f"{remote_path.rstrip('/')}/bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    started = time.time()
+    ok = await mj.transfer_to_remote(files, remote_host, remote_dir)
+    wall = time.time() - started
+    total = sum(os.path.getsize(f) for f in files)
+    return {
+        'ok': ok,
+        'files': len(files),
+        'bytes': total,
+        'wall_seconds': wall,
+        'mb_per_second': total / wall / 1e6 if wall > 0 else 0.0,
+        'remote_dir': remote_dir,
+    }
+
+
+async def run_benchmarks(args: argparse.Namespace, server: FakeMidjourneyServer) -> Dict[str, Any]:
+    tracer = Tracer()
+    mj = await _make_automation(args.driver, server.url, tracer)
+    work_dir = tempfile.mkdtemp(prefix='mj_bench_')
+    results: Dict[str, Any] = {
+        'run': {
+            'at': datetime.now().isoformat(),
+            'driver': args.driver,
+            'host': platform.node(),
+            'python': platform.python_version(),
+            'server': dict(server.timings),
+        }
+    }
+    try:
+        print(f"Throughput: {args.prompts} prompts...")
+        results['throughput'] = await bench_throughput(mj, server, args.prompts, work_dir)
+        image_urls = results['throughput'].pop('image_urls')
+
+        print(f"Probe: {args.polls} polls...")
+        results['probe'] = await bench_probe(mj, args.polls)
+
+        print(f"Download: {len(image_urls)} images...")
+        results['download'] = await bench_download(mj, image_urls, work_dir)
+        files = results['download'].pop('files')
+
+        if args.video and image_urls:
+            print("Video: animate + download...")
+            results['video'] = await bench_video(mj, server, image_urls[0], work_dir)
+
+        if args.remote_host:
+            print(f"Transfer: {len(files)} files to {args.remote_host}...")
+            results['transfer'] = await bench_transfer(mj, files, args.remote_host, args.remote_path)
+    finally:
+        if hasattr(mj, 'close'):
+            await mj.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results['run']['served'] = dict(server.stats)
+    return results
+
+
+def _flatten(results: Dict[str, Any]) -> Dict[str, float]:
+    """'section.metric' -> value for every numeric metric"""
+    flat = {}
+    for section, metrics in results.items():
+        if section == 'run' or not isinstance(metrics, dict):
+            continue
+        for name, value in metrics.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                flat[f"{section}.{name}"] = value
+    return flat
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    current = _flatten(results)
+    previous = _flatten(baseline) if baseline else {}
+
+    print(f"\n{'='*72}")
+    print(f"BENCHMARK ({results['run']['driver']}, {results['run']['at']})")
+    print(f"{'='*72}")
+    for key, value in current.items():
+        line = f"  {key:<42} {value:>12.3f}"
+        if key in previous and previous[key]:
+            change = (value - previous[key]) / abs(previous[key]) * 100
+            better = change > 0 if key.split('.')[-1] in HIGHER_IS_BETTER else change < 0
+            line += f"   {previous[key]:>12.3f}  {change:+6.1f}% {'✅' if better else '⚠️ ' if abs(change) >= 5 else ''}"
+        print(line)
+    stages = results.get('throughput', {}).get('stages')
+    if stages:
+        print(f"\n  Time by stage: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds
+                                              in sorted(stages.items(), key=lambda kv: -kv[1])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MJ automation layer against a fake server")
+    parser.add_argument("--driver", choices=("headless", "chrome"), default="headless",
+                        help="headless Chromium via Playwright, or AppleScript + Chrome (macOS)")
+    parser.add_argument("--prompts", type=int, default=4, help="Prompts in the throughput batch")
+    parser.add_argument("--polls", type=int, default=50, help="Status polls in the probe benchmark")
+    parser.add_argument("--video", action="store_true", help="Also benchmark the animate flow")
+    parser.add_argument("--image-seconds", type=float, default=3.0, help="Fake image render time")
+    parser.add_argument("--video-seconds", type=float, default=6.0, help="Fake video render time")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Fake job time jitter (fraction)")
+    parser.add_argument("--remote-host", help="Host to benchmark transfers to (skipped if not given)")
+    parser.add_argument("--remote-path", default="/tmp/mj_bench", help="Remote directory for transfers")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against an earlier --json result")
+    args = parser.parse_args()
+
+    server = FakeMidjourneyServer(image_seconds=args.image_seconds, video_seconds=args.video_seconds,
+                                  jitter=args.jitter).start()
+    print(f"Fake Midjourney at {server.url}")
+    try:
+        results = asyncio.run(run_benchmarks(args, server))
+    finally:
+        server.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Fake Midjourney Server
+
+A local stand-in for midjourney.com, so the automation layer can be run and
+benchmarked without a logged-in Chrome. It mimics what the automation reads
+and clicks:
+
+- /imagine: a prompt textarea and "My Account"; Enter queues a job that
+  shows "Generating" / "N% Complete" and then a grid of four CDN images
+- /jobs/<job_id>?index=N: the detail view with an Animate button, a
+  Low/High motion modal and a Generate button; the video job shows
+  "Animating" / "N%" and then a <video> from the CDN
+- /cdn.midjourney.com/<job_id>/0_N.webp and /cdn.midjourney.com/video/...:
+  image and video bytes (URLs match the real CDN patterns, so job ids
+  and grid indexes are parsed the same way)
+
+Job timings, jitter, failure rate and media sizes are configurable. Images
+are real PNGs (so the browser decodes them) with unique content per URL.
+
+Usage:
+    from fake_mj_server import FakeMidjourneyServer
+
+    with FakeMidjourneyServer(image_seconds=3, video_seconds=6) as server:
+        mj = AsyncMidjourneyAutomation(base_url=server.url, ...)
+
+Standalone:
+    python3 fake_mj_server.py --port 8765 --image-seconds 20 --video-seconds 60
+"""
+
+import argparse
+import json
+import random
+import re
+import struct
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+CDN_PREFIX = "/cdn.midjourney.com"
+
+_IMAGE_PATH = re.compile(r'^/cdn\.midjourney\.com/([0-9a-f-]{36})/0_(\d+)\.\w+$')
+_VIDEO_PATH = re.compile(r'^/cdn\.midjourney\.com/video/([0-9a-f-]{36})/(\d+)\.mp4$')
+_JOB_PATH = re.compile(r'^/jobs/([0-9a-f-]{36})$')
+
+_STYLE = '''
+body { font-family: sans-serif; background: #111; color: #ddd; margin: 0; }
+nav { padding: 8px 16px; background: #1b1b1b; }
+main { padding: 16px; }
+textarea { width: 90%; height: 48px; }
+.job { margin: 12px 0; }
+.grid img { width: 200px; height: 200px; margin: 4px; cursor: pointer; }
+.modal { border: 1px solid #444; padding: 12px; margin: 12px 0; }
+'''
+
+_COMMON_JS = '''
+const CFG = window.FAKE_MJ;
+function uuid4() {
+    return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, c => {
+        const r = Math.random() * 16 | 0;
+        return (c === 'x' ? r : (r & 0x3 | 0x8)).toString(16);
+    });
+}
+function jittered(seconds) {
+    return seconds * (1 + (Math.random() * 2 - 1) * CFG.jitter) * 1000;
+}
+// Status text the way MJ shows it, updated until the job finishes
+function runJob(container, seconds, label, progressSuffix, done) {
+    const status = document.createElement('div');
+    status.className = 'status';
+    const state = document.createElement('span');
+    const progress = document.createElement('span');
+    status.appendChild(state);
+    status.appendChild(document.createTextNode(' '));
+    status.appendChild(progress);
+    container.appendChild(status);
+    state.textContent = 'Submitting...';
+
+    setTimeout(() => {
+        state.textContent = label;
+        progress.textContent = '0' + progressSuffix;
+        const total = jittered(seconds);
+        const started = performance.now();
+        const timer = setInterval(() => {
+            const pct = Math.floor((performance.now() - started) / total * 100);
+            if (pct < 100) {
+                progress.textContent = pct + progressSuffix;
+                return;
+            }
+            clearInterval(timer);
+            status.remove();
+            done(Math.random() < CFG.failure_rate);
+        }, CFG.progress_ms);
+    }, jittered(CFG.queue_seconds));
+}
+'''
+
+_IMAGINE_JS = '''
+const textarea = document.querySelector('textarea');
+const jobs = document.getElementById('jobs');
+textarea.addEventListener('keydown', e => {
+    if (e.key !== 'Enter' || !textarea.value.trim()) return;
+    e.preventDefault();
+    const prompt = textarea.value;
+    textarea.value = '';
+    const jobId = uuid4();
+    const job = document.createElement('div');
+    job.className = 'job';
+    const title = document.createElement('div');
+    title.textContent = prompt;
+    job.appendChild(title);
+    jobs.prepend(job);
+
+    runJob(job, CFG.image_seconds, 'Generating', '% Complete', failed => {
+        if (failed) {
+            job.appendChild(document.createTextNode('Error generating image'));
+            return;
+        }
+        const grid = document.createElement('div');
+        grid.className = 'grid';
+        for (let i = 0; i < 4; i++) {
+            const img = document.createElement('img');
+            img.src = CFG.origin + '/cdn.midjourney.com/' + jobId + '/0_' + i + '.webp';
+            img.addEventListener('click', () => {
+                window.location.href = '/jobs/' + jobId + '?index=' + i;
+            });
+            grid.appendChild(img);
+        }
+        job.appendChild(grid);
+    });
+});
+'''
+
+_JOB_JS = '''
+const animate = document.getElementById('animate');
+const detail = document.getElementById('detail');
+animate.addEventListener('click', () => {
+    animate.disabled = true;
+    let motion = 'low';
+    const modal = document.createElement('div');
+    modal.className = 'modal';
+    for (const mode of ['low', 'high']) {
+        const btn = document.createElement('button');
+        btn.textContent = mode[0].toUpperCase() + mode.slice(1) + ' motion';
+        btn.addEventListener('click', () => { motion = mode; });
+        modal.appendChild(btn);
+    }
+    const submit = document.createElement('button');
+    submit.textContent = 'Generate';
+    submit.addEventListener('click', () => {
+        modal.remove();
+        const job = document.createElement('div');
+        job.className = 'job';
+        detail.appendChild(job);
+        runJob(job, CFG.video_seconds, 'Animating', '%', failed => {
+            if (failed) {
+                job.appendChild(document.createTextNode('Video generation failed'));
+                return;
+            }
+            const video = document.createElement('video');
+            video.src = CFG.origin + '/cdn.midjourney.com/video/' + CFG.job_id + '/' + CFG.index + '.mp4';
+            video.muted = true;
+            job.appendChild(video);
+            const info = document.createElement('div');
+            info.textContent = motion + ' motion, duration 5.0s';
+            job.appendChild(info);
+        });
+    });
+    modal.appendChild(submit);
+    detail.appendChild(modal);
+});
+'''
+
+
+def _png(width: int, height: int, seed: int) -> tuple:
+    """(header + IHDR, IDAT + IEND) chunks of a noise PNG; a tEXt chunk goes between"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    rng = random.Random(seed)
+    row = width * 3
+    raw = b''.join(b'\x00' + rng.randbytes(row) for _ in range(height))
+    head = b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+    tail = chunk(b'IDAT', zlib.compress(raw, 1)) + chunk(b'IEND', b'')
+    return head, tail
+
+
+def _text_chunk(text: str) -> bytes:
+    data = b'Comment\x00' + text.encode()
+    return struct.pack('>I', len(data)) + b'tEXt' + data + struct.pack('>I', zlib.crc32(b'tEXt' + data))
+
+
+class FakeMidjourneyServer:
+    """Local HTTP stand-in for midjourney.com and its CDN"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 image_seconds: float = 5.0, video_seconds: float = 15.0,
+                 queue_seconds: float = 0.5, jitter: float = 0.2, failure_rate: float = 0.0,
+                 image_size: int = 512, video_bytes: int = 2_000_000, progress_ms: int = 250):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 = any free port)
+            image_seconds: Typical render time of an image job
+            video_seconds: Typical render time of a video job
+            queue_seconds: Time between submit and the job starting
+            jitter: Job times vary by up to this fraction either way
+            failure_rate: Fraction of jobs that end in an error
+            image_size: Width/height of served images in pixels
+            video_bytes: Size of served videos
+            progress_ms: How often the progress text updates
+        """
+        self.host = host
+        self.port = port
+        self.timings = {
+            'image_seconds': image_seconds,
+            'video_seconds': video_seconds,
+            'queue_seconds': queue_seconds,
+            'jitter': jitter,
+            'failure_rate': failure_rate,
+            'progress_ms': progress_ms,
+        }
+        self.video_bytes = video_bytes
+        self.stats = {'pages': 0, 'images': 0, 'videos': 0, 'bytes': 0}
+        self._png = _png(image_size, image_size, seed=image_size)
+        self._video = random.Random(video_bytes).randbytes(video_bytes)
+        self._stats_lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'FakeMidjourneyServer':
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-mj", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> 'FakeMidjourneyServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def image_bytes(self, job_id: str, index: int) -> bytes:
+        """Image for a CDN URL; content differs per URL so dedup sees distinct files"""
+        head, tail = self._png
+        return head + _text_chunk(f"{job_id}/{index}") + tail
+
+    def _page(self, title: str, body: str, script: str, extra: Optional[Dict] = None) -> bytes:
+        config = dict(self.timings, origin=self.url, **(extra or {}))
+        return f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title><style>{_STYLE}</style></head>
+<body>
+<nav><a href="/imagine">Imagine</a> | <a href="/account">My Account</a></nav>
+<main>{body}</main>
+<script>window.FAKE_MJ = {json.dumps(config)};{_COMMON_JS}{script}</script>
+</body></html>'''.encode()
+
+    def _handle(self, request: BaseHTTPRequestHandler):
+        parsed = urlparse(request.path)
+        path = parsed.path
+        content_type = 'text/html; charset=utf-8'
+
+        if path in ('/', '/imagine'):
+            body = self._page("Midjourney", '<textarea placeholder="What will you imagine?"></textarea>'
+                                            '<div id="jobs"></div>', _IMAGINE_JS)
+            kind = 'pages'
+        elif _JOB_PATH.match(path):
+            job_id = _JOB_PATH.match(path).group(1)
+            match = re.search(r'index=(\d+)', parsed.query)
+            index = int(match.group(1)) if match else 0
+            body = self._page(
+                "Midjourney",
+                f'<div id="detail"><img src="{self.url}{CDN_PREFIX}/{job_id}/0_{index}.webp">'
+                f'<div><button id="animate" aria-label="Animate">Animate</button></div></div>',
+                _JOB_JS, {'job_id': job_id, 'index': index}
+            )
+            kind = 'pages'
+        elif _IMAGE_PATH.match(path):
+            job_id, index = _IMAGE_PATH.match(path).groups()
+            body = self.image_bytes(job_id, int(index))
+            content_type = 'image/png'
+            kind = 'images'
+        elif _VIDEO_PATH.match(path):
+            body = self._video
+            content_type = 'video/mp4'
+            kind = 'videos'
+        else:
+            request.send_error(404)
+            return
+
+        with self._stats_lock:
+            self.stats[kind] += 1
+            self.stats['bytes'] += len(body)
+        request.send_response(200)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        request.send_header('Cache-Control', 'no-store' if kind == 'pages' else 'max-age=86400')
+        request.end_headers()
+        request.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local fake of midjourney.com")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--image-seconds", type=float, default=5.0)
+    parser.add_argument("--video-seconds", type=float, default=15.0)
+    parser.add_argument("--queue-seconds", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--image-size", type=int, default=512)
+    parser.add_argument("--video-bytes", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    server = FakeMidjourneyServer(
+        host=args.host, port=args.port, image_seconds=args.image_seconds,
+        video_seconds=args.video_seconds, queue_seconds=args.queue_seconds, jitter=args.jitter,
+        failure_rate=args.failure_rate, image_size=args.image_size, video_bytes=args.video_bytes
+    ).start()
+    print(f"Fake Midjourney at {server.url}/imagine (Ctrl-C to stop)")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
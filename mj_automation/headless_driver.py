@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Headless Midjourney Driver
+
+Runs AsyncMidjourneyAutomation in headless Chromium via Playwright instead
+of AppleScript-driven Chrome, so the automation works on Linux (CI, the
+benchmark suite, or against fake_mj_server). The page's JavaScript, status
+probe, downloads and transfers are the same code paths as on macOS; only
+running JS, loading URLs and pressing Enter go through Playwright.
+
+Needs Playwright (pip install playwright && playwright install chromium).
+Playwright objects belong to the event loop that created them, so use this
+with the asyncio API (e.g. async_batch_generate(..., mj=mj)), not the
+blocking MidjourneyAutomation wrapper.
+
+Usage:
+    from headless_driver import HeadlessMidjourneyAutomation
+
+    async with await HeadlessMidjourneyAutomation.launch(base_url=server.url) as mj:
+        result = await mj.generate("cosmic nebula --ar 16:9")
+"""
+
+import json
+from typing import Any
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+from mj_web_automation import AsyncMidjourneyAutomation
+
+# Evaluate a script the way Chrome's "execute javascript" does: the value of
+# its last expression is the result
+_EVAL = "code => (0, eval)(code)"
+
+
+def _as_applescript_result(value: Any) -> str:
+    """Render a JS value as the string AppleScript would have returned"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+class HeadlessMidjourneyAutomation(AsyncMidjourneyAutomation):
+    """AsyncMidjourneyAutomation driving a headless Chromium page"""
+
+    def __init__(self, page, *args, **kwargs):
+        """
+        Args:
+            page: Playwright page to drive
+            *args, **kwargs: As for AsyncMidjourneyAutomation
+        """
+        super().__init__(*args, **kwargs)
+        self.page = page
+        self._browser = None
+        self._playwright = None
+
+    @classmethod
+    async def launch(cls, headless: bool = True, **kwargs) -> 'HeadlessMidjourneyAutomation':
+        """
+        Start Chromium and open a page for a new instance.
+
+        Args:
+            headless: Run without a window
+            **kwargs: Passed to AsyncMidjourneyAutomation (e.g. base_url, tracer)
+        """
+        if async_playwright is None:
+            raise RuntimeError("Playwright is not installed "
+                               "(pip install playwright && playwright install chromium)")
+        playwright = await async_playwright().start()
+        browser = await playwright.chromium.launch(headless=headless)
+        page = await browser.new_page()
+        mj = cls(page, **kwargs)
+        mj._browser = browser
+        mj._playwright = playwright
+        return mj
+
+    async def close(self):
+        """Close the browser if launch() started it"""
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self) -> 'HeadlessMidjourneyAutomation':
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _run_js_in_chrome(self, js_code: str) -> str:
+        try:
+            value = await self.page.evaluate(_EVAL, js_code)
+        except Exception as e:
+            # A navigation can destroy the context mid-call; AppleScript returns nothing then too
+            print(f"  JS error: {e}")
+            return ""
+        return _as_applescript_result(value)
+
+    async def _open_url(self, url: str):
+        await self.page.goto(url, wait_until="domcontentloaded")
+
+    async def _navigate_to_imagine(self) -> bool:
+        await self._open_url(f"{self.base_url}/imagine")
+        return "/imagine" in self.page.url
+
+    async def _submit_prompt(self) -> bool:
+        # No focused window to type into - always submit in the page
+        return await self._submit_prompt_in_page()
+
+    async def _run_applescript(self, script: str) -> str:
+        raise RuntimeError("AppleScript is not available in the headless driver")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Media Dedup Index
+
+Local SQLite index mapping content hash -> remote path for generated media.
+transfer_to_remote checks it so identical files already on the storage host
+are skipped or hard-linked remotely instead of being uploaded again.
+
+Usage:
+    from media_index import MediaIndex
+
+    index = MediaIndex()
+    mj = MidjourneyAutomation(media_index=index)
+
+Rebuild from existing storage:
+    python3 media_index.py --rebuild beta /Volumes/STUDIO/IMAGES
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Dict
+
+DEFAULT_INDEX_PATH = os.path.expanduser("~/.mj_automation/media_index.db")
+
+MEDIA_EXTENSIONS = ['.webp', '.png', '.jpg', '.jpeg', '.gif', '.mp4', '.webm', '.mov']
+
+
+def file_hash(filepath: str) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class IndexedMedia:
+    """A media file known to exist on a remote host"""
+    content_hash: str
+    remote_host: str
+    remote_path: str
+    prompt: Optional[str] = None
+    job_id: Optional[str] = None
+    size: Optional[int] = None
+
+
+class MediaIndex:
+    """Content-hash index of media already stored on remote hosts"""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript('''
+CREATE TABLE IF NOT EXISTS media (
+    remote_host TEXT NOT NULL,
+    remote_path TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    prompt TEXT,
+    job_id TEXT,
+    size INTEGER,
+    indexed_at TEXT NOT NULL,
+    PRIMARY KEY (remote_host, remote_path)
+);
+CREATE INDEX IF NOT EXISTS media_hash ON media (content_hash, remote_host);
+''')
+
+    def lookup(self, content_hash: str, remote_host: str) -> Optional[IndexedMedia]:
+        """Find a stored copy of this content on the given host"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT content_hash, remote_host, remote_path, prompt, job_id, size '
+                'FROM media WHERE content_hash = ? AND remote_host = ? LIMIT 1',
+                (content_hash, remote_host)
+            ).fetchone()
+        return IndexedMedia(*row) if row else None
+
+    def add(self, content_hash: str, remote_host: str, remote_path: str,
+            prompt: Optional[str] = None, job_id: Optional[str] = None, size: Optional[int] = None):
+        """Record (or replace) the content stored at a remote path"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (remote_host, remote_path, content_hash, prompt, job_id, size, datetime.now().isoformat())
+            )
+
+    def remove(self, remote_host: str, remote_path: str):
+        """Forget a remote path (e.g. after it was found missing)"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM media WHERE remote_host = ? AND remote_path = ?',
+                               (remote_host, remote_path))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM media').fetchone()[0]
+
+    def rebuild(self, remote_host: str, base_path: str) -> int:
+        """
+        Scan existing storage on a remote host and populate the index.
+
+        Hashes every media file under base_path on the host itself, and
+        attaches prompts from batch manifests where file names match.
+
+        Returns:
+            Number of files indexed
+        """
+        name_filter = ' -o '.join(f'-iname "*{ext}"' for ext in MEDIA_EXTENSIONS)
+        cmd = (f"ssh {remote_host} 'find \"{base_path}\" -type f \\( {name_filter} \\) -print0 "
+               f"| xargs -0 shasum -a 256'")
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        if result.returncode != 0 and not result.stdout:
+            print(f"  Scan failed: {result.stderr.strip()}")
+            return 0
+
+        prompts = self._load_manifest_prompts(remote_host, base_path)
+
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM media WHERE remote_host = ? AND remote_path LIKE ?',
+                               (remote_host, base_path.rstrip('/') + '/%'))
+
+        indexed = 0
+        for line in result.stdout.splitlines():
+            parts = line.split('  ', 1)
+            if len(parts) != 2:
+                continue
+            content_hash, remote_path = parts
+            self.add(content_hash, remote_host, remote_path, prompt=self._match_prompt(prompts, remote_path))
+            indexed += 1
+
+        return indexed
+
+    def _load_manifest_prompts(self, remote_host: str, base_path: str) -> Dict[str, str]:
+        """Map '<remote_dir>/<prompt_id>' -> prompt from batch manifests"""
+        cmd = f"ssh {remote_host} 'find \"{base_path}\" -name manifest.json -exec cat {{}} \\;'"
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+
+        prompts = {}
+        decoder = json.JSONDecoder()
+        text = result.stdout
+        pos = 0
+        while pos < len(text):
+            # Manifests are concatenated; decode them one after another
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+            if pos >= len(text):
+                break
+            try:
+                manifest, pos = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                break
+            for entry in manifest.get('results', []):
+                if entry.get('remote_path') and entry.get('prompt'):
+                    prompts[f"{entry['remote_path']}/{entry['id']}"] = entry['prompt']
+        return prompts
+
+    @staticmethod
+    def _match_prompt(prompts: Dict[str, str], remote_path: str) -> Optional[str]:
+        # Files are named '<prompt_id>_<n>.<ext>' or '<prompt_id>.<ext>'
+        stem = os.path.splitext(remote_path)[0]
+        while '_' in os.path.basename(stem):
+            if stem in prompts:
+                return prompts[stem]
+            stem = stem.rsplit('_', 1)[0]
+        return prompts.get(stem)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Media dedup index for MJ storage")
+    parser.add_argument("--rebuild", nargs=2, metavar=("HOST", "PATH"),
+                        help="Scan existing storage on HOST under PATH and populate the index")
+    parser.add_argument("--db", default=DEFAULT_INDEX_PATH, help=f"Index path (default: {DEFAULT_INDEX_PATH})")
+    args = parser.parse_args()
+
+    index = MediaIndex(args.db)
+
+    if args.rebuild:
+        host, path = args.rebuild
+        print(f"Scanning {host}:{path}...")
+        indexed = index.rebuild(host, path)
+        print(f"Indexed {indexed} files")
+
+    print(f"Index: {index.db_path} ({index.count()} files)")
+
+
+if __name__ == "__main__":
+    main()
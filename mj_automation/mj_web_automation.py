@@ -10,18 +10,34 @@ Usage:
 
     mj = MidjourneyAutomation()
     result = mj.generate("cosmic nebula --ar 16:9 --v 6.1")
-    print(result['image_urls'])
+    print(result.image_urls)
+
+Asyncio:
+    from mj_web_automation import AsyncMidjourneyAutomation, async_batch_generate
+
+    mj = AsyncMidjourneyAutomation()
+    result = await mj.generate("cosmic nebula --ar 16:9 --v 6.1")
+    results = await async_batch_generate(prompts, remote_host="beta", remote_path="/Volumes/STUDIO/IMAGES")
 """
 
+import asyncio
+import functools
+import inspect
 import subprocess
 import json
 import time
 import os
 import re
-from typing import Optional, Dict, List, Any
-from dataclasses import dataclass
+from typing import Optional, Dict, List, Any, Awaitable, Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from media_index import MediaIndex, file_hash
+from prompt_cache import PromptCache, CACHE_MODES
+from status_probe import StatusProbe
+from adaptive_wait import WaitModel, shared_wait_model
+from tracer import Tracer, traced
+
 
 @dataclass
 class GenerationResult:
@@ -32,6 +48,9 @@ class GenerationResult:
     prompt: str
     elapsed_seconds: float
     error: Optional[str] = None
+    cached: bool = False  # True if served from the prompt cache
+    local_files: List[str] = field(default_factory=list)
+    remote_path: Optional[str] = None
 
 
 @dataclass
@@ -47,31 +66,60 @@ class VideoGenerationResult:
     error: Optional[str] = None
 
 
-class MidjourneyAutomation:
-    """Automates Midjourney via web interface"""
+class AsyncMidjourneyAutomation:
+    """Automates Midjourney via web interface (asyncio)"""
 
-    def __init__(self, poll_interval: int = 5, max_wait: int = 180):
+    def __init__(self, poll_interval: int = 5, max_wait: int = 180,
+                 media_index: Optional[MediaIndex] = None,
+                 prompt_cache: Optional[PromptCache] = None,
+                 window_id: Optional[int] = None, tab_id: Optional[int] = None,
+                 wait_model: Optional[WaitModel] = None, tracer: Optional[Tracer] = None,
+                 base_url: str = "https://www.midjourney.com"):
         """
         Initialize MJ automation.
 
         Args:
-            poll_interval: Seconds between status checks
+            poll_interval: Seconds between status checks until the wait
+                           model has learned typical job durations
             max_wait: Maximum seconds to wait for generation
+            media_index: Optional content-hash index used to skip duplicate transfers
+            prompt_cache: Optional cache of earlier generations (opt-in)
+            window_id: Chrome window id of the tab to drive (with tab_id)
+            tab_id: Chrome tab id to drive; None drives the active tab of the
+                    front window
+            wait_model: Learned job durations used to schedule polls
+                        (defaults to the shared on-disk model)
+            tracer: Records per-stage timing spans (share one across tabs
+                    to trace a whole batch)
+            base_url: Site to drive (e.g. a local fake_mj_server for benchmarks)
         """
+        if (window_id is None) != (tab_id is None):
+            raise ValueError("window_id and tab_id must be given together")
         self.poll_interval = poll_interval
         self.max_wait = max_wait
-        self.base_url = "https://www.midjourney.com"
-
-    def _run_applescript(self, script: str) -> str:
+        self.media_index = media_index
+        self.prompt_cache = prompt_cache
+        self.window_id = window_id
+        self.tab_id = tab_id
+        self.base_url = base_url.rstrip('/')
+        # Injected once per page; tracks each job incrementally
+        self.probe = StatusProbe(self._run_js_in_chrome)
+        self.wait_model = wait_model or shared_wait_model()
+        self.tracer = tracer or Tracer()
+
+    @property
+    def _tab_ref(self) -> str:
+        """AppleScript reference to the tab this instance drives"""
+        if self.tab_id is None:
+            return "active tab of front window"
+        return f"tab id {self.tab_id} of window id {self.window_id}"
+
+    async def _run_applescript(self, script: str) -> str:
         """Execute AppleScript and return result"""
-        cmd = f'''osascript << 'EOF'
-{script}
-EOF'''
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        return result.stdout.strip()
+        return await _run_applescript_async(script)
 
-    def _run_js_in_chrome(self, js_code: str) -> str:
-        """Execute JavaScript in Chrome's active tab"""
+    async def _run_js_in_chrome(self, js_code: str) -> str:
+        """Execute JavaScript in Chrome's active tab (or the bound tab)"""
         import tempfile
 
         # Write JS to temp file to avoid escaping issues
@@ -84,45 +132,51 @@ EOF'''
             script = f'''
 set jsCode to read POSIX file "{js_file}" as «class utf8»
 tell application "Google Chrome"
-    tell active tab of front window
+    tell {self._tab_ref}
         execute javascript jsCode
     end tell
 end tell
 '''
-            result = self._run_applescript(script)
+            result = await self._run_applescript(script)
         finally:
             os.remove(js_file)
 
         return result
 
-    def _navigate_to_imagine(self) -> bool:
-        """Navigate Chrome to MJ imagine page"""
-        script = '''
+    async def _open_url(self, url: str):
+        """Load a URL in the tab"""
+        await self._run_applescript(f'''
 tell application "Google Chrome"
-    activate
-    set URL of active tab of front window to "https://www.midjourney.com/imagine"
+    set URL of {self._tab_ref} to "{url}"
 end tell
-delay 3
+''')
+
+    async def _navigate_to_imagine(self) -> bool:
+        """Navigate Chrome to MJ imagine page"""
+        # A bound tab is driven in the background - don't steal focus
+        activate = "activate" if self.tab_id is None else ""
+        # Mark the current document, so the wait below can't pass on it
+        # while it is still being replaced (e.g. when already on /imagine)
+        await self._run_js_in_chrome("window.__mjNavigating = true")
+        await self._run_applescript(f'''
 tell application "Google Chrome"
-    tell active tab of front window
-        execute javascript "window.location.href.includes('imagine')"
-    end tell
+    {activate}
+    set URL of {self._tab_ref} to "{self.base_url}/imagine"
 end tell
-'''
-        result = self._run_applescript(script)
-        return 'true' in result.lower()
+''')
+        return await self._wait_for(self._on_new_imagine_page, timeout=30)
 
-    def _check_logged_in(self) -> bool:
+    async def _check_logged_in(self) -> bool:
         """Check if user is logged into Midjourney"""
         js = '''
 (function() {
     return document.body.innerText.includes('My Account');
 })();
 '''
-        result = self._run_js_in_chrome(js)
+        result = await self._run_js_in_chrome(js)
         return 'true' in result.lower()
 
-    def _enter_prompt(self, prompt: str) -> bool:
+    async def _enter_prompt(self, prompt: str) -> bool:
         """Enter prompt into textarea"""
         js = f'''
 (function() {{
@@ -138,15 +192,19 @@ end tell
     return JSON.stringify({{success: true, value: textarea.value}});
 }})();
 '''
-        result = self._run_js_in_chrome(js)
+        result = await self._run_js_in_chrome(js)
         try:
             data = json.loads(result)
             return data.get('success', False)
         except:
             return False
 
-    def _submit_prompt(self) -> bool:
+    async def _submit_prompt(self) -> bool:
         """Submit the prompt by pressing Enter"""
+        if self.tab_id is not None:
+            # Keystrokes go to the focused tab, so bound tabs get a DOM event instead
+            return await self._submit_prompt_in_page()
+
         script = '''
 tell application "Google Chrome"
     activate
@@ -155,58 +213,87 @@ delay 0.2
 tell application "System Events"
     keystroke return
 end tell
-delay 1
 '''
-        self._run_applescript(script)
+        await self._run_applescript(script)
         return True
 
-    def _get_generation_status(self) -> Dict[str, Any]:
-        """Check generation status and get image URLs if complete"""
+    async def _submit_prompt_in_page(self) -> bool:
+        """Submit the prompt by dispatching Enter on the textarea"""
         js = '''
 (function() {
-    const text = document.body.innerText;
-    const progressMatch = text.match(/(\\d+)% Complete/);
-    const progress = progressMatch ? parseInt(progressMatch[1]) : null;
-
-    // Check for completed images
-    const images = document.querySelectorAll('img[src*="cdn.midjourney"]');
-    const imageUrls = [];
-    for (const img of images) {
-        if (img.src && img.naturalWidth > 50) {
-            imageUrls.push(img.src);
-        }
-    }
-
-    // Get job ID from URL if available
-    const urlMatch = window.location.href.match(/jobs\\/([a-f0-9-]+)/);
-    const jobId = urlMatch ? urlMatch[1] : null;
-
-    // Check for errors
-    const hasError = text.toLowerCase().includes('error') && text.toLowerCase().includes('generation');
-
-    return JSON.stringify({
-        progress: progress,
-        imageCount: imageUrls.length,
-        imageUrls: [...new Set(imageUrls)],
-        jobId: jobId,
-        hasError: hasError,
-        isGenerating: text.includes('Generating') || progress !== null
-    });
+    const textarea = document.querySelector('textarea');
+    if (!textarea) return JSON.stringify({success: false, error: 'No textarea'});
+    const opts = {key: 'Enter', code: 'Enter', keyCode: 13, which: 13, bubbles: true, cancelable: true};
+    textarea.dispatchEvent(new KeyboardEvent('keydown', opts));
+    textarea.dispatchEvent(new KeyboardEvent('keypress', opts));
+    textarea.dispatchEvent(new KeyboardEvent('keyup', opts));
+    return JSON.stringify({success: true});
 })();
 '''
-        result = self._run_js_in_chrome(js)
+        result = await self._run_js_in_chrome(js)
         try:
-            return json.loads(result)
+            return json.loads(result).get('success', False)
         except:
-            return {'progress': None, 'imageCount': 0, 'imageUrls': [], 'hasError': False, 'isGenerating': False}
+            return False
 
-    def _poll_for_completion(self) -> Dict[str, Any]:
-        """Poll until generation completes or times out"""
-        start_time = time.time()
+    async def _wait_for(self, condition: Callable[[], Awaitable[Any]], timeout: float,
+                        interval: float = 0.25) -> bool:
+        """Poll an async condition until it is truthy or the timeout passes"""
+        deadline = time.time() + timeout
+        while True:
+            if await condition():
+                return True
+            if time.time() >= deadline:
+                return False
+            await asyncio.sleep(interval)
+
+    async def _prompt_ready(self) -> bool:
+        """Check the prompt textarea is present and enabled"""
+        js = '''
+(function() {
+    const textarea = document.querySelector('textarea');
+    return !!textarea && !textarea.disabled && !textarea.readOnly;
+})();
+'''
+        return 'true' in (await self._run_js_in_chrome(js)).lower()
+
+    async def _on_imagine_page(self) -> bool:
+        """Check the tab is showing the imagine page"""
+        return 'true' in (await self._run_js_in_chrome("window.location.pathname.startsWith('/imagine')")).lower()
+
+    async def _on_new_imagine_page(self) -> bool:
+        """Check the imagine page loaded by _navigate_to_imagine is showing"""
+        return await self._on_imagine_page() and 'true' in (
+            await self._run_js_in_chrome("!window.__mjNavigating && document.readyState !== 'loading'")).lower()
+
+    async def _in_detail_view(self) -> bool:
+        """Check the image detail view (a /jobs/ URL) is showing"""
+        return 'true' in (await self._run_js_in_chrome("window.location.href.includes('/jobs/')")).lower()
+
+    async def _job_started(self, kind: str) -> bool:
+        """Check the probe has seen the submitted job start"""
+        status = await self._get_generation_status() if kind == 'image' else await self._get_video_status()
+        return bool(status.get('isGenerating') or status.get('progress') is not None
+                    or status.get('imageCount') or status.get('hasVideo'))
+
+    async def _get_generation_status(self) -> Dict[str, Any]:
+        """Check generation status and get image URLs if complete"""
+        if self.probe.kind != 'image':
+            await self.probe.begin('image', baseline=False)
+        return await self.probe.poll()
+
+    async def _poll_for_completion(self, submitted_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Poll until generation completes or times out.
+
+        Polls are spaced by the wait model: sparse early, dense near the
+        typical finish time for image jobs.
+        """
+        start_time = submitted_at or time.time()
         last_progress = None
 
         while time.time() - start_time < self.max_wait:
-            status = self._get_generation_status()
+            status = await self._get_generation_status()
 
             progress = status.get('progress')
             image_count = status.get('imageCount', 0)
@@ -218,6 +305,7 @@ delay 1
 
             # Check for completion (has images and not actively generating)
             if image_count >= 4 and not status.get('isGenerating'):
+                self.wait_model.record('image', time.time() - start_time)
                 return {
                     'success': True,
                     'image_urls': status.get('imageUrls', []),
@@ -231,10 +319,12 @@ delay 1
                     'error': 'Generation error detected'
                 }
 
-            time.sleep(self.poll_interval)
+            elapsed = time.time() - start_time
+            interval = self.wait_model.next_interval('image', elapsed, fallback=self.poll_interval)
+            await asyncio.sleep(max(0.0, min(interval, self.max_wait - elapsed)))
 
         # Timeout - check if we have any images
-        final_status = self._get_generation_status()
+        final_status = await self._get_generation_status()
         if final_status.get('imageCount', 0) > 0:
             return {
                 'success': True,
@@ -247,23 +337,49 @@ delay 1
             'error': 'Timeout waiting for generation'
         }
 
-    def generate(self, prompt: str, navigate: bool = True) -> GenerationResult:
+    @traced('generate')
+    async def generate(self, prompt: str, navigate: bool = True, cache: str = 'reuse') -> GenerationResult:
         """
         Generate images from a prompt.
 
         Args:
             prompt: The full MJ prompt including parameters
             navigate: Whether to navigate to imagine page first
+            cache: Prompt cache mode (only used if a prompt cache is configured):
+                   'reuse' returns an earlier result on a hit, 'force' always
+                   generates and refreshes the cache, 'off' bypasses it
 
         Returns:
             GenerationResult with success status and image URLs
         """
+        if cache not in CACHE_MODES:
+            raise ValueError(f"cache must be one of {CACHE_MODES}, got {cache!r}")
+
         start_time = time.time()
 
-        # Navigate to imagine page if requested
-        if navigate:
+        if self.prompt_cache and cache == 'reuse':
+            with self.tracer.span('cache_lookup') as attrs:
+                hit = self.prompt_cache.get(prompt)
+                attrs['hit'] = hit is not None
+            if hit:
+                print(f"Cache hit: reusing job {hit.job_id} from {hit.created_at}")
+                return GenerationResult(
+                    success=True,
+                    job_id=hit.job_id,
+                    image_urls=hit.image_urls,
+                    prompt=prompt,
+                    elapsed_seconds=time.time() - start_time,
+                    cached=True,
+                    local_files=hit.local_files,
+                    remote_path=hit.remote_path
+                )
+
+        # Navigate to imagine page if requested (or if a video flow left the tab elsewhere)
+        if navigate or not await self._on_imagine_page():
             print("Navigating to Midjourney...")
-            if not self._navigate_to_imagine():
+            with self.tracer.span('navigate'):
+                navigated = await self._navigate_to_imagine()
+            if not navigated:
                 return GenerationResult(
                     success=False,
                     job_id=None,
@@ -273,8 +389,13 @@ delay 1
                     error="Failed to navigate to imagine page"
                 )
 
+        # Wait for the prompt box (previous job's submission may still be settling)
+        with self.tracer.span('prompt_ready'):
+            await self._wait_for(self._prompt_ready, timeout=10)
+            logged_in = await self._check_logged_in()
+
         # Check login status
-        if not self._check_logged_in():
+        if not logged_in:
             return GenerationResult(
                 success=False,
                 job_id=None,
@@ -286,7 +407,9 @@ delay 1
 
         # Enter prompt
         print(f"Entering prompt: {prompt[:50]}...")
-        if not self._enter_prompt(prompt):
+        with self.tracer.span('enter_prompt'):
+            entered = await self._enter_prompt(prompt)
+        if not entered:
             return GenerationResult(
                 success=False,
                 job_id=None,
@@ -296,21 +419,28 @@ delay 1
                 error="Failed to enter prompt"
             )
 
-        # Submit
+        # Snapshot the page so only this job's images are reported
         print("Submitting prompt...")
-        self._submit_prompt()
+        with self.tracer.span('submit'):
+            await self.probe.begin('image')
+            await self._submit_prompt()
+        submitted_at = time.time()
 
-        # Wait a moment for generation to start
-        time.sleep(3)
+        # Wait for generation to start (time spent queued on MJ's side)
+        with self.tracer.span('queue'):
+            await self._wait_for(lambda: self._job_started('image'), timeout=5, interval=0.5)
 
         # Poll for completion
-        print("Waiting for generation...")
-        result = self._poll_for_completion()
+        print(f"Waiting for generation... ({self.wait_model.describe('image', fallback=self.poll_interval)})")
+        with self.tracer.span('render'):
+            result = await self._poll_for_completion(submitted_at)
 
         elapsed = time.time() - start_time
 
         if result.get('success'):
             print(f"Generation complete! ({elapsed:.1f}s)")
+            if self.prompt_cache and cache != 'off':
+                self.prompt_cache.put(prompt, result.get('job_id'), result.get('image_urls', []), elapsed)
             return GenerationResult(
                 success=True,
                 job_id=result.get('job_id'),
@@ -329,9 +459,10 @@ delay 1
                 error=result.get('error')
             )
 
-    def download_images(self, image_urls: List[str], output_dir: str, prefix: str = "mj") -> List[str]:
+    @traced('download_images')
+    async def download_images(self, image_urls: List[str], output_dir: str, prefix: str = "mj") -> List[str]:
         """
-        Download images to local directory.
+        Download images to local directory (all images concurrently).
 
         Args:
             image_urls: List of image URLs to download
@@ -342,51 +473,94 @@ delay 1
             List of local file paths
         """
         os.makedirs(output_dir, exist_ok=True)
-        downloaded = []
 
-        for i, url in enumerate(image_urls):
+        async def download(i: int, url: str) -> Optional[str]:
             ext = '.webp' if 'webp' in url else '.png'
             filename = f"{prefix}_{i}{ext}"
             filepath = os.path.join(output_dir, filename)
 
             cmd = f'curl -s -o "{filepath}" "{url}"'
-            subprocess.run(cmd, shell=True)
+            with self.tracer.span('download', file=filename) as attrs:
+                await _run_shell(cmd)
+                attrs['bytes'] = os.path.getsize(filepath) if os.path.exists(filepath) else 0
 
             if os.path.exists(filepath):
-                downloaded.append(filepath)
                 print(f"  Downloaded: {filename}")
+                return filepath
+            return None
 
-        return downloaded
+        results = await asyncio.gather(*(download(i, url) for i, url in enumerate(image_urls)))
+        return [filepath for filepath in results if filepath]
 
-    def transfer_to_remote(self, local_files: List[str], remote_host: str, remote_path: str) -> bool:
+    @traced('transfer_to_remote')
+    async def transfer_to_remote(self, local_files: List[str], remote_host: str, remote_path: str,
+                                 prompt: Optional[str] = None, job_id: Optional[str] = None) -> bool:
         """
         Transfer files to remote storage via rsync.
 
+        If a media index is configured, files whose content already exists on
+        the host are skipped (same path) or hard-linked remotely (other path).
+
         Args:
             local_files: List of local file paths
             remote_host: SSH host (e.g., 'beta')
             remote_path: Remote directory path
+            prompt: Prompt recorded in the media index
+            job_id: MJ job ID recorded in the media index
 
         Returns:
             True if successful
         """
         # Create remote directory
-        subprocess.run(f'ssh {remote_host} "mkdir -p {remote_path}"', shell=True)
+        with self.tracer.span('remote_mkdir', host=remote_host):
+            await _run_shell(f'ssh {remote_host} "mkdir -p {remote_path}"')
 
         # Transfer each file
         for filepath in local_files:
+            dest = f"{remote_path}/{os.path.basename(filepath)}"
+            content_hash = None
+
+            if self.media_index:
+                with self.tracer.span('hash', file=os.path.basename(filepath)):
+                    content_hash = await asyncio.to_thread(file_hash, filepath)
+                    existing = self.media_index.lookup(content_hash, remote_host)
+                if existing and existing.remote_path == dest:
+                    print(f"  Skipped (already stored): {os.path.basename(filepath)}")
+                    continue
+                if existing and await self._remote_hardlink(remote_host, existing.remote_path, dest):
+                    self.media_index.add(content_hash, remote_host, dest, prompt, job_id,
+                                         os.path.getsize(filepath))
+                    print(f"  Linked duplicate: {os.path.basename(filepath)} -> {existing.remote_path}")
+                    continue
+                if existing:
+                    # Stale entry - the original is gone from the host
+                    self.media_index.remove(remote_host, existing.remote_path)
+
             cmd = f'rsync -avz "{filepath}" "{remote_host}:{remote_path}/"'
-            result = subprocess.run(cmd, shell=True, capture_output=True)
+            with self.tracer.span('rsync', file=os.path.basename(filepath),
+                                  bytes=os.path.getsize(filepath)) as attrs:
+                result = await _run_shell(cmd)
+                attrs['ok'] = result.returncode == 0
             if result.returncode != 0:
                 print(f"  Failed to transfer: {filepath}")
                 return False
+            if self.media_index:
+                self.media_index.add(content_hash, remote_host, dest, prompt, job_id,
+                                     os.path.getsize(filepath))
             print(f"  Transferred: {os.path.basename(filepath)}")
 
         return True
 
+    async def _remote_hardlink(self, remote_host: str, source: str, dest: str) -> bool:
+        """Hard-link an existing remote file to a new path on the same host"""
+        with self.tracer.span('remote_hardlink', file=os.path.basename(dest)) as attrs:
+            result = await _run_shell(f"ssh {remote_host} 'ln -f \"{source}\" \"{dest}\"'")
+            attrs['ok'] = result.returncode == 0
+        return result.returncode == 0
+
     # ========== VIDEO GENERATION METHODS ==========
 
-    def _navigate_to_image_detail(self, image_index: int = 0) -> bool:
+    async def _navigate_to_image_detail(self, image_index: int = 0) -> bool:
         """
         Click on a generated image to open its detail view.
 
@@ -418,18 +592,15 @@ delay 1
     return JSON.stringify({{success: true, clicked: targetIndex, total: clickableImages.length}});
 }})();
 '''
-        result = self._run_js_in_chrome(js)
+        result = await self._run_js_in_chrome(js)
         try:
             data = json.loads(result)
             return data.get('success', False)
         except:
             return False
 
-    def _find_and_click_animate(self) -> bool:
+    async def _find_and_click_animate(self) -> bool:
         """Find and click the Animate button in the image detail view"""
-        # Wait for detail view to load
-        time.sleep(1.5)
-
         js = '''
 (function() {
     // Look for Animate button - it may be text or icon-based
@@ -458,14 +629,14 @@ delay 1
     return JSON.stringify({success: false, error: 'Animate button not found'});
 })();
 '''
-        result = self._run_js_in_chrome(js)
+        result = await self._run_js_in_chrome(js)
         try:
             data = json.loads(result)
             return data.get('success', False)
         except:
             return False
 
-    def _set_motion_mode(self, mode: str = 'high') -> bool:
+    async def _set_motion_mode(self, mode: str = 'high') -> bool:
         """
         Set motion mode for video generation.
 
@@ -498,14 +669,14 @@ delay 1
     return JSON.stringify({{success: false, error: 'Motion mode selector not found'}});
 }})();
 '''
-        result = self._run_js_in_chrome(js)
+        result = await self._run_js_in_chrome(js)
         try:
             data = json.loads(result)
             return data.get('success', False)
         except:
             return False
 
-    def _submit_video_generation(self) -> bool:
+    async def _submit_video_generation(self) -> bool:
         """Submit the video generation request"""
         js = '''
 (function() {
@@ -527,95 +698,31 @@ delay 1
     return JSON.stringify({success: false, error: 'Submit button not found or disabled'});
 })();
 '''
-        result = self._run_js_in_chrome(js)
+        result = await self._run_js_in_chrome(js)
         try:
             data = json.loads(result)
             return data.get('success', False)
         except:
             return False
 
-    def _get_video_status(self) -> Dict[str, Any]:
+    async def _get_video_status(self) -> Dict[str, Any]:
         """Check video generation status and get video URL if complete"""
-        js = '''
-(function() {
-    const text = document.body.innerText;
-
-    // Check for progress indicator
-    const progressMatch = text.match(/(\\d+)%/);
-    const progress = progressMatch ? parseInt(progressMatch[1]) : null;
-
-    // Look for video elements
-    const videos = document.querySelectorAll('video');
-    let videoUrl = null;
-
-    for (const video of videos) {
-        const src = video.src || video.querySelector('source')?.src;
-        if (src && src.includes('midjourney')) {
-            videoUrl = src;
-            break;
-        }
-    }
-
-    // Check for CDN video URLs in page HTML
-    if (!videoUrl) {
-        const html = document.documentElement.innerHTML;
-        const cdnMatch = html.match(/https:\\/\\/cdn\\.midjourney\\.com\\/video\\/[^"'\\s]+\\.mp4/);
-        if (cdnMatch) videoUrl = cdnMatch[0];
-    }
-
-    // Check for Vimeo iframe (video is hosted there)
-    let vimeoUrl = null;
-    const vimeoIframe = document.querySelector('iframe[src*="vimeo"]');
-    if (vimeoIframe) {
-        vimeoUrl = vimeoIframe.src;
-    }
+        if self.probe.kind != 'video':
+            await self.probe.begin('video', baseline=False)
+        return await self.probe.poll()
 
-    // Get job ID from URL
-    const urlMatch = window.location.href.match(/jobs\\/([a-f0-9-]+)/);
-    const jobId = urlMatch ? urlMatch[1] : null;
-
-    // Check for errors
-    const hasError = text.toLowerCase().includes('error') || text.toLowerCase().includes('failed');
-
-    // Check if still generating
-    const isGenerating = text.includes('Generating') || text.includes('Processing') ||
-                         text.includes('Animating') || (progress !== null && progress < 100);
-
-    // Check for duration indicator (video complete)
-    const durationMatch = text.match(/duration\\s*([\\d.]+)s/i);
-    const duration = durationMatch ? parseFloat(durationMatch[1]) : null;
-
-    // Video is ready if we have a vimeo iframe or CDN URL
-    const hasVideo = (vimeoUrl !== null) || (videoUrl !== null) || (duration !== null);
-
-    return JSON.stringify({
-        progress: progress,
-        videoUrl: videoUrl,
-        vimeoUrl: vimeoUrl,
-        jobId: jobId,
-        hasError: hasError,
-        isGenerating: isGenerating,
-        hasVideo: hasVideo,
-        duration: duration
-    });
-})();
-'''
-        result = self._run_js_in_chrome(js)
-        try:
-            return json.loads(result)
-        except:
-            return {'progress': None, 'videoUrl': None, 'hasError': False, 'isGenerating': False, 'hasVideo': False}
-
-    def _poll_for_video_completion(self, max_wait: int = 300) -> Dict[str, Any]:
+    async def _poll_for_video_completion(self, max_wait: int = 300,
+                                         submitted_at: Optional[float] = None) -> Dict[str, Any]:
         """
         Poll until video generation completes or times out.
-        Video takes longer than images (~2-3 minutes)
+        Video takes longer than images (~2-3 minutes); polls are spaced by
+        the wait model's video durations.
         """
-        start_time = time.time()
+        start_time = submitted_at or time.time()
         last_progress = None
 
         while time.time() - start_time < max_wait:
-            status = self._get_video_status()
+            status = await self._get_video_status()
 
             progress = status.get('progress')
 
@@ -626,6 +733,7 @@ delay 1
 
             # Check for completion
             if status.get('hasVideo') and not status.get('isGenerating'):
+                self.wait_model.record('video', time.time() - start_time)
                 return {
                     'success': True,
                     'video_url': status.get('videoUrl'),
@@ -639,10 +747,12 @@ delay 1
                     'error': 'Video generation error detected'
                 }
 
-            time.sleep(self.poll_interval)
+            elapsed = time.time() - start_time
+            interval = self.wait_model.next_interval('video', elapsed, fallback=self.poll_interval)
+            await asyncio.sleep(max(0.0, min(interval, max_wait - elapsed)))
 
         # Timeout - check final status
-        final_status = self._get_video_status()
+        final_status = await self._get_video_status()
         if final_status.get('hasVideo'):
             return {
                 'success': True,
@@ -655,8 +765,9 @@ delay 1
             'error': 'Timeout waiting for video generation'
         }
 
-    def generate_video(self, prompt: str, motion_mode: str = 'high',
-                       image_index: int = 0, navigate: bool = True) -> VideoGenerationResult:
+    @traced('generate_video')
+    async def generate_video(self, prompt: str, motion_mode: str = 'high',
+                             image_index: int = 0, navigate: bool = True) -> VideoGenerationResult:
         """
         Generate a video from a prompt (image-to-video workflow).
 
@@ -675,7 +786,8 @@ delay 1
 
         # Step 1: Generate the source image first
         print("Step 1: Generating source image...")
-        image_result = self.generate(prompt, navigate=navigate)
+        # Never served from cache - the grid must be on the page to animate it
+        image_result = await self.generate(prompt, navigate=navigate, cache='off')
 
         if not image_result.success:
             return VideoGenerationResult(
@@ -694,9 +806,12 @@ delay 1
 
         # Step 2: Click on the image to open detail view
         print("Step 2: Opening image detail view...")
-        time.sleep(2)  # Wait for images to fully load
-
-        if not self._navigate_to_image_detail(image_index):
+        with self.tracer.span('open_detail'):
+            opened = await self._wait_for(lambda: self._navigate_to_image_detail(image_index), timeout=5)
+            if opened:
+                # Wait for detail view to load
+                await self._wait_for(self._in_detail_view, timeout=5)
+        if not opened:
             return VideoGenerationResult(
                 success=False,
                 job_id=image_result.job_id,
@@ -708,14 +823,20 @@ delay 1
                 error="Failed to open image detail view"
             )
 
-        time.sleep(2)  # Wait for detail view to load
+        return await self._animate_open_image(prompt, motion_mode, image_result.job_id,
+                                              source_image_url, start_time)
 
+    async def _animate_open_image(self, prompt: str, motion_mode: str, source_job_id: Optional[str],
+                                  source_image_url: Optional[str], start_time: float) -> VideoGenerationResult:
+        """Animate the image open in the detail view and wait for the video"""
         # Step 3: Find and click Animate button
         print("Step 3: Clicking Animate button...")
-        if not self._find_and_click_animate():
+        with self.tracer.span('click_animate'):
+            animated = await self._wait_for(self._find_and_click_animate, timeout=5, interval=0.5)
+        if not animated:
             return VideoGenerationResult(
                 success=False,
-                job_id=image_result.job_id,
+                job_id=source_job_id,
                 video_url=None,
                 source_image_url=source_image_url,
                 prompt=prompt,
@@ -724,24 +845,28 @@ delay 1
                 error="Failed to find Animate button"
             )
 
-        time.sleep(1.5)  # Wait for animate modal
-
-        # Step 4: Set motion mode
+        # Step 4: Set motion mode (once the animate modal is up)
         print(f"Step 4: Setting motion mode to '{motion_mode}'...")
-        self._set_motion_mode(motion_mode)
-        time.sleep(0.5)
+        with self.tracer.span('motion_mode', mode=motion_mode):
+            await self._wait_for(lambda: self._set_motion_mode(motion_mode), timeout=5, interval=0.5)
 
         # Step 5: Submit video generation
         print("Step 5: Submitting video generation...")
-        if not self._submit_video_generation():
-            # Try pressing Enter as fallback
-            self._submit_prompt()
+        with self.tracer.span('submit_video'):
+            await self.probe.begin('video')
+            if not await self._wait_for(self._submit_video_generation, timeout=3, interval=0.5):
+                # Try pressing Enter as fallback
+                await self._submit_prompt()
+        submitted_at = time.time()
 
-        time.sleep(3)  # Wait for generation to start
+        # Wait for generation to start
+        with self.tracer.span('queue_video'):
+            await self._wait_for(lambda: self._job_started('video'), timeout=5, interval=0.5)
 
         # Step 6: Poll for completion (videos take longer)
-        print("Step 6: Waiting for video generation (this may take 2-3 minutes)...")
-        result = self._poll_for_video_completion(max_wait=300)
+        print(f"Step 6: Waiting for video generation ({self.wait_model.describe('video', fallback=self.poll_interval)})...")
+        with self.tracer.span('render_video'):
+            result = await self._poll_for_video_completion(max_wait=300, submitted_at=submitted_at)
 
         elapsed = time.time() - start_time
 
@@ -769,7 +894,8 @@ delay 1
                 error=result.get('error')
             )
 
-    def download_video(self, video_url: str, output_dir: str, filename: str = "video") -> Optional[str]:
+    @traced('download_video')
+    async def download_video(self, video_url: str, output_dir: str, filename: str = "video") -> Optional[str]:
         """
         Download video to local directory via browser fetch (handles Cloudflare).
 
@@ -809,7 +935,8 @@ delay 1
     }}
 }})();
 '''
-        result = self._run_js_in_chrome(js)
+        with self.tracer.span('browser_fetch'):
+            result = await self._run_js_in_chrome(js)
 
         try:
             data = json.loads(result)
@@ -826,10 +953,11 @@ delay 1
             print(f"  Download error: {e}")
 
         # Fallback: try direct curl with cookies
-        cookies = self._run_js_in_chrome("document.cookie")
+        cookies = await self._run_js_in_chrome("document.cookie")
         if cookies:
-            cmd = f'curl -s -L -o "{filepath}" -H "Cookie: {cookies}" -H "Referer: https://www.midjourney.com/" "{video_url}"'
-            subprocess.run(cmd, shell=True)
+            cmd = f'curl -s -L -o "{filepath}" -H "Cookie: {cookies}" -H "Referer: {self.base_url}/" "{video_url}"'
+            with self.tracer.span('curl_fallback'):
+                await _run_shell(cmd)
             if os.path.exists(filepath) and os.path.getsize(filepath) > 10000:
                 print(f"  Downloaded video via curl: {filename}{ext}")
                 return filepath
@@ -837,7 +965,7 @@ delay 1
         print(f"  Failed to download video")
         return None
 
-    def _get_video_urls_from_page(self) -> List[str]:
+    async def _get_video_urls_from_page(self) -> List[str]:
         """Extract all video URLs from the current page"""
         js = '''
 (function() {
@@ -854,38 +982,88 @@ delay 1
     return JSON.stringify([...new Set(urls)]);
 })();
 '''
-        result = self._run_js_in_chrome(js)
+        result = await self._run_js_in_chrome(js)
         try:
             return json.loads(result)
         except:
             return []
 
-    def generate_video_from_image_url(self, image_url: str, motion_mode: str = 'high') -> VideoGenerationResult:
+    @traced('animate_image')
+    async def animate_image(self, job_id: Optional[str] = None, image_url: Optional[str] = None,
+                            image_index: int = 0, motion_mode: str = 'high',
+                            prompt: str = "") -> VideoGenerationResult:
         """
-        Generate video from an existing image URL (upload and animate).
+        Animate an image that was already generated, without generating it again.
+
+        Opens the job's detail page directly, so the image needn't be on the
+        imagine page (or even in this tab).
 
         Args:
-            image_url: URL of image to animate
+            job_id: MJ job id of the image grid
+            image_url: MJ CDN image URL; used when job_id is not given
+                       (job id and grid index are read from the URL)
+            image_index: Which image from the grid to animate (0-3)
             motion_mode: 'high' or 'low' motion
+            prompt: Prompt recorded in the result
 
         Returns:
-            VideoGenerationResult
+            VideoGenerationResult with success status and video URL
         """
         start_time = time.time()
 
-        # Navigate to imagine page with image input mode
-        print("Navigating to Midjourney with image upload...")
-        script = '''
-tell application "Google Chrome"
-    activate
-    set URL of active tab of front window to "https://www.midjourney.com/imagine"
-end tell
-delay 3
-'''
-        self._run_applescript(script)
+        if job_id is None and image_url:
+            job_id, url_index = _parse_image_url(image_url)
+            if url_index is not None:
+                image_index = url_index
+
+        if not job_id:
+            return VideoGenerationResult(
+                success=False,
+                job_id=None,
+                video_url=None,
+                source_image_url=image_url,
+                prompt=prompt,
+                motion_mode=motion_mode,
+                elapsed_seconds=time.time() - start_time,
+                error="Need a job id or a Midjourney CDN image URL to animate"
+            )
+
+        print(f"Opening job {job_id} (image {image_index + 1})...")
+        with self.tracer.span('open_detail'):
+            await self._open_url(f"{self.base_url}/jobs/{job_id}?index={image_index}")
+            opened = await self._wait_for(self._in_detail_view, timeout=15, interval=0.5)
+        if not opened:
+            return VideoGenerationResult(
+                success=False,
+                job_id=job_id,
+                video_url=None,
+                source_image_url=image_url,
+                prompt=prompt,
+                motion_mode=motion_mode,
+                elapsed_seconds=time.time() - start_time,
+                error="Failed to open image detail view"
+            )
+
+        return await self._animate_open_image(prompt, motion_mode, job_id, image_url, start_time)
+
+    async def generate_video_from_image_url(self, image_url: str, motion_mode: str = 'high') -> VideoGenerationResult:
+        """
+        Generate video from an existing image URL.
+
+        Midjourney CDN URLs are animated from their job's detail page (see
+        animate_image). Other images would need uploading, which is not
+        supported.
+
+        Args:
+            image_url: URL of image to animate
+            motion_mode: 'high' or 'low' motion
+
+        Returns:
+            VideoGenerationResult
+        """
+        if _parse_image_url(image_url)[0]:
+            return await self.animate_image(image_url=image_url, motion_mode=motion_mode)
 
-        # This would require more complex handling for image upload
-        # For now, return not implemented
         return VideoGenerationResult(
             success=False,
             job_id=None,
@@ -893,69 +1071,250 @@ delay 3
             source_image_url=image_url,
             prompt="",
             motion_mode=motion_mode,
-            elapsed_seconds=time.time() - start_time,
-            error="Image URL upload not yet implemented - use generate_video() with a prompt instead"
+            elapsed_seconds=0.0,
+            error="Image URL upload not yet implemented - use a Midjourney image URL or generate_video()"
         )
 
 
-def batch_generate(prompts: List[Dict[str, str]],
-                   output_base: str = "/tmp/mj_batch",
-                   remote_host: Optional[str] = None,
-                   remote_path: Optional[str] = None) -> List[Dict]:
+def _parse_image_url(image_url: str) -> tuple:
+    """(job_id, grid index) from a Midjourney CDN image URL, or (None, None)"""
+    match = re.search(r'cdn\.midjourney\.com/([0-9a-f-]{36})/0_(\d+)', image_url or '')
+    if not match:
+        return None, None
+    return match.group(1), int(match.group(2))
+
+
+class MidjourneyAutomation:
+    """
+    Blocking wrapper around AsyncMidjourneyAutomation.
+
+    Each call runs the coroutine on its own event loop, so this class must
+    not be used from inside a running loop - use AsyncMidjourneyAutomation
+    there. Other attributes (probe, tracer, prompt_cache, ...) are the async
+    instance's, for reads and writes alike (mj.max_wait = 300 reaches it).
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Takes the same arguments as AsyncMidjourneyAutomation"""
+        object.__setattr__(self, 'async_mj', AsyncMidjourneyAutomation(*args, **kwargs))
+
+    def __setattr__(self, name: str, value):
+        if name == 'async_mj':
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.async_mj, name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self.async_mj, name)
+
+    def __getattr__(self, name: str):
+        if name == 'async_mj':
+            raise AttributeError(name)
+        attr = getattr(self.async_mj, name)
+        if inspect.iscoroutinefunction(attr):
+            # Remaining helpers (e.g. _navigate_to_imagine) block like the public API
+            @functools.wraps(attr)
+            def call(*args, **kwargs):
+                return asyncio.run(attr(*args, **kwargs))
+            return call
+        return attr
+
+    def generate(self, prompt: str, navigate: bool = True, cache: str = 'reuse') -> GenerationResult:
+        """See AsyncMidjourneyAutomation.generate"""
+        return asyncio.run(self.async_mj.generate(prompt, navigate=navigate, cache=cache))
+
+    def generate_video(self, prompt: str, motion_mode: str = 'high',
+                       image_index: int = 0, navigate: bool = True) -> VideoGenerationResult:
+        """See AsyncMidjourneyAutomation.generate_video"""
+        return asyncio.run(self.async_mj.generate_video(prompt, motion_mode=motion_mode,
+                                                        image_index=image_index, navigate=navigate))
+
+    def animate_image(self, job_id: Optional[str] = None, image_url: Optional[str] = None,
+                      image_index: int = 0, motion_mode: str = 'high', prompt: str = "") -> VideoGenerationResult:
+        """See AsyncMidjourneyAutomation.animate_image"""
+        return asyncio.run(self.async_mj.animate_image(job_id=job_id, image_url=image_url, image_index=image_index,
+                                                       motion_mode=motion_mode, prompt=prompt))
+
+    def generate_video_from_image_url(self, image_url: str, motion_mode: str = 'high') -> VideoGenerationResult:
+        """See AsyncMidjourneyAutomation.generate_video_from_image_url"""
+        return asyncio.run(self.async_mj.generate_video_from_image_url(image_url, motion_mode=motion_mode))
+
+    def download_images(self, image_urls: List[str], output_dir: str, prefix: str = "mj") -> List[str]:
+        """See AsyncMidjourneyAutomation.download_images"""
+        return asyncio.run(self.async_mj.download_images(image_urls, output_dir, prefix))
+
+    def download_video(self, video_url: str, output_dir: str, filename: str = "video") -> Optional[str]:
+        """See AsyncMidjourneyAutomation.download_video"""
+        return asyncio.run(self.async_mj.download_video(video_url, output_dir, filename))
+
+    def transfer_to_remote(self, local_files: List[str], remote_host: str, remote_path: str,
+                           prompt: Optional[str] = None, job_id: Optional[str] = None) -> bool:
+        """See AsyncMidjourneyAutomation.transfer_to_remote"""
+        return asyncio.run(self.async_mj.transfer_to_remote(local_files, remote_host, remote_path,
+                                                            prompt=prompt, job_id=job_id))
+
+
+def _applescript_command(script: str) -> str:
+    return f'''osascript << 'EOF'
+{script}
+EOF'''
+
+
+def _run_applescript(script: str) -> str:
+    """Execute AppleScript and return result"""
+    result = subprocess.run(_applescript_command(script), shell=True, capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+async def _run_shell(cmd: str) -> subprocess.CompletedProcess:
+    """Run a shell command without blocking the event loop"""
+    proc = await asyncio.create_subprocess_shell(cmd, stdout=asyncio.subprocess.PIPE,
+                                                 stderr=asyncio.subprocess.PIPE)
+    stdout, stderr = await proc.communicate()
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout.decode(errors='replace'),
+                                       stderr.decode(errors='replace'))
+
+
+async def _run_applescript_async(script: str) -> str:
+    """Execute AppleScript without blocking the event loop"""
+    result = await _run_shell(_applescript_command(script))
+    return result.stdout.strip()
+
+
+def open_chrome_tab(url: str = "https://www.midjourney.com/imagine",
+                    window_id: Optional[int] = None) -> tuple:
+    """
+    Open a new Chrome tab and return its (window_id, tab_id).
+
+    Args:
+        url: URL to load in the new tab
+        window_id: Window to open the tab in; None opens a new window
+    """
+    if window_id is None:
+        script = f'''
+tell application "Google Chrome"
+    set newWindow to make new window
+    set URL of active tab of newWindow to "{url}"
+    return (id of newWindow as text) & "," & (id of active tab of newWindow as text)
+end tell
+'''
+    else:
+        script = f'''
+tell application "Google Chrome"
+    tell window id {window_id}
+        set newTab to make new tab with properties {{URL:"{url}"}}
+        return (id of it as text) & "," & (id of newTab as text)
+    end tell
+end tell
+'''
+    result = _run_applescript(script)
+    try:
+        win, tab = result.split(',')
+        return int(win), int(tab)
+    except ValueError:
+        raise RuntimeError(f"Could not open Chrome tab: {result!r}")
+
+
+def close_chrome_tab(window_id: int, tab_id: int):
+    """Close a Chrome tab opened with open_chrome_tab"""
+    _run_applescript(f'''
+tell application "Google Chrome"
+    close tab id {tab_id} of window id {window_id}
+end tell
+''')
+
+
+async def async_batch_generate(prompts: List[Dict[str, str]],
+                               output_base: str = "/tmp/mj_batch",
+                               remote_host: Optional[str] = None,
+                               remote_path: Optional[str] = None,
+                               mj: Optional[AsyncMidjourneyAutomation] = None,
+                               max_downloads: int = 4,
+                               max_transfers: int = 2) -> List[Dict]:
     """
-    Generate multiple prompts in batch.
+    Generate multiple prompts with stages overlapped.
+
+    The browser stage (generate) runs one prompt at a time in the tab, while
+    downloads and transfers of finished prompts run concurrently under their
+    own semaphores.
 
     Args:
         prompts: List of dicts with 'id' and 'prompt' keys
         output_base: Base directory for local output
         remote_host: Optional remote host for transfer
         remote_path: Optional remote path for transfer
+        mj: Automation instance to use (defaults to a new one)
+        max_downloads: Prompts downloading at once
+        max_transfers: Prompts transferring at once
 
     Returns:
-        List of results for each prompt
+        List of results for each prompt, in input order
     """
-    mj = MidjourneyAutomation()
-    results = []
-
-    for i, item in enumerate(prompts):
+    mj = mj or AsyncMidjourneyAutomation()
+    browser = asyncio.Semaphore(1)
+    downloads = asyncio.Semaphore(max_downloads)
+    transfers = asyncio.Semaphore(max_transfers)
+    navigated = False
+
+    async def run(i: int, item: Dict[str, str]) -> Dict:
+        nonlocal navigated
         prompt_id = item.get('id', f'prompt_{i}')
         prompt_text = item.get('prompt', '')
 
-        print(f"\n[{i+1}/{len(prompts)}] Processing: {prompt_id}")
+        with mj.tracer.job(prompt_id, lane=f"prompt-{i}"):
+            # Generate
+            async with browser:
+                print(f"\n[{i+1}/{len(prompts)}] Processing: {prompt_id}")
+                result = await mj.generate(prompt_text, navigate=not navigated)
+                navigated = True
 
-        # Generate
-        result = mj.generate(prompt_text, navigate=(i == 0))
+            if not result.success:
+                return {
+                    'id': prompt_id,
+                    'success': False,
+                    'error': result.error,
+                    'elapsed': result.elapsed_seconds
+                }
 
-        if result.success:
             # Download
             local_dir = os.path.join(output_base, prompt_id)
-            local_files = mj.download_images(result.image_urls, local_dir, prompt_id)
+            async with downloads:
+                local_files = await mj.download_images(result.image_urls, local_dir, prompt_id)
 
             # Transfer if remote specified
             if remote_host and remote_path:
                 remote_dir = os.path.join(remote_path, prompt_id)
-                mj.transfer_to_remote(local_files, remote_host, remote_dir)
+                async with transfers:
+                    await mj.transfer_to_remote(local_files, remote_host, remote_dir)
 
-            results.append({
+            return {
                 'id': prompt_id,
                 'success': True,
                 'image_urls': result.image_urls,
                 'local_files': local_files,
                 'elapsed': result.elapsed_seconds
-            })
-        else:
-            results.append({
-                'id': prompt_id,
-                'success': False,
-                'error': result.error,
-                'elapsed': result.elapsed_seconds
-            })
+            }
+
+    return list(await asyncio.gather(*(run(i, item) for i, item in enumerate(prompts))))
 
-        # Brief pause between generations
-        if i < len(prompts) - 1:
-            time.sleep(2)
 
-    return results
+def batch_generate(prompts: List[Dict[str, str]],
+                   output_base: str = "/tmp/mj_batch",
+                   remote_host: Optional[str] = None,
+                   remote_path: Optional[str] = None) -> List[Dict]:
+    """
+    Generate multiple prompts in batch (blocking form of async_batch_generate).
+
+    Args:
+        prompts: List of dicts with 'id' and 'prompt' keys
+        output_base: Base directory for local output
+        remote_host: Optional remote host for transfer
+        remote_path: Optional remote path for transfer
+
+    Returns:
+        List of results for each prompt
+    """
+    return asyncio.run(async_batch_generate(prompts, output_base, remote_host, remote_path))
 
 
 if __name__ == "__main__":
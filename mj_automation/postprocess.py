@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Media Post-Processing
+
+Derives thumbnails, PNG/AVIF conversions of WebP images, per-theme contact
+sheets and MP4 poster frames from downloaded MJ media. Transforms run in a
+ProcessPoolExecutor across all cores, and outputs whose sources (by content
+hash) and settings are unchanged since the last run are skipped.
+
+Image transforms need Pillow (pip install pillow; AVIF needs Pillow 11+ or
+pillow-avif-plugin); poster frames need ffmpeg on PATH. Transforms whose
+dependency is missing are reported as unsupported and skipped.
+
+Usage:
+    from postprocess import PostProcessor
+
+    with PostProcessor() as processor:
+        results = processor.process(["/tmp/mj_batch/theme/theme_img_0_0.webp"])
+        sheet = processor.contact_sheet(image_files, "/tmp/mj_batch/theme/theme_contact.jpg")
+
+Standalone:
+    python3 postprocess.py /tmp/mj_batch_001/cosmic_dawn --contact-sheet
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from media_index import file_hash
+
+# Per-directory record of source digests for outputs already produced
+STATE_FILENAME = ".postprocess.json"
+
+IMAGE_EXTENSIONS = ('.webp', '.png', '.jpg', '.jpeg')
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mov')
+
+# Suffixes of derived files, so they are never treated as sources
+DERIVED_SUFFIXES = ('_thumb', '_poster', '_contact')
+
+THUMB_SIZE = 512
+CONTACT_CELL = 384
+CONTACT_COLUMNS = 4
+
+
+class Unsupported(Exception):
+    """A transform's optional dependency is not available"""
+
+
+@dataclass
+class Transform:
+    """One derived output and the files it is made from"""
+    kind: str  # 'thumbnail', 'png', 'avif', 'contact_sheet' or 'poster'
+    sources: List[str]
+    output: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class TransformResult:
+    """Outcome of a transform: 'done', 'skipped', 'unsupported' or 'failed'"""
+    transform: Transform
+    status: str
+    digest: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ('done', 'skipped')
+
+
+def _digest(transform: Transform) -> str:
+    """Hash of the sources' content plus the transform settings"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([transform.kind, transform.params], sort_keys=True).encode())
+    for source in transform.sources:
+        digest.update(file_hash(source).encode())
+    return digest.hexdigest()
+
+
+def _temp_path(output: str) -> str:
+    # Keep the extension so Pillow/ffmpeg pick the right format
+    root, ext = os.path.splitext(output)
+    return f"{root}.{os.getpid()}.tmp{ext}"
+
+
+def _require_pillow():
+    if Image is None:
+        raise Unsupported("Pillow is not installed")
+
+
+def _open_rgb(path: str):
+    with Image.open(path) as img:
+        return img.convert('RGB')
+
+
+def _thumbnail(transform: Transform, tmp: str):
+    _require_pillow()
+    img = _open_rgb(transform.sources[0])
+    size = transform.params['size']
+    img.thumbnail((size, size))
+    img.save(tmp, quality=85)
+
+
+def _convert(transform: Transform, tmp: str):
+    _require_pillow()
+    with Image.open(transform.sources[0]) as img:
+        try:
+            img.save(tmp)
+        except (KeyError, ValueError, OSError) as e:
+            # Pillow raises these when it has no encoder for the format
+            if transform.kind == 'avif':
+                raise Unsupported(f"AVIF encoding not available: {e}")
+            raise
+
+
+def _contact_sheet(transform: Transform, tmp: str):
+    _require_pillow()
+    cell = transform.params['cell']
+    columns = min(transform.params['columns'], len(transform.sources))
+    rows = (len(transform.sources) + columns - 1) // columns
+    sheet = Image.new('RGB', (columns * cell, rows * cell), (16, 16, 16))
+    for i, source in enumerate(transform.sources):
+        img = _open_rgb(source)
+        img.thumbnail((cell, cell))
+        x = (i % columns) * cell + (cell - img.width) // 2
+        y = (i // columns) * cell + (cell - img.height) // 2
+        sheet.paste(img, (x, y))
+    sheet.save(tmp, quality=85)
+
+
+def _poster(transform: Transform, tmp: str):
+    if not shutil.which('ffmpeg'):
+        raise Unsupported("ffmpeg is not on PATH")
+    result = subprocess.run(
+        ['ffmpeg', '-y', '-loglevel', 'error', '-ss', str(transform.params['at']),
+         '-i', transform.sources[0], '-frames:v', '1', tmp],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0 or not os.path.exists(tmp):
+        raise RuntimeError(result.stderr.strip() or "ffmpeg produced no frame")
+
+
+_TRANSFORMS = {
+    'thumbnail': _thumbnail,
+    'png': _convert,
+    'avif': _convert,
+    'contact_sheet': _contact_sheet,
+    'poster': _poster,
+}
+
+
+def apply_transform(transform: Transform, recorded_digest: Optional[str] = None) -> TransformResult:
+    """Run one transform unless its output is up to date (runs in a worker process)"""
+    try:
+        digest = _digest(transform)
+    except OSError as e:
+        return TransformResult(transform, 'failed', error=str(e))
+
+    if digest == recorded_digest and os.path.exists(transform.output):
+        return TransformResult(transform, 'skipped', digest)
+
+    tmp = _temp_path(transform.output)
+    try:
+        _TRANSFORMS[transform.kind](transform, tmp)
+        os.replace(tmp, transform.output)
+    except Unsupported as e:
+        return TransformResult(transform, 'unsupported', error=str(e))
+    except Exception as e:
+        return TransformResult(transform, 'failed', error=str(e))
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return TransformResult(transform, 'done', digest)
+
+
+def is_derived(path: str) -> bool:
+    """True for files this module produced (including PNG/AVIF conversions of a WebP)"""
+    root, ext = os.path.splitext(path)
+    if ext.lower() != '.webp' and os.path.exists(f"{root}.webp"):
+        return True
+    return os.path.basename(root).endswith(DERIVED_SUFFIXES)
+
+
+class PostProcessor:
+    """Plans transforms for downloaded media and runs them in a process pool"""
+
+    def __init__(self, max_workers: Optional[int] = None, thumb_size: int = THUMB_SIZE,
+                 formats: tuple = ('png', 'avif'), poster_at: float = 0.0):
+        """
+        Args:
+            max_workers: Worker processes (default: all cores)
+            thumb_size: Longest edge of thumbnails in pixels
+            formats: Formats WebP images are converted to ('png', 'avif')
+            poster_at: Seconds into a video to take its poster frame from
+        """
+        self.max_workers = max_workers
+        self.thumb_size = thumb_size
+        self.formats = formats
+        self.poster_at = poster_at
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._state_lock = threading.Lock()
+        self._warned = set()
+
+    def __enter__(self) -> 'PostProcessor':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._state_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def plan(self, files: List[str]) -> List[Transform]:
+        """Transforms for a prompt's downloaded files"""
+        transforms = []
+        for path in files:
+            if is_derived(path):
+                continue
+            root, ext = os.path.splitext(path)
+            ext = ext.lower()
+            if ext in IMAGE_EXTENSIONS:
+                transforms.append(Transform('thumbnail', [path], f"{root}_thumb.jpg",
+                                            {'size': self.thumb_size}))
+                if ext == '.webp':
+                    for fmt in self.formats:
+                        transforms.append(Transform(fmt, [path], f"{root}.{fmt}"))
+            elif ext in VIDEO_EXTENSIONS:
+                transforms.append(Transform('poster', [path], f"{root}_poster.jpg",
+                                            {'at': self.poster_at}))
+        return transforms
+
+    def run(self, transforms: List[Transform]) -> List[TransformResult]:
+        """Run transforms in parallel, skipping up-to-date outputs, and record state"""
+        if not transforms:
+            return []
+        with self._state_lock:
+            recorded = {t.output: self._load_state(os.path.dirname(t.output)).get(os.path.basename(t.output))
+                        for t in transforms}
+        futures = [self.executor.submit(apply_transform, t, recorded[t.output]) for t in transforms]
+        results = [f.result() for f in futures]
+
+        by_dir: Dict[str, Dict[str, str]] = {}
+        for result in results:
+            if result.status == 'done':
+                by_dir.setdefault(os.path.dirname(result.transform.output), {})[
+                    os.path.basename(result.transform.output)] = result.digest
+            elif result.status == 'unsupported' and result.transform.kind not in self._warned:
+                self._warned.add(result.transform.kind)
+                print(f"    ⚠️  Skipping {result.transform.kind}: {result.error}")
+            elif result.status == 'failed':
+                print(f"    ⚠️  {result.transform.kind} failed for "
+                      f"{os.path.basename(result.transform.output)}: {result.error}")
+
+        with self._state_lock:
+            for directory, updates in by_dir.items():
+                state = self._load_state(directory)
+                state.update(updates)
+                self._save_state(directory, state)
+        return results
+
+    def process(self, files: List[str]) -> List[TransformResult]:
+        """Plan and run the per-file transforms for a prompt's media"""
+        return self.run(self.plan(files))
+
+    def plan_contact_sheet(self, images: List[str], output: str) -> Optional[Transform]:
+        """Contact sheet transform for a set of images (None if there are none)"""
+        images = [path for path in images if not is_derived(path)]
+        if not images:
+            return None
+        return Transform('contact_sheet', sorted(images), output,
+                         {'cell': CONTACT_CELL, 'columns': CONTACT_COLUMNS})
+
+    def contact_sheet(self, images: List[str], output: str) -> Optional[TransformResult]:
+        """Build (or keep, if up to date) a contact sheet of the given images"""
+        transform = self.plan_contact_sheet(images, output)
+        return self.run([transform])[0] if transform else None
+
+    @staticmethod
+    def _load_state(directory: str) -> Dict[str, str]:
+        path = os.path.join(directory, STATE_FILENAME)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_state(directory: str, state: Dict[str, str]):
+        path = os.path.join(directory, STATE_FILENAME)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(state, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive thumbnails, conversions and posters from MJ media")
+    parser.add_argument("dirs", nargs="+", help="Directories of downloaded media")
+    parser.add_argument("--contact-sheet", action="store_true", help="Also build a contact sheet per directory")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    with PostProcessor(max_workers=args.workers) as processor:
+        for directory in args.dirs:
+            files = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                           if not name.startswith('.'))
+            results = processor.process(files)
+            if args.contact_sheet:
+                images = [f for f in files if f.lower().endswith(IMAGE_EXTENSIONS)]
+                name = os.path.basename(os.path.normpath(directory))
+                sheet = processor.contact_sheet(images, os.path.join(directory, f"{name}_contact.jpg"))
+                if sheet:
+                    results.append(sheet)
+            counts: Dict[str, int] = {}
+            for result in results:
+                counts[result.status] = counts.get(result.status, 0) + 1
+            print(f"{directory}: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
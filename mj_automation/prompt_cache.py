@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Prompt Result Cache
+
+Opt-in SQLite cache of successful generations keyed on the normalized
+prompt text plus its Midjourney parameters, so prompts already generated
+in earlier batches can be reused without a browser round-trip.
+
+Usage:
+    from prompt_cache import PromptCache
+
+    mj = MidjourneyAutomation(prompt_cache=PromptCache())
+    result = mj.generate("cosmic nebula --ar 16:9 --v 6.1")   # cache='reuse'
+    result = mj.generate("cosmic nebula --ar 16:9 --v 6.1", cache='force')
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.mj_automation/prompt_cache.db")
+
+# Cache modes accepted by MidjourneyAutomation.generate and themes JSON
+CACHE_MODES = ('reuse', 'force', 'off')
+
+# Long-form parameter names mapped to the short form MJ also accepts
+PARAM_ALIASES = {
+    'aspect': 'ar',
+    'version': 'v',
+    'stylize': 's',
+    'chaos': 'c',
+    'quality': 'q',
+}
+
+
+def _normalize_aspect(value: str) -> str:
+    """Reduce an aspect ratio so 32:18 and 16:9 compare equal"""
+    match = re.fullmatch(r'(\d+):(\d+)', value)
+    if not match:
+        return value
+    w, h = int(match.group(1)), int(match.group(2))
+    divisor = math.gcd(w, h) or 1
+    return f"{w // divisor}:{h // divisor}"
+
+
+def _normalize_version(value: str) -> str:
+    """'6' and '6.0' are the same model version"""
+    if value.isdigit():
+        return f"{value}.0"
+    return value
+
+
+def normalize_prompt(prompt: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Split a prompt into normalized text and parameters.
+
+    Text is lowercased with whitespace collapsed; parameters are keyed by
+    their short name with --ar and --v values canonicalized.
+    """
+    parts = re.split(r'\s--(?=[a-zA-Z])', ' ' + prompt.strip())
+    text = re.sub(r'\s+', ' ', parts[0]).strip().strip(',').strip().lower()
+
+    params = {}
+    for part in parts[1:]:
+        tokens = part.split(None, 1)
+        name = PARAM_ALIASES.get(tokens[0].lower(), tokens[0].lower())
+        value = re.sub(r'\s+', ' ', tokens[1]).strip().lower() if len(tokens) > 1 else ''
+        if name == 'ar':
+            value = _normalize_aspect(value)
+        elif name == 'v':
+            value = _normalize_version(value)
+        params[name] = value
+
+    return text, params
+
+
+def prompt_key(prompt: str) -> str:
+    """Stable cache key for a prompt"""
+    text, params = normalize_prompt(prompt)
+    canonical = json.dumps({'text': text, 'params': params}, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class CachedGeneration:
+    """A previously successful generation"""
+    prompt: str
+    job_id: Optional[str]
+    image_urls: List[str]
+    elapsed_seconds: float
+    created_at: str
+    local_files: List[str] = field(default_factory=list)
+    remote_path: Optional[str] = None
+
+
+class PromptCache:
+    """SQLite-backed cache of generation results"""
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+CREATE TABLE IF NOT EXISTS generations (
+    key TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    job_id TEXT,
+    image_urls TEXT NOT NULL,
+    elapsed_seconds REAL,
+    created_at TEXT NOT NULL,
+    local_files TEXT NOT NULL DEFAULT '[]',
+    remote_path TEXT
+)''')
+
+    def get(self, prompt: str) -> Optional[CachedGeneration]:
+        """Look up an earlier successful generation for this prompt"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT prompt, job_id, image_urls, elapsed_seconds, created_at, local_files, remote_path '
+                'FROM generations WHERE key = ?', (prompt_key(prompt),)
+            ).fetchone()
+        if not row:
+            return None
+        return CachedGeneration(
+            prompt=row[0],
+            job_id=row[1],
+            image_urls=json.loads(row[2]),
+            elapsed_seconds=row[3],
+            created_at=row[4],
+            local_files=json.loads(row[5]),
+            remote_path=row[6]
+        )
+
+    def put(self, prompt: str, job_id: Optional[str], image_urls: List[str], elapsed_seconds: float):
+        """Store a successful generation, replacing any earlier one"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO generations '
+                '(key, prompt, job_id, image_urls, elapsed_seconds, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (prompt_key(prompt), prompt, job_id, json.dumps(image_urls), elapsed_seconds,
+                 datetime.now().isoformat())
+            )
+
+    def update_paths(self, prompt: str, local_files: List[str], remote_path: Optional[str]):
+        """Attach where the generated files ended up"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'UPDATE generations SET local_files = ?, remote_path = ? WHERE key = ?',
+                (json.dumps(local_files), remote_path, prompt_key(prompt))
+            )
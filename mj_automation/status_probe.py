@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Incremental DOM Status Probe
+
+Replaces whole-page scraping (document.body.innerText + regexes, and an
+innerHTML search for video URLs) with a probe injected into the page once.
+A MutationObserver queues DOM changes; each poll only inspects nodes that
+changed since the last poll, scoped to the current job's subtree once it is
+known, and returns a small diff against the state the caller already has.
+
+textContent is used instead of innerText so polling never forces layout.
+
+Usage:
+    probe = StatusProbe(mj._run_js_in_chrome)
+    await probe.begin('image')        # before submitting the prompt
+    status = await probe.poll()       # same shape as the old _get_generation_status
+    print(probe.summary())      # probe cost over time
+"""
+
+import json
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Any, Optional
+
+PROBE_VERSION = "1"
+
+# Short payload keys -> legacy status keys
+_IMAGE_FIELDS = {'p': 'progress', 'u': 'imageUrls', 'j': 'jobId', 'e': 'hasError', 'g': 'isGenerating'}
+_VIDEO_FIELDS = {'p': 'progress', 'v': 'videoUrl', 'm': 'vimeoUrl', 'j': 'jobId', 'e': 'hasError',
+                 'g': 'isGenerating', 'h': 'hasVideo', 'd': 'duration'}
+
+PROBE_JS = r'''
+(function() {
+    const VERSION = '__VERSION__';
+    if (window.__mjProbe && window.__mjProbe.version === VERSION) return;
+    if (window.__mjProbe) window.__mjProbe.observer.disconnect();
+
+    const CDN_IMG = /cdn\.midjourney\.com\/([a-f0-9-]{36})\//;
+    const MP4 = /https:\/\/cdn\.midjourney\.com\/video\/[^"'\s]+\.mp4/;
+    const PROGRESS = {image: /(\d+)% Complete/, video: /(\d+)%/};
+    const GENERATING = {image: /Generating/, video: /Generating|Processing|Animating/};
+    const DURATION = /duration\s*([\d.]+)s/i;
+    const MAX_PENDING = 5000;
+
+    const probe = {version: VERSION, pending: [], overflow: false};
+
+    probe.observer = new MutationObserver(records => {
+        if (probe.pending.length + records.length > MAX_PENDING) {
+            probe.pending = [];
+            probe.overflow = true;
+            return;
+        }
+        for (const r of records) probe.pending.push(r);
+    });
+    probe.observer.observe(document.body, {
+        childList: true, subtree: true, characterData: true,
+        attributes: true, attributeFilter: ['src']
+    });
+
+    probe.reset = function(kind, useBaseline, jobId) {
+        this.kind = kind;
+        this.useBaseline = useBaseline;
+        this.baseline = new Set();
+        if (useBaseline) {
+            for (const img of document.querySelectorAll('img[src*="cdn.midjourney"]')) this.baseline.add(img.src);
+            for (const v of document.querySelectorAll('video')) this.baseline.add(v.currentSrc || v.src);
+        }
+        this.root = null;
+        this.jobId = jobId || null;
+        this.seen = new WeakSet();
+        this.candidates = [];
+        this.urls = [];
+        this.progressEl = null;
+        this.generatingEl = null;
+        this.state = {p: null, u: [], j: this.jobId, e: false, g: false, v: null, m: null, d: null, h: false};
+        this.pending = [];
+        // Without a baseline, the first poll inspects the whole page once
+        this.overflow = !useBaseline;
+        this.sent = {};
+        this.seq = 0;
+        this.sentSeq = -1;
+    };
+
+    probe.inScope = function(node) {
+        if (!this.root) return true;
+        if (!this.root.isConnected) { this.root = null; return true; }
+        return this.root.contains(node);
+    };
+
+    probe.widenRoot = function(img) {
+        // Scope = lowest common ancestor of this job's images
+        if (!this.useBaseline) return;
+        if (!this.root || !this.root.isConnected) { this.root = img.parentElement; return; }
+        let node = this.root;
+        while (node && !node.contains(img)) node = node.parentElement;
+        this.root = node || document.body;
+    };
+
+    probe.considerImage = function(img) {
+        if (this.kind !== 'image' || this.seen.has(img)) return;
+        const src = img.src || '';
+        const m = src.match(CDN_IMG);
+        if (!m || this.baseline.has(src)) return;
+        if (this.useBaseline) {
+            if (!this.jobId) { this.jobId = m[1]; this.state.j = m[1]; }
+            else if (m[1] !== this.jobId) return;
+        }
+        this.seen.add(img);
+        this.candidates.push(img);
+        this.widenRoot(img);
+    };
+
+    probe.considerVideo = function(v) {
+        const source = v.querySelector('source');
+        const src = v.currentSrc || v.src || (source && source.src) || '';
+        if (src.includes('midjourney') && !this.baseline.has(src)) this.state.v = src;
+    };
+
+    probe.scanText = function(el) {
+        const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+        for (let t = el.nodeType === 3 ? el : walker.nextNode(); t; t = walker.nextNode()) {
+            const text = t.data;
+            if (!text || text.length > 500) continue;
+            const parent = t.parentElement;
+            if (PROGRESS[this.kind].test(text)) this.progressEl = parent;
+            if (GENERATING[this.kind].test(text)) this.generatingEl = parent;
+            const lower = text.toLowerCase();
+            if (lower.includes('error') && (this.kind === 'video' || lower.includes('generat'))) this.state.e = true;
+            if (this.kind === 'video' && lower.includes('failed')) this.state.e = true;
+            if (this.kind === 'video') {
+                const dm = text.match(DURATION);
+                if (dm) this.state.d = parseFloat(dm[1]);
+            }
+            if (el.nodeType === 3) break;
+        }
+    };
+
+    probe.scanElement = function(el) {
+        if (el.nodeType === 3) {
+            if (el.parentElement && this.inScope(el.parentElement)) this.scanText(el.parentElement);
+            return;
+        }
+        if (el.nodeType !== 1) return;
+        // Job images are matched by job id, so they are picked up wherever
+        // the page inserts them; everything else is scoped to the job root
+        if (this.kind === 'image') {
+            const imgs = el.tagName === 'IMG' ? [el] : el.getElementsByTagName('img');
+            for (const img of imgs) this.considerImage(img);
+        }
+        if (!this.inScope(el)) {
+            // Errors may surface outside the job (e.g. a toast)
+            const lower = (el.textContent || '').toLowerCase();
+            if (lower.length < 500 && lower.includes('error')) this.scanText(el);
+            return;
+        }
+        if (this.kind === 'video') {
+            const vids = el.tagName === 'VIDEO' ? [el] : el.getElementsByTagName('video');
+            for (const v of vids) this.considerVideo(v);
+            const frames = el.tagName === 'IFRAME' ? [el] : el.getElementsByTagName('iframe');
+            for (const f of frames) if (f.src && f.src.includes('vimeo')) this.state.m = f.src;
+            if (!this.state.v) {
+                const m = el.outerHTML.match(MP4);
+                if (m) this.state.v = m[0];
+            }
+        }
+        this.scanText(el);
+    };
+
+    probe.process = function(r) {
+        if (r.type === 'childList') {
+            for (const n of r.addedNodes) this.scanElement(n);
+        } else if (r.type === 'characterData') {
+            this.scanElement(r.target);
+        } else if (r.type === 'attributes') {
+            const el = r.target;
+            if (el.tagName === 'IMG') { this.considerImage(el); return; }
+            if (!this.inScope(el)) return;
+            if (el.tagName === 'VIDEO' && this.kind === 'video') this.considerVideo(el);
+            else if (el.tagName === 'SOURCE' && el.parentElement && this.kind === 'video') this.considerVideo(el.parentElement);
+            else if (el.tagName === 'IFRAME' && (el.src || '').includes('vimeo')) this.state.m = el.src;
+        }
+    };
+
+    probe.refresh = function() {
+        // Re-read only the handful of elements already identified
+        if (this.progressEl) {
+            const m = this.progressEl.isConnected && this.progressEl.textContent.match(PROGRESS[this.kind]);
+            if (m) this.state.p = parseInt(m[1]);
+            else { this.progressEl = null; this.state.p = null; }
+        }
+        if (this.generatingEl && !(this.generatingEl.isConnected &&
+                GENERATING[this.kind].test(this.generatingEl.textContent))) {
+            this.generatingEl = null;
+        }
+        const waiting = [];
+        for (const img of this.candidates) {
+            if (!img.isConnected) continue;
+            if (img.naturalWidth > 50) { if (!this.urls.includes(img.src)) this.urls.push(img.src); }
+            else waiting.push(img);
+        }
+        this.candidates = waiting;
+        this.state.u = this.urls.slice();
+
+        const urlMatch = window.location.href.match(/jobs\/([a-f0-9-]+)/);
+        if (urlMatch && (!this.state.j || this.kind === 'video')) this.state.j = urlMatch[1];
+
+        const p = this.state.p;
+        const inProgress = p !== null && p < 100;
+        if (this.kind === 'image') {
+            this.state.g = inProgress || (this.generatingEl !== null && this.urls.length < 4);
+        } else {
+            this.state.g = inProgress || this.generatingEl !== null;
+            this.state.h = this.state.v !== null || this.state.m !== null || this.state.d !== null;
+        }
+    };
+
+    probe.poll = function(knownSeq) {
+        const t0 = performance.now();
+        if (this.overflow) {
+            this.overflow = false;
+            this.pending = [];
+            this.observer.takeRecords();
+            this.scanElement(this.root || document.body);
+        } else {
+            const records = this.pending.concat(this.observer.takeRecords());
+            this.pending = [];
+            for (const r of records) this.process(r);
+        }
+        this.refresh();
+
+        const full = knownSeq !== this.sentSeq;
+        const diff = {};
+        for (const k in this.state) {
+            const cur = JSON.stringify(this.state[k]);
+            if (full || cur !== this.sent[k]) { diff[k] = this.state[k]; this.sent[k] = cur; }
+        }
+        this.seq += 1;
+        this.sentSeq = this.seq;
+        return JSON.stringify({s: this.seq, f: full ? 1 : 0, d: diff, t: +(performance.now() - t0).toFixed(2)});
+    };
+
+    window.__mjProbe = probe;
+})();
+'''.replace('__VERSION__', PROBE_VERSION)
+
+
+@dataclass
+class ProbeSample:
+    """Cost of one status poll"""
+    at: float  # time.time() when the poll was issued
+    roundtrip_ms: float  # AppleScript + JS round-trip as seen from Python
+    page_ms: float  # Time spent inside the page
+    payload_bytes: int
+
+
+class StatusProbe:
+    """Python side of the injected status probe"""
+
+    def __init__(self, run_js: Callable[[str], Awaitable[str]], max_samples: int = 10000):
+        """
+        Args:
+            run_js: Coroutine function that executes JavaScript in the target
+                    tab and returns the result
+            max_samples: Number of recent poll samples kept for instrumentation
+        """
+        self.run_js = run_js
+        self.samples: deque = deque(maxlen=max_samples)
+        self.kind = 'image'
+        self._seq = -1
+        self._state: Dict[str, Any] = {}
+        self._active = False
+
+    def begin_script(self, kind: str, baseline: bool = True, job_id: Optional[str] = None,
+                     install: bool = False) -> str:
+        """
+        JS that starts tracking a new job.
+
+        Without install, the script returns {missing: 1} if the probe isn't
+        in the page yet, so the full probe source is only sent when needed.
+        """
+        if kind not in ('image', 'video'):
+            raise ValueError(f"kind must be 'image' or 'video', got {kind!r}")
+        self.kind = kind
+        self._seq = -1
+        self._state = {}
+        self._active = True
+        reset = f'''
+(function() {{
+    const p = window.__mjProbe;
+    if (!p || p.version !== '{PROBE_VERSION}') return JSON.stringify({{missing: 1}});
+    p.reset({json.dumps(kind)}, {json.dumps(baseline)}, {json.dumps(job_id)});
+    return JSON.stringify({{ok: 1}});
+}})();
+'''
+        return PROBE_JS + reset if install else reset
+
+    def poll_script(self) -> str:
+        """JS for one incremental poll"""
+        return f'''
+(function() {{
+    const p = window.__mjProbe;
+    if (!p || p.version !== '{PROBE_VERSION}' || !p.kind) return JSON.stringify({{missing: 1}});
+    return p.poll({self._seq});
+}})();
+'''
+
+    def apply(self, raw: str, started_at: float, roundtrip_ms: float) -> Optional[Dict[str, Any]]:
+        """
+        Merge a poll payload into the tracked state.
+
+        Returns:
+            Status dict in the legacy shape, or None if the probe is missing
+            from the page (navigation/reload) and must be reinstalled
+        """
+        try:
+            payload = json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            return self.status()
+
+        if payload.get('missing'):
+            return None
+
+        if payload.get('f'):
+            self._state = {}
+        self._state.update(payload.get('d', {}))
+        self._seq = payload.get('s', -1)
+        self.samples.append(ProbeSample(
+            at=started_at,
+            roundtrip_ms=roundtrip_ms,
+            page_ms=payload.get('t', 0.0),
+            payload_bytes=len(raw)
+        ))
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        """Current state in the shape of the legacy status dicts"""
+        fields = _IMAGE_FIELDS if self.kind == 'image' else _VIDEO_FIELDS
+        status = {legacy: self._state.get(short) for short, legacy in fields.items()}
+        if self.kind == 'image':
+            status['imageUrls'] = status['imageUrls'] or []
+            status['imageCount'] = len(status['imageUrls'])
+        for key in ('hasError', 'isGenerating', 'hasVideo'):
+            if key in status:
+                status[key] = bool(status[key])
+        return status
+
+    async def begin(self, kind: str, baseline: bool = True, job_id: Optional[str] = None):
+        """Start tracking a new job, injecting the probe if the page lacks it"""
+        result = await self.run_js(self.begin_script(kind, baseline, job_id))
+        if '"ok"' not in result:
+            await self.run_js(self.begin_script(kind, baseline, job_id, install=True))
+
+    async def poll(self) -> Dict[str, Any]:
+        """Poll the page once and return the merged status"""
+        if not self._active:
+            # Nothing to diff against - track whatever is on the page
+            await self.begin(self.kind, baseline=False)
+
+        for _ in range(2):
+            started = time.time()
+            raw = await self.run_js(self.poll_script())
+            status = self.apply(raw, started, (time.time() - started) * 1000)
+            if status is not None:
+                return status
+            # Page was reloaded; reinstall, keeping the job we already know about
+            await self.begin(self.kind, baseline=False, job_id=self._state.get('j'))
+
+        return self.status()
+
+    def summary(self) -> Dict[str, float]:
+        """Aggregate probe cost over the recorded samples"""
+        if not self.samples:
+            return {'polls': 0}
+        roundtrips = sorted(s.roundtrip_ms for s in self.samples)
+        return {
+            'polls': len(roundtrips),
+            'roundtrip_ms_mean': statistics.fmean(roundtrips),
+            'roundtrip_ms_p95': roundtrips[min(len(roundtrips) - 1, int(len(roundtrips) * 0.95))],
+            'page_ms_mean': statistics.fmean(s.page_ms for s in self.samples),
+            'payload_bytes_mean': statistics.fmean(s.payload_bytes for s in self.samples),
+            'total_probe_seconds': sum(roundtrips) / 1000,
+        }
+
+    def describe(self) -> str:
+        """One-line probe cost summary"""
+        summary = self.summary()
+        if not summary['polls']:
+            return "no polls"
+        return (f"{summary['polls']} polls, {summary['roundtrip_ms_mean']:.0f}ms mean / "
+                f"{summary['roundtrip_ms_p95']:.0f}ms p95 round-trip, "
+                f"{summary['page_ms_mean']:.1f}ms in page, {summary['payload_bytes_mean']:.0f}B payload")
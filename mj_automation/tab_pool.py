@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Midjourney Tab Pool
+
+Drives N Chrome tabs in parallel, each with its own worker thread and its
+own MidjourneyAutomation bound to that tab by id. Jobs are queued and the
+next free tab picks up the next job, so image generation, detail-view
+navigation and animate flows overlap across tabs.
+
+Usage:
+    from tab_pool import TabPool
+
+    with TabPool(size=3) as pool:
+        futures = [pool.submit(lambda mj, p: mj.generate(p, navigate=False), p) for p in prompts]
+        results = [f.result() for f in futures]
+        print(pool.report())
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, List, Any, Optional
+
+from mj_web_automation import MidjourneyAutomation, open_chrome_tab, close_chrome_tab
+
+
+@dataclass
+class TabStats:
+    """Throughput counters for one tab"""
+    tab_id: int
+    jobs_completed: int = 0
+    jobs_failed: int = 0
+    busy_seconds: float = 0.0
+    started_at: float = 0.0
+    stopped_at: Optional[float] = None
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self.stopped_at or time.time()) - self.started_at
+
+    @property
+    def jobs_per_hour(self) -> float:
+        wall = self.wall_seconds
+        return self.jobs_completed / wall * 3600 if wall > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        wall = self.wall_seconds
+        return self.busy_seconds / wall if wall > 0 else 0.0
+
+
+class TabPool:
+    """Pool of Chrome tabs, each driven by its own worker"""
+
+    def __init__(self, size: int, window_id: Optional[int] = None, **automation_kwargs):
+        """
+        Args:
+            size: Number of tabs (and workers)
+            window_id: Window to open tabs in; None opens a new window
+            **automation_kwargs: Passed to each tab's MidjourneyAutomation
+        """
+        if size < 1:
+            raise ValueError("TabPool size must be at least 1")
+        self.size = size
+        self.window_id = window_id
+        self.automation_kwargs = automation_kwargs
+        self.automations: List[MidjourneyAutomation] = []
+        self.stats: List[TabStats] = []
+        self._jobs: queue.Queue = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._opened_tabs: List[tuple] = []
+
+    def start(self) -> 'TabPool':
+        """Open the tabs, load the imagine page in each and start workers"""
+        window_id = self.window_id
+        for _ in range(self.size):
+            window_id, tab_id = open_chrome_tab(window_id=window_id)
+            self._opened_tabs.append((window_id, tab_id))
+            mj = MidjourneyAutomation(window_id=window_id, tab_id=tab_id, **self.automation_kwargs)
+            self.automations.append(mj)
+            self.stats.append(TabStats(tab_id=tab_id))
+
+        # Confirm every tab reached the imagine page before taking jobs
+        for mj in self.automations:
+            if not mj._navigate_to_imagine():
+                print(f"  Warning: tab {mj.tab_id} did not reach the imagine page")
+
+        now = time.time()
+        for mj, stats in zip(self.automations, self.stats):
+            stats.started_at = now
+            worker = threading.Thread(target=self._worker, args=(mj, stats),
+                                      name=f"mj-tab-{mj.tab_id}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        print(f"Tab pool ready: {self.size} tabs")
+        return self
+
+    def _worker(self, mj: MidjourneyAutomation, stats: TabStats):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = time.time()
+            try:
+                result = fn(mj, *args)
+            except Exception as e:
+                stats.jobs_failed += 1
+                future.set_exception(e)
+            else:
+                if getattr(result, 'success', True) is False:
+                    stats.jobs_failed += 1
+                else:
+                    stats.jobs_completed += 1
+                future.set_result(result)
+            finally:
+                stats.busy_seconds += time.time() - started
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        """
+        Queue a job. fn is called as fn(mj, *args) on the next free tab,
+        where mj is that tab's MidjourneyAutomation.
+        """
+        if not self._workers:
+            raise RuntimeError("TabPool not started")
+        future = Future()
+        self._jobs.put((future, fn, args))
+        return future
+
+    def map(self, fn: Callable[..., Any], items: List[Any]) -> List[Any]:
+        """Run fn(mj, item) for every item and return results in order"""
+        return [f.result() for f in [self.submit(fn, item) for item in items]]
+
+    def close(self, close_tabs: bool = True):
+        """Stop workers after queued jobs finish, then close the tabs"""
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        now = time.time()
+        for stats in self.stats:
+            stats.stopped_at = stats.stopped_at or now
+        if close_tabs:
+            for window_id, tab_id in self._opened_tabs:
+                close_chrome_tab(window_id, tab_id)
+            self._opened_tabs = []
+
+    def report(self) -> str:
+        """Per-tab throughput summary"""
+        lines = ["Tab throughput:"]
+        for mj, stats in zip(self.automations, self.stats):
+            lines.append(
+                f"  Tab {stats.tab_id}: {stats.jobs_completed} ok, {stats.jobs_failed} failed, "
+                f"{stats.jobs_per_hour:.1f} jobs/h, {stats.utilization * 100:.0f}% busy"
+            )
+            lines.append(f"    Status probe: {mj.probe.describe()}")
+        total = sum(s.jobs_completed for s in self.stats)
+        lines.append(f"  Total: {total} jobs, {sum(s.jobs_per_hour for s in self.stats):.1f} jobs/h")
+        return "\n".join(lines)
+
+    def __enter__(self) -> 'TabPool':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
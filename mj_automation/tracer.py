@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Pipeline Tracer
+
+Records timed spans for each stage of a generation (navigate, prompt entry,
+Midjourney queueing, rendering, download, rsync) so batch wall-clock time
+can be broken down. Spans are tagged with the current job and thread, and
+can be exported as Chrome trace JSON (chrome://tracing or ui.perfetto.dev).
+
+Usage:
+    from tracer import Tracer
+
+    tracer = Tracer()
+    mj = MidjourneyAutomation(tracer=tracer)
+    with tracer.job("cosmic_dawn_img_0"):
+        mj.generate("cosmic nebula --ar 16:9")
+    tracer.export("trace.json")
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+# Job the current thread/task is working on; spans inherit it
+_current_job: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('mj_trace_job', default=None)
+
+# Trace lane for concurrent asyncio tasks that share one thread
+_current_lane: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('mj_trace_lane', default=None)
+
+
+@dataclass
+class Span:
+    """One timed stage"""
+    name: str
+    start: float
+    end: float
+    job: Optional[str] = None
+    thread: str = ''
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact form stored in the batch manifest"""
+        entry = {'name': self.name, 'start': round(self.start, 3), 'seconds': round(self.seconds, 3)}
+        if self.attrs:
+            entry['attrs'] = self.attrs
+        return entry
+
+
+class Tracer:
+    """Thread-safe collector of spans"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+
+    @contextmanager
+    def job(self, job: str, lane: Optional[str] = None) -> Iterator[None]:
+        """
+        Tag spans recorded inside this block with a job (prompt) id.
+
+        Spans are laid out per thread in the trace; pass lane to give
+        concurrent asyncio tasks on one thread lanes of their own.
+        """
+        token = _current_job.set(job)
+        lane_token = _current_lane.set(lane) if lane else None
+        try:
+            yield
+        finally:
+            if lane_token:
+                _current_lane.reset(lane_token)
+            _current_job.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block. Yields the span's attrs dict so the block can attach
+        results (e.g. bytes transferred) before the span closes.
+        """
+        start = time.time()
+        try:
+            yield attrs
+        finally:
+            self.add(Span(name=name, start=start, end=time.time(), job=_current_job.get(),
+                          thread=_current_lane.get() or threading.current_thread().name, attrs=attrs))
+
+    def add(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, job: Optional[str] = None) -> List[Span]:
+        """Recorded spans in start order, optionally for one job"""
+        with self._lock:
+            spans = [s for s in self._spans if job is None or s.job == job]
+        return sorted(spans, key=lambda s: s.start)
+
+    def totals(self) -> Dict[str, float]:
+        """Total seconds per span name across all jobs"""
+        totals: Dict[str, float] = {}
+        for span in self.spans():
+            totals[span.name] = totals.get(span.name, 0.0) + span.seconds
+        return totals
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace event format: one lane per thread, complete ('X') events"""
+        spans = self.spans()
+        threads: Dict[str, int] = {}
+        events = []
+        for span in spans:
+            tid = threads.setdefault(span.thread, len(threads) + 1)
+            args = dict(span.attrs)
+            if span.job:
+                args['job'] = span.job
+            events.append({
+                'name': span.name,
+                'cat': span.job or 'mj',
+                'ph': 'X',
+                'ts': round(span.start * 1e6),
+                'dur': round(span.seconds * 1e6),
+                'pid': 1,
+                'tid': tid,
+                'args': args
+            })
+        for thread, tid in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+                           'args': {'name': thread}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path: str):
+        """Write the Chrome trace JSON file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def describe(self) -> str:
+        """Where the time went, largest first"""
+        totals = self.totals()
+        if not totals:
+            return "no spans"
+        return ", ".join(f"{name} {seconds:.1f}s"
+                         for name, seconds in sorted(totals.items(), key=lambda kv: -kv[1]))
+
+
+def traced(name: str):
+    """
+    Method decorator: time each call as a span on self.tracer, noting the
+    result's success flag when it has one. Works on plain and async methods.
+    """
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                with self.tracer.span(name) as attrs:
+                    result = await method(self, *args, **kwargs)
+                    if hasattr(result, 'success'):
+                        attrs['success'] = result.success
+                    return result
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name) as attrs:
+                result = method(self, *args, **kwargs)
+                if hasattr(result, 'success'):
+                    attrs['success'] = result.success
+                return result
+        return wrapper
+    return decorator
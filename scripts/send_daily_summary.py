@@ -2,6 +2,9 @@
 """
 Daily Summary Email - Executed by launchd at 8am
 ARTHUR Project - Automated daily reporting via Postmark
+
+Other nodes run with --publish-only (and ARTHUR_NODE_ID set); AIR runs with
+--fleet to send one report covering all of them.
 """
 
 import os
@@ -15,12 +18,21 @@ PROJECT_ROOT = "/Users/arthurdell/ARTHUR"
 sys.path.insert(0, PROJECT_ROOT)
 
 from arthur.notifications.daily_summary import (
+    NODE_ID,
     generate_daily_summary,
     format_email_body,
     format_email_subject
 )
-from arthur.notifications.postmark import PostmarkNotifier
-from arthur.config import POSTMARK
+from arthur.notifications.postmark import EmailMessage, PostmarkNotifier
+from arthur.notifications.outbox import Outbox, OutboxWorker
+from arthur.notifications.fleet import (
+    collect_fleet,
+    format_fleet_body,
+    format_fleet_subject,
+    publish_summary
+)
+from arthur.notifications.summary_history import SummaryHistory, format_history_report
+from arthur.config import FLEET, OUTBOX, POSTMARK
 
 # Configure logging
 logging.basicConfig(
@@ -39,18 +51,34 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Preview without sending")
     parser.add_argument("--test", action="store_true", help="Send test email immediately")
     parser.add_argument("--to", type=str, default=POSTMARK.default_recipient,
-                        help=f"Recipient email (default: {POSTMARK.default_recipient})")
+                        help=f"Recipient email, or several separated by commas (default: {POSTMARK.default_recipient})")
     parser.add_argument("--hours", type=int, default=24,
                         help="Lookback period in hours (default: 24)")
     parser.add_argument("--no-infra", action="store_true",
                         help="Skip infrastructure health checks")
+    parser.add_argument("--refresh-infra", action="store_true",
+                        help="Probe hosts even if cached results are still fresh")
+    parser.add_argument("--history", type=int, nargs="?", const=14, metavar="DAYS",
+                        help="Print recorded summaries and week-over-week trends (default: 14 days) and exit")
+    parser.add_argument("--no-record", action="store_true",
+                        help="Don't store this summary in the history database")
+    parser.add_argument("--publish-only", action="store_true",
+                        help="Publish this node's summary for the fleet report without emailing")
+    parser.add_argument("--fleet", action="store_true",
+                        help="Send one report aggregating every node's published summary")
     args = parser.parse_args()
 
+    history = SummaryHistory()
+    if args.history:
+        # Served from stored summaries only: nothing is collected or rescanned
+        print(format_history_report(history, NODE_ID, days=args.history, lookback_hours=args.hours))
+        return
+
     logger.info(f"ARTHUR Daily Summary - {datetime.now().strftime('%Y-%m-%d %H:%M')}")
 
     # Check for API token
     server_token = os.getenv("POSTMARK_SERVER_TOKEN", "") or POSTMARK.server_token
-    if not server_token and not args.dry_run:
+    if not server_token and not args.dry_run and not args.publish_only:
         logger.error("POSTMARK_SERVER_TOKEN environment variable not set")
         print("\nTo set the token:")
         print("  export POSTMARK_SERVER_TOKEN='your-token-here'")
@@ -60,11 +88,31 @@ def main():
     logger.info(f"Generating summary for last {args.hours} hours...")
     summary = generate_daily_summary(
         lookback_hours=args.hours,
-        check_infrastructure=not args.no_infra
+        check_infrastructure=not args.no_infra,
+        refresh_infrastructure=args.refresh_infra
     )
 
-    subject = format_email_subject(summary)
-    body = format_email_body(summary)
+    # A preview isn't a measurement: it would skew the trends
+    if not args.no_record and not args.dry_run:
+        history.record(summary, lookback_hours=args.hours)
+    # The aggregator takes whatever is published as this node's daily summary
+    if args.hours == 24 and not args.dry_run:
+        path = publish_summary(summary, FLEET.publish_path)
+        logger.info(f"Summary published to {path}")
+    if args.publish_only:
+        return
+
+    if args.fleet:
+        logger.info(f"Collecting summaries from {len(FLEET.nodes)} nodes...")
+        reports = collect_fleet(FLEET.nodes, deadline=FLEET.deadline_seconds,
+                                stale_after_hours=FLEET.stale_after_hours,
+                                remote_path=FLEET.remote_path, local=summary)
+        subject = format_fleet_subject(reports, summary.date)
+        body = format_fleet_body(reports, summary.date)
+    else:
+        trends = history.trends(NODE_ID, summary.date.date(), lookback_hours=args.hours)
+        subject = format_email_subject(summary)
+        body = format_email_body(summary, trends=trends)
 
     print(f"\n{'='*60}")
     print(f"Subject: {subject}")
@@ -79,22 +127,67 @@ def main():
         print("Use --test to send a real email")
         return
 
-    # Send email
-    notifier = PostmarkNotifier(server_token=server_token)
-    result = notifier.send_daily_summary(
-        to=args.to,
-        subject=subject,
-        body=body,
-        from_addr=POSTMARK.default_sender
-    )
+    # Queue the email, then deliver what is due. Anything Postmark doesn't
+    # take now stays queued and is retried by the outbox worker (or the next run)
+    outbox = Outbox(OUTBOX.db_path)
+    recipients = [r.strip() for r in args.to.split(",") if r.strip()]
+    queued = []
+    for recipient in recipients:
+        # The same report is never emailed twice, e.g. when launchd reruns the job
+        key = None if args.test else (
+            f"daily-summary:{summary.node_id}:{'fleet' if args.fleet else 'node'}:"
+            f"{summary.date.strftime('%Y-%m-%d')}:{args.hours}:{recipient}"
+        )
+        message_id = outbox.enqueue(EmailMessage(to=recipient, subject=subject, body=body,
+                                                 from_addr=POSTMARK.default_sender, tag="daily-summary"),
+                                    key=key)
+        if message_id is not None:
+            queued.append(message_id)
+            continue
+        existing = outbox.get_by_key(key)
+        if existing["status"] == "sent":
+            logger.info(f"Already sent to {recipient} today: {key}")
+            print(f"Already sent to {recipient} today (use --test to send again)")
+        else:
+            # Still queued from an earlier run: deliver it now if it is due
+            logger.info(f"Already in the outbox for {recipient} ({existing['status']}): {key}")
+            print(f"Already queued for {recipient} ({existing['status']}, "
+                  f"{existing['attempts']} attempts so far)")
+            queued.append(existing["id"])
+    if not queued:
+        return
 
-    if result.success:
-        logger.info(f"Email sent successfully! Message ID: {result.message_id}")
-        print(f"Email sent to {args.to}")
-        print(f"Message ID: {result.message_id}")
-    else:
-        logger.error(f"Failed to send email: {result.error}")
-        print(f"ERROR: {result.error}")
+    notifier = PostmarkNotifier(
+        server_token=server_token,
+        base_url=POSTMARK.api_base_url,
+        connect_timeout=POSTMARK.connect_timeout,
+        read_timeout=POSTMARK.read_timeout,
+        max_retries=POSTMARK.max_retries
+    )
+    worker = OutboxWorker(outbox, notifier, max_attempts=OUTBOX.max_attempts,
+                          digest_window=OUTBOX.digest_window_seconds,
+                          backoff_base=OUTBOX.backoff_base_seconds,
+                          backoff_max=OUTBOX.backoff_max_seconds)
+    worker.drain(timeout=OUTBOX.drain_seconds)
+    notifier.close()
+
+    failed = False
+    for message_id in queued:
+        entry = outbox.get(message_id)
+        if entry["status"] == "sent":
+            logger.info(f"Email sent successfully to {entry['recipient']}! Message ID: {entry['message_id']}")
+            print(f"Email sent to {entry['recipient']}")
+            print(f"Message ID: {entry['message_id']}")
+        elif entry["status"] == "failed":
+            logger.error(f"Failed to send email to {entry['recipient']}: {entry['last_error']}")
+            print(f"ERROR ({entry['recipient']}): {entry['last_error']}")
+            failed = True
+        else:
+            logger.warning(f"Email to {entry['recipient']} not delivered yet ({entry['last_error']}); "
+                           f"left in the outbox for retry")
+            print(f"Queued for retry ({entry['recipient']}): {entry['last_error']}")
+    outbox.close()
+    if failed:
         sys.exit(1)
 
 
@@ -10,6 +10,7 @@ Usage:
 
     ts = TailscaleAdmin()
     ts.enable_ssh_for_machine("beta")
+    ts.enable_ssh_for_machines(["alpha", "beta", "gamma"])  # one page session
 """
 
 import subprocess
@@ -17,8 +18,50 @@ import json
 import time
 import os
 import tempfile
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable
 from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+
+# True once _navigate's target has replaced the document it was called on
+NEW_DOCUMENT_JS = "!window.__tsNav"
+
+# Finds the SSH toggle on a machine page: {el, via} or null
+FIND_SSH_TOGGLE_JS = '''
+function findSshToggle() {
+    const selectors = [
+        'input[type="checkbox"][name*="ssh"]',
+        'input[type="checkbox"][id*="ssh"]',
+        '[role="switch"][aria-label*="SSH"]',
+        'label:has-text("SSH") input[type="checkbox"]',
+        '[class*="Toggle"][class*="ssh"]'
+    ];
+    for (const sel of selectors) {
+        try {
+            const el = document.querySelector(sel);
+            if (el) return {el: el, via: sel};
+        } catch(e) {}
+    }
+
+    // Look for text "SSH" near a toggle
+    const labels = document.querySelectorAll('label, span, div');
+    for (const label of labels) {
+        if (label.textContent.toLowerCase().includes('ssh') &&
+            !label.textContent.toLowerCase().includes('keys')) {
+            const parent = label.closest('div[class*="row"], div[class*="setting"], tr');
+            if (parent) {
+                const toggle = parent.querySelector('input[type="checkbox"], [role="switch"], button[class*="toggle"]');
+                if (toggle) return {el: toggle, via: 'near_ssh_label'};
+            }
+        }
+    }
+    return null;
+}
+
+function isOn(el) {
+    return el.checked === true || el.getAttribute('aria-checked') === 'true';
+}
+'''
 
 
 @dataclass
@@ -38,9 +81,12 @@ class TailscaleAdmin:
     MACHINE_URL = "https://login.tailscale.com/admin/machines/{machine_id}"
     ACL_URL = "https://login.tailscale.com/admin/acls"
 
-    def __init__(self, poll_interval: int = 2, max_wait: int = 30):
+    def __init__(self, poll_interval: int = 2, max_wait: int = 30,
+                 step_timeout: float = 10.0, condition_interval: float = 0.25):
         self.poll_interval = poll_interval
         self.max_wait = max_wait
+        self.step_timeout = step_timeout  # per wait for an in-page condition
+        self.condition_interval = condition_interval
 
     def _run_applescript(self, script: str) -> str:
         """Execute AppleScript and return result"""
@@ -72,41 +118,72 @@ end tell
         return result
 
     def _navigate(self, url: str) -> bool:
-        """Navigate Chrome to URL"""
+        """
+        Navigate Chrome to URL.
+
+        The current document is marked first: conditions that include
+        NEW_DOCUMENT_JS then can't pass on it while it is being replaced
+        (e.g. when the tab is already showing url).
+        """
+        self._run_js_in_chrome("(function() { window.__tsNav = 1; return 'true'; })();")
         script = f'''
 tell application "Google Chrome"
     activate
     set URL of active tab of front window to "{url}"
 end tell
-delay 2
 '''
         self._run_applescript(script)
         return True
 
-    def _wait_for_page_load(self, timeout: int = 10) -> bool:
-        """Wait for page to finish loading"""
-        js = '''
-(function() {
-    return document.readyState === 'complete';
-})();
+    def _wait_for(self, condition_js: str, timeout: Optional[float] = None,
+                  prelude: str = '') -> Any:
+        """
+        Poll a JS expression until it is truthy.
+
+        Returns its (JSON-decoded) value, or None on timeout. prelude is
+        JS defining helpers the expression uses.
+        """
+        js = f'''
+(function() {{
+    {prelude}
+    try {{
+        return JSON.stringify(({condition_js}) || null);
+    }} catch(e) {{
+        return 'null';
+    }}
+}})();
 '''
-        start = time.time()
-        while time.time() - start < timeout:
-            result = self._run_js_in_chrome(js)
-            if 'true' in result.lower():
-                return True
-            time.sleep(0.5)
-        return False
+        deadline = time.time() + (timeout if timeout is not None else self.step_timeout)
+        while True:
+            try:
+                value = json.loads(self._run_js_in_chrome(js))
+            except ValueError:
+                value = None
+            if value:
+                return value
+            if time.time() >= deadline:
+                return None
+            time.sleep(self.condition_interval)
 
     def navigate_to_machines(self) -> bool:
-        """Navigate to machines list"""
+        """Navigate to machines list and wait for its rows"""
         self._navigate(self.ADMIN_URL)
-        return self._wait_for_page_load()
+        path = urlsplit(self.ADMIN_URL).path
+        return self._wait_for(
+            f"{NEW_DOCUMENT_JS} && location.pathname.replace(/\\/$/, '') === {json.dumps(path)} && "
+            "document.readyState === 'complete' && "
+            "document.querySelectorAll('a[href*=\"/machines/\"]').length > 0",
+            timeout=self.max_wait
+        ) is not None
 
     def navigate_to_acls(self) -> bool:
         """Navigate to ACL editor"""
         self._navigate(self.ACL_URL)
-        return self._wait_for_page_load()
+        return self._wait_for(
+            f"{NEW_DOCUMENT_JS} && location.pathname === {json.dumps(urlsplit(self.ACL_URL).path)} && "
+            "document.readyState === 'complete'",
+            timeout=self.max_wait
+        ) is not None
 
     def get_machines_list(self) -> List[Dict[str, Any]]:
         """Get list of machines from admin console"""
@@ -139,42 +216,6 @@ delay 2
         except:
             return []
 
-    def find_machine_element(self, machine_name: str) -> bool:
-        """Find and click on a machine by name"""
-        js = f'''
-(function() {{
-    const name = {json.dumps(machine_name.lower())};
-
-    // Find all links/elements containing machine name
-    const links = document.querySelectorAll('a[href*="/machines/"]');
-
-    for (const link of links) {{
-        if (link.textContent.toLowerCase().includes(name)) {{
-            link.click();
-            return JSON.stringify({{success: true, found: link.textContent}});
-        }}
-    }}
-
-    // Try table rows
-    const rows = document.querySelectorAll('tr, div[class*="row"]');
-    for (const row of rows) {{
-        if (row.textContent.toLowerCase().includes(name)) {{
-            const clickable = row.querySelector('a, button') || row;
-            clickable.click();
-            return JSON.stringify({{success: true, found: row.textContent.substring(0, 50)}});
-        }}
-    }}
-
-    return JSON.stringify({{success: false, error: 'Machine not found'}});
-}})();
-'''
-        result = self._run_js_in_chrome(js)
-        try:
-            data = json.loads(result)
-            return data.get('success', False)
-        except:
-            return False
-
     def click_machine_menu(self) -> bool:
         """Click the machine settings/menu button"""
         js = '''
@@ -222,48 +263,18 @@ delay 2
         """Find and enable SSH toggle"""
         js = '''
 (function() {
-    // Look for SSH toggle/checkbox
-    const selectors = [
-        'input[type="checkbox"][name*="ssh"]',
-        'input[type="checkbox"][id*="ssh"]',
-        '[role="switch"][aria-label*="SSH"]',
-        'label:has-text("SSH") input[type="checkbox"]',
-        '[class*="Toggle"][class*="ssh"]'
-    ];
-
-    // First try specific selectors
-    for (const sel of selectors) {
-        try {
-            const el = document.querySelector(sel);
-            if (el) {
-                if (!el.checked) {
-                    el.click();
-                    return JSON.stringify({success: true, action: 'enabled', selector: sel});
-                } else {
-                    return JSON.stringify({success: true, action: 'already_enabled', selector: sel});
-                }
-            }
-        } catch(e) {}
+    ''' + FIND_SSH_TOGGLE_JS + '''
+    const found = findSshToggle();
+    if (!found) {
+        return JSON.stringify({success: false, error: 'SSH toggle not found'});
     }
-
-    // Look for text "SSH" near a toggle
-    const labels = document.querySelectorAll('label, span, div');
-    for (const label of labels) {
-        if (label.textContent.toLowerCase().includes('ssh') &&
-            !label.textContent.toLowerCase().includes('keys')) {
-            // Find nearby toggle
-            const parent = label.closest('div[class*="row"], div[class*="setting"], tr');
-            if (parent) {
-                const toggle = parent.querySelector('input[type="checkbox"], [role="switch"], button[class*="toggle"]');
-                if (toggle) {
-                    toggle.click();
-                    return JSON.stringify({success: true, action: 'clicked_near_ssh_label'});
-                }
-            }
-        }
+    // Toggles found next to an "SSH" label too: clicking one that is
+    // already on would turn SSH off
+    if (isOn(found.el)) {
+        return JSON.stringify({success: true, action: 'already_enabled', selector: found.via});
     }
-
-    return JSON.stringify({success: false, error: 'SSH toggle not found'});
+    found.el.click();
+    return JSON.stringify({success: true, action: 'enabled', selector: found.via});
 })();
 '''
         result = self._run_js_in_chrome(js)
@@ -313,6 +324,143 @@ delay 2
         except:
             return False
 
+    def get_machine_links(self) -> List[Dict[str, str]]:
+        """Links to machine pages on the machines list: [{name, href}]"""
+        js = '''
+(function() {
+    const links = [];
+    document.querySelectorAll('a[href*="/machines/"]').forEach(a => {
+        const name = a.textContent.trim();
+        if (name) links.push({name: name, href: a.getAttribute('href')});
+    });
+    return JSON.stringify(links);
+})();
+'''
+        try:
+            return json.loads(self._run_js_in_chrome(js))
+        except:
+            return []
+
+    def _open_machine(self, href: str) -> bool:
+        """Click a machine's link (client-side navigation) and wait for its page"""
+        path = urlsplit(href).path
+        clicked = self._run_js_in_chrome(f'''
+(function() {{
+    const href = {json.dumps(href)};
+    const link = Array.from(document.querySelectorAll('a[href*="/machines/"]'))
+        .find(a => a.getAttribute('href') === href);
+    if (!link) return 'false';
+    link.click();
+    return 'true';
+}})();
+''')
+        if 'true' not in clicked:
+            return False
+        return self._wait_for(
+            f"location.pathname === {json.dumps(path)} && document.readyState === 'complete' && "
+            "document.querySelectorAll('button').length > 0"
+        ) is not None
+
+    def _return_to_machines(self) -> bool:
+        """Back to the machines list without reloading it, if the page allows"""
+        path = urlsplit(self.ADMIN_URL).path
+        on_list = (f"location.pathname.replace(/\\/$/, '') === {json.dumps(path)} && "
+                   "document.querySelectorAll('a[href*=\"/machines/\"]').length > 0")
+        if self._wait_for(on_list, timeout=0) is not None:
+            return True
+        self._run_js_in_chrome("(function() { history.back(); return 'true'; })();")
+        if self._wait_for(on_list) is not None:
+            return True
+        return self.navigate_to_machines()
+
+    def run_bulk_action(self, machine_names: List[str],
+                        action: Callable[[str], Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run an action on the page of each machine, in one admin console session.
+
+        The machines list is loaded once; each machine is opened from it
+        and the list is returned to with history navigation. action is
+        called with the machine name once its page is open and returns a
+        dict with at least 'success'.
+
+        Returns one result per machine, in order: machine, success, error,
+        seconds and the steps taken.
+        """
+        print(f"Navigating to machines list...")
+        listed = self.navigate_to_machines()
+        links = self.get_machine_links() if listed else []
+
+        results = []
+        for name in machine_names:
+            started = time.time()
+            result = {'machine': name, 'steps': [{'navigate': listed}]}
+            results.append(result)
+
+            link = next((l for l in links if name.lower() in l['name'].lower()), None)
+            print(f"Finding machine: {name}")
+            result['steps'].append({'find_machine': link is not None})
+            if link is None:
+                result['success'] = False
+                result['error'] = (f'Could not find machine: {name}' if listed
+                                   else 'Machines list did not load')
+                result['seconds'] = round(time.time() - started, 1)
+                continue
+
+            opened = self._open_machine(link['href'])
+            result['steps'].append({'open_machine': opened})
+            if opened:
+                try:
+                    outcome = action(name)
+                except Exception as e:
+                    outcome = {'success': False, 'error': str(e)}
+                result['steps'].append({'action': outcome})
+                result['success'] = bool(outcome.get('success'))
+                if not result['success']:
+                    result['error'] = outcome.get('error', 'Action failed')
+            else:
+                result['success'] = False
+                result['error'] = f'Machine page did not load: {name}'
+
+            # Back to the list for the next machine (reloaded only if needed)
+            if name != machine_names[-1] and not self._return_to_machines():
+                listed = False
+                links = []
+            result['seconds'] = round(time.time() - started, 1)
+
+        return results
+
+    def _enable_ssh_on_page(self, machine_name: str) -> Dict[str, Any]:
+        """Enable SSH on the open machine page and wait until it shows as on"""
+        print(f"Enabling SSH for {machine_name}...")
+        if self._wait_for('findSshToggle() !== null', prelude=FIND_SSH_TOGGLE_JS) is None:
+            # Try clicking menu first
+            print("Trying machine menu...")
+            if self.click_machine_menu():
+                self._wait_for('findSshToggle() !== null', prelude=FIND_SSH_TOGGLE_JS)
+
+        ssh_result = self.enable_ssh_toggle()
+        if not ssh_result.get('success') or ssh_result.get('action') == 'already_enabled':
+            return ssh_result
+
+        # Save if needed
+        ssh_result['saved'] = self.save_changes()
+        if ssh_result.get('action') == 'enabled':
+            confirmed = self._wait_for('findSshToggle() && isOn(findSshToggle().el)',
+                                       prelude=FIND_SSH_TOGGLE_JS) is not None
+            ssh_result['confirmed'] = confirmed
+            if not confirmed:
+                ssh_result['success'] = False
+                ssh_result['error'] = 'SSH toggle did not turn on'
+        return ssh_result
+
+    def enable_ssh_for_machines(self, machine_names: List[str]) -> List[Dict[str, Any]]:
+        """Enable SSH on several machines in one session; one result per machine"""
+        results = self.run_bulk_action(machine_names, self._enable_ssh_on_page)
+        for r in results:
+            status = "ok" if r['success'] else f"FAILED ({r.get('error')})"
+            print(f"  {r['machine']}: {status} in {r['seconds']}s")
+        return results
+
     def enable_ssh_for_machine(self, machine_name: str) -> Dict[str, Any]:
         """
         Full workflow to enable SSH for a machine.
@@ -323,45 +471,7 @@ delay 2
         4. Enable SSH
         5. Save
         """
-        result = {'machine': machine_name, 'steps': []}
-
-        # Step 1: Navigate to machines
-        print(f"Navigating to machines list...")
-        self.navigate_to_machines()
-        time.sleep(2)
-        result['steps'].append({'navigate': True})
-
-        # Step 2: Find and click machine
-        print(f"Finding machine: {machine_name}")
-        if self.find_machine_element(machine_name):
-            result['steps'].append({'find_machine': True})
-            time.sleep(2)
-        else:
-            result['steps'].append({'find_machine': False})
-            result['success'] = False
-            result['error'] = f'Could not find machine: {machine_name}'
-            return result
-
-        # Step 3: Look for SSH toggle on machine page
-        print("Looking for SSH settings...")
-        time.sleep(1)
-        ssh_result = self.enable_ssh_toggle()
-        result['steps'].append({'ssh_toggle': ssh_result})
-
-        if not ssh_result.get('success'):
-            # Try clicking menu first
-            print("Trying machine menu...")
-            if self.click_machine_menu():
-                time.sleep(1)
-                ssh_result = self.enable_ssh_toggle()
-                result['steps'].append({'ssh_toggle_after_menu': ssh_result})
-
-        # Step 4: Save if needed
-        self.save_changes()
-        result['steps'].append({'save': True})
-
-        result['success'] = ssh_result.get('success', False)
-        return result
+        return self.run_bulk_action([machine_name], self._enable_ssh_on_page)[0]
 
     def get_current_page_info(self) -> Dict[str, Any]:
         """Debug: Get info about current page"""
@@ -382,8 +492,13 @@ delay 2
 
 
 def main():
-    """Test the automation"""
+    """Test the automation; with machine names as arguments, enable SSH on them"""
+    import sys
+
     ts = TailscaleAdmin()
+    if len(sys.argv) > 1:
+        results = ts.enable_ssh_for_machines(sys.argv[1:])
+        sys.exit(0 if all(r['success'] for r in results) else 1)
 
     print("=== Tailscale Admin Automation ===")
     print()
@@ -391,7 +506,6 @@ def main():
     # Navigate and get page info
     print("Navigating to admin console...")
     ts.navigate_to_machines()
-    time.sleep(3)
 
     info = ts.get_current_page_info()
     print(f"Current URL: {info.get('url', 'unknown')}")